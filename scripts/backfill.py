@@ -0,0 +1,179 @@
+import argparse
+import contextlib
+import csv
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import config
+from process_points import CHECKPOINT_EVERY, CHECKPOINTS_KEPT, list_weeks
+from repositories.chart_repository import ChartRepository
+from services.fast_chart_builder import FastChartBuilder
+from services.instrumentation import get_metrics
+from services.plays_aggregator import PlaysAggregator
+from services.points_calculator import PointsCalculator
+from services.rebuild_journal import RebuildJournal, file_digest
+
+# run from scripts/: python backfill.py [--workers N]
+# rebuilds plays/ and points/ from the yearly data files like process_plays + process_points,
+# aggregating and writing in parallel around the one sequential step, the chart sweep
+CHUNK_BYTES = 1 << 20  # size of the slices of a yearly file aggregated independently
+WRITE_BATCH_WEEKS = 16  # weeks per write task
+
+def file_chunks(filepath, chunk_bytes=CHUNK_BYTES):
+    """[(start, end)] byte ranges of a file, each ending on a line break"""
+    size = os.path.getsize(filepath)
+    chunks = []
+    with open(filepath, 'rb') as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+def aggregate_chunk(filepath, start, end):
+    """weekly plays of one slice as if it began the file, plus how its first and last plays border the others"""
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start).decode('utf-8')
+
+    aggregator = PlaysAggregator()
+    first = None     # (song key, week) of the first play
+    leading = 0      # plays of the first song in a row within its week, from the start of the slice
+    unbroken = True  # whether the slice is that one streak and nothing else
+    for artist, album, song_name, timestamp in csv.reader(io.StringIO(data)):
+        week_start = aggregator.add_play(artist, album, song_name, datetime.strptime(timestamp, "%d %b %Y %H:%M"))
+        if first is None:
+            first = (aggregator.previous_song_key, week_start)
+        if unbroken and (aggregator.previous_song_key, week_start) == first:
+            leading += 1
+        else:
+            unbroken = False
+
+    last = (aggregator.previous_song_key, aggregator.previous_week)
+    trailing = aggregator.ongoing_streak[last[0]] if first else 0
+    return dict(aggregator.weekly_plays), first, leading, unbroken, last, trailing
+
+def stitch_chunks(chunk_results, weekly_plays):
+    """merge the slices of one yearly file in order, fixing the sales and airplay of streaks cut by a slice boundary"""
+    carry = None        # (song key, week) of the last play so far
+    carry_streak = 0
+    for chunk_plays, first, leading, unbroken, last, trailing in chunk_results:
+        if first is None:
+            continue
+
+        continued = first == carry
+        if continued:
+            # sequentially the first play extended the previous streak instead of starting a sale
+            play = chunk_plays[first[1]][first[0]]
+            play.sales -= 1
+            play.airplay = max(play.airplay, carry_streak + leading)
+
+        for week_start, plays in chunk_plays.items():
+            merged = weekly_plays.setdefault(week_start, {})
+            for key, play in plays.items():
+                existing = merged.get(key)
+                if existing is None:
+                    merged[key] = play
+                else:
+                    existing.streams += play.streams
+                    existing.sales += play.sales
+                    existing.airplay = max(existing.airplay, play.airplay)
+
+        # a slice that is one unbroken streak extends the carried one
+        carry_streak = carry_streak + trailing if continued and unbroken else trailing
+        carry = last
+
+def write_weeks(jobs):
+    """phase 3 task: [(plays, plays file, chart entries, points file or None for an unbuilt week)]"""
+    for plays, plays_file, chart_entries, points_file in jobs:
+        PlaysAggregator.save_weekly_file(plays, plays_file)
+        if points_file:
+            ChartRepository.save_weekly_chart(chart_entries, points_file)
+    return len(jobs)
+
+def backfill(years=config.YEARS, data_folder=config.DATA_DIR, plays_root=config.PLAYS_DIR,
+             points_root=config.POINTS_DIR, chart_limit=config.CHART_LIMIT,
+             charted_cache_file=config.CHARTED_CACHE_FILE, number_ones_file=config.NUMBER_ONES_FILE,
+             journal_file=config.POINTS_JOURNAL_FILE, checkpoint_dir=config.POINTS_CHECKPOINT_DIR,
+             workers=config.PIPELINE_WORKERS):
+    """rebuild every plays and points file: parallel aggregation, sequential chart sweep, parallel writes"""
+    metrics = get_metrics()
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # phase 1: every slice of every yearly file at once, streaks restart with each file like process_plays
+        with metrics.stage("aggregate_chunks"):
+            futures = []
+            for year in years:
+                filepath = os.path.join(data_folder, f"{year}.csv")
+                if os.path.exists(filepath):
+                    futures.append([pool.submit(aggregate_chunk, filepath, start, end)
+                                    for start, end in file_chunks(filepath)])
+
+            weekly_plays = {}
+            for year_futures in futures:
+                stitch_chunks((future.result() for future in year_futures), weekly_plays)
+        print(f"Aggregated {len(weekly_plays)} weeks in {time.perf_counter() - started:.2f}s")
+
+        # phase 2: the only step that depends on the week before
+        sweep_started = time.perf_counter()
+        builder = FastChartBuilder(PointsCalculator(), chart_limit)
+        builder.load_charted_cache(charted_cache_file)
+        for year in years:
+            os.makedirs(os.path.join(points_root, year), exist_ok=True)
+
+        jobs = []
+        built = []  # week keys in build order
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for week_start, plays in sorted(weekly_plays.items()):
+                year, week = str(week_start.year), week_start.strftime("%m-%d")
+                plays_file = PlaysAggregator.weekly_file_path(week_start, plays_root)
+                # process_points only builds weeks filed under a configured year
+                if year not in years:
+                    jobs.append((plays, plays_file, None, None))
+                    continue
+                chart_entries = builder.build_weekly_chart(plays, f"{year}-{week}")
+                built.append(f"{year}-{week}")
+                jobs.append((plays, plays_file, chart_entries, os.path.join(points_root, year, f"{week}.csv")))
+        print(f"Built {len(jobs)} weeks in {time.perf_counter() - sweep_started:.2f}s")
+
+        # phase 3
+        write_started = time.perf_counter()
+        with metrics.stage("write_weeks"):
+            batches = [jobs[i:i + WRITE_BATCH_WEEKS] for i in range(0, len(jobs), WRITE_BATCH_WEEKS)]
+            written = sum(pool.map(write_weeks, batches))
+
+    ChartRepository.save_charted_cache(builder.charted_cache, charted_cache_file)
+    ChartRepository.save_number_ones_ledger(builder.number_ones_ledger, number_ones_file)
+    print(f"Wrote {written} weeks in {time.perf_counter() - write_started:.2f}s")
+
+    # journal the weeks like process_points would have, so its next run only builds what changed since
+    with metrics.stage("journal"):
+        entries = []
+        for index, (week_key, plays_file, points_file) in enumerate(list_weeks(years, plays_root, points_root)):
+            # plays files left over from an older export are not built here, process_points picks up from them
+            if index >= len(built) or built[index] != week_key:
+                break
+            entries.append((week_key, file_digest(plays_file), file_digest(points_file)))
+        journal = RebuildJournal(journal_file, checkpoint_dir, {"chart_limit": chart_limit}, CHECKPOINT_EVERY,
+                                 CHECKPOINTS_KEPT)
+        # the builder is past every built week, so it only checkpoints a journal that covers them all
+        journal.record(entries, builder if len(entries) == len(built) else None)
+    print(f"Journaled {len(entries)} of {len(built)} weeks, backfill done in {time.perf_counter() - started:.2f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="rebuild plays and points from the yearly data files on every core")
+    parser.add_argument("--workers", type=int, default=config.PIPELINE_WORKERS, help="processes, default one per cpu")
+    args = parser.parse_args()
+
+    os.chdir(config.SCRIPT_DIR)
+    backfill(workers=args.workers)
+
+if __name__ == "__main__":
+    main()
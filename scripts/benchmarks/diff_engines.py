@@ -0,0 +1,158 @@
+import argparse
+import contextlib
+import filecmp
+import importlib
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# run from scripts/: python benchmarks/diff_engines.py --scrobbles 200000
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+
+from process_points import load_weekly_plays
+from repositories.chart_repository import ChartRepository, WEEKLY_CHART_HEADER
+from services.chart_builder import ChartBuilder
+from services.points_calculator import PointsCalculator
+
+DEFAULT_ENGINE = "services.fast_chart_builder.FastChartBuilder"
+CONTEXT_ROWS = 2
+# the fields a divergence is summarised by, every column is still compared
+KEY_FIELDS = ["Position", "Song", "Artist", "Total Weighted Points", "Total Units", "Peak", "WOC"]
+
+def load_engine(path):
+    """engine class from a dotted module.Class path"""
+    module_name, _, class_name = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), class_name)
+
+def synthetic_plays(scrobbles, seed, workdir):
+    """generate, split and aggregate a synthetic export, returns the plays folder"""
+    from benchmarks.generate_scrobbles import generate_scrobbles
+    from services.lastfm_parser import LastFmParser
+    from services.plays_aggregator import PlaysAggregator
+
+    export_file = os.path.join(workdir, "scrobbles.csv")
+    data_dir = os.path.join(workdir, "data") + os.sep
+    plays_dir = os.path.join(workdir, "plays")
+    os.makedirs(data_dir)
+
+    generate_scrobbles(scrobbles, export_file, seed)
+    LastFmParser(time_offset_hours=8).parse_and_split(export_file, data_dir)
+    aggregator = PlaysAggregator()
+    aggregator.process_years(sorted(name[:4] for name in os.listdir(data_dir)), data_folder=data_dir)
+    aggregator.save_weekly_files(output_root=plays_dir)
+    return plays_dir
+
+def iter_plays(plays_root):
+    """yield (week_key, plays file) for every week in chronological order"""
+    for year in sorted(os.listdir(plays_root)):
+        year_dir = os.path.join(plays_root, year)
+        if not (year.isdigit() and os.path.isdir(year_dir)):
+            continue
+        for filename in sorted(os.listdir(year_dir)):
+            if filename.endswith(".csv"):
+                week_key = datetime.strptime(f"{year}-{filename[:-4]}", "%Y-%m-%d").strftime("%Y-%m-%d")
+                yield week_key, os.path.join(year_dir, filename)
+
+def as_text(rows):
+    """rows exactly as they would be written to the points csv"""
+    return [[str(value) for value in row] for row in rows]
+
+def first_difference(reference_rows, candidate_rows):
+    """(row index, [differing columns]) of the first mismatch, or None"""
+    for index in range(max(len(reference_rows), len(candidate_rows))):
+        if index >= len(reference_rows) or index >= len(candidate_rows):
+            return index, ["<missing row>"]
+        if reference_rows[index] != candidate_rows[index]:
+            columns = [
+                name for name, ref, cand in zip(WEEKLY_CHART_HEADER, reference_rows[index], candidate_rows[index])
+                if ref != cand
+            ]
+            return index, columns
+    return None
+
+def print_divergence(week_key, index, columns, reference_rows, candidate_rows):
+    print(f"First divergence in week {week_key} at row {index + 1}: {', '.join(columns)}")
+    positions = [WEEKLY_CHART_HEADER.index(name) for name in KEY_FIELDS]
+    for label, rows in (("reference", reference_rows), ("candidate", candidate_rows)):
+        print(f"  {label}:")
+        for row_index in range(max(0, index - CONTEXT_ROWS), min(len(rows), index + CONTEXT_ROWS + 1)):
+            marker = ">" if row_index == index else " "
+            print(f"   {marker} " + " | ".join(f"{KEY_FIELDS[i]}={rows[row_index][p]}" for i, p in enumerate(positions)))
+    if columns and columns != ["<missing row>"]:
+        for name in columns:
+            position = WEEKLY_CHART_HEADER.index(name)
+            print(f"  {name}: reference {reference_rows[index][position]!r}, candidate {candidate_rows[index][position]!r}")
+
+def compare_final_files(reference, candidate, workdir):
+    """compare the charted cache and #1 ledger both engines would save, returns the differing files"""
+    differing = []
+    for name, save, attribute in (
+        ("ever_charted.csv", ChartRepository.save_charted_cache, "charted_cache"),
+        ("number_ones.csv", ChartRepository.save_number_ones_ledger, "number_ones_ledger"),
+    ):
+        paths = []
+        for label, builder in (("reference", reference), ("candidate", candidate)):
+            path = os.path.join(workdir, f"{label}_{name}")
+            save(getattr(builder, attribute), path)
+            paths.append(path)
+        if not filecmp.cmp(*paths, shallow=False):
+            differing.append(name)
+    return differing
+
+def run(plays_root, engine_class, chart_limit, charted_cache_file=None, workdir=None):
+    """replay every week through both engines, returns the number of weeks that matched before a divergence"""
+    reference = ChartBuilder(PointsCalculator(), chart_limit)
+    candidate = engine_class(PointsCalculator(), chart_limit)
+    if charted_cache_file:
+        reference.load_charted_cache(charted_cache_file)
+        candidate.load_charted_cache(charted_cache_file)
+
+    weeks = 0
+    for week_key, filepath in iter_plays(plays_root):
+        # each engine gets its own copy so neither can see the other's mutations
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            reference_rows = as_text(map(ChartRepository.entry_row,
+                                         reference.build_weekly_chart(load_weekly_plays(filepath, week_key), week_key)))
+            candidate_rows = as_text(map(ChartRepository.entry_row,
+                                         candidate.build_weekly_chart(load_weekly_plays(filepath, week_key), week_key)))
+
+        difference = first_difference(reference_rows, candidate_rows)
+        if difference is not None:
+            print_divergence(week_key, *difference, reference_rows, candidate_rows)
+            return weeks, False
+        weeks += 1
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        differing = compare_final_files(reference, candidate, tmp)
+    if differing:
+        print(f"All {weeks} weeks match, but {', '.join(differing)} differ")
+        return weeks, False
+
+    print(f"All {weeks} weeks identical: {engine_class.__name__} matches ChartBuilder")
+    return weeks, True
+
+def main():
+    parser = argparse.ArgumentParser(description="replay weekly plays through ChartBuilder and another engine, stopping at the first difference")
+    parser.add_argument("--engine", default=DEFAULT_ENGINE, help="dotted path of the candidate engine class")
+    parser.add_argument("--plays", help="existing plays folder, otherwise a synthetic dataset is generated")
+    parser.add_argument("--scrobbles", type=int, default=200_000, help="size of the synthetic dataset")
+    parser.add_argument("--seed", type=int, default=23)
+    parser.add_argument("--chart-limit", type=int, default=100)
+    parser.add_argument("--charted-cache", help="ever_charted.csv to seed both engines with")
+    args = parser.parse_args()
+
+    engine_class = load_engine(args.engine)
+    with tempfile.TemporaryDirectory() as workdir:
+        plays_root = args.plays
+        if plays_root is None:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                plays_root = synthetic_plays(args.scrobbles, args.seed, workdir)
+        _, identical = run(plays_root, engine_class, args.chart_limit, args.charted_cache, workdir)
+
+    sys.exit(0 if identical else 1)
+
+if __name__ == "__main__":
+    main()
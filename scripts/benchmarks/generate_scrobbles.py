@@ -0,0 +1,131 @@
+import argparse
+import csv
+import os
+from datetime import datetime
+
+import numpy as np
+
+# run from scripts/: python benchmarks/generate_scrobbles.py 1000000 benchmarks/data/scrobbles_1m.csv
+SEED = 23
+START = datetime(2020, 1, 3, 6)
+WEEKLY_PLAYS_SHAPE = 2.0     # gamma shape of plays per week, lower is burstier
+SONG_LIFETIME_WEEKS = 26     # popularity decay time constant after release
+REPEAT_SESSION_RATE = 0.25   # one song on repeat, drives airplay streaks
+ALBUM_SESSION_RATE = 0.20    # consecutive album tracks
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+class Catalogue:
+    """artists -> albums -> tracks with zipf-like artist popularity and staggered release weeks"""
+
+    def __init__(self, rng, n_scrobbles, weeks):
+        n_artists = int(np.clip(n_scrobbles // 2000, 40, 4000))
+        albums_per_artist = rng.integers(1, 6, n_artists)
+        artist_weight = 1.0 / np.arange(1, n_artists + 1) ** 1.1
+        rng.shuffle(artist_weight)
+
+        artist, album, track, release, weight, album_start, album_size = [], [], [], [], [], [], []
+        for a in range(n_artists):
+            for b in range(albums_per_artist[a]):
+                size = int(rng.integers(8, 15))
+                released = int(rng.integers(-SONG_LIFETIME_WEEKS, weeks))
+                start = len(artist)
+                # lead singles are played far more than deep cuts
+                track_weight = 1.0 / np.arange(1, size + 1) ** 0.8
+                rng.shuffle(track_weight)
+                for t in range(size):
+                    artist.append(a)
+                    album.append(b)
+                    track.append(t)
+                    release.append(released)
+                    weight.append(artist_weight[a] * track_weight[t])
+                    album_start.append(start)
+                    album_size.append(size)
+
+        self.artist = np.array(artist)
+        self.album = np.array(album)
+        self.track = np.array(track)
+        self.release = np.array(release)
+        self.weight = np.array(weight)
+        self.album_start = np.array(album_start)
+        self.album_size = np.array(album_size)
+        self.names = [
+            (f"Artist {a}", f"Artist {a} Album {b}", f"Song {a}-{b}-{t}")
+            for a, b, t in zip(artist, album, track)
+        ]
+
+    def weekly_weights(self, week):
+        """popularity of every song in a given week, zero before release"""
+        age = week - self.release
+        weights = np.where(age >= 0, self.weight * np.exp(-np.maximum(age, 0) / SONG_LIFETIME_WEEKS), 0.0)
+        return weights / weights.sum()
+
+def week_plays(rng, catalogue, week, n_plays):
+    """song indices for one week of listening, built from repeat, album and shuffle sessions"""
+    probabilities = catalogue.weekly_weights(week)
+    plays = []
+    total = 0
+    while total < n_plays:
+        n_sessions = max(16, (n_plays - total) // 4)
+        seeds = rng.choice(len(probabilities), size=n_sessions, p=probabilities)
+        kinds = rng.random(n_sessions)
+        lengths = rng.geometric(0.35, n_sessions)
+
+        for seed, kind, length in zip(seeds, kinds, lengths):
+            if kind < REPEAT_SESSION_RATE:
+                session = [seed] * length
+            elif kind < REPEAT_SESSION_RATE + ALBUM_SESSION_RATE:
+                start, size = catalogue.album_start[seed], catalogue.album_size[seed]
+                offset = seed - start
+                session = [start + (offset + i) % size for i in range(length + 2)]
+            else:
+                session = [seed]
+            plays.extend(session)
+            total += len(session)
+            if total >= n_plays:
+                break
+    return np.array(plays[:n_plays])
+
+def generate_scrobbles(n_scrobbles, output_file, seed=SEED, weeks=None):
+    """write a deterministic last.fm style export (artist, album, song, dd Mon yyyy HH:MM)"""
+    rng = np.random.default_rng(seed)
+    if weeks is None:
+        # roughly 2-10k plays a week, like a heavy listener, at least a year of history
+        weeks = int(np.clip(n_scrobbles // 4000, 52, 520))
+    catalogue = Catalogue(rng, n_scrobbles, weeks)
+
+    volume = rng.gamma(WEEKLY_PLAYS_SHAPE, 1.0, weeks)
+    per_week = np.floor(volume / volume.sum() * n_scrobbles).astype(np.int64)
+    per_week[-1] += n_scrobbles - per_week.sum()
+
+    start = np.datetime64(START, 'm')
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        for week in range(weeks):
+            n_plays = int(per_week[week])
+            if n_plays <= 0:
+                continue
+
+            songs = week_plays(rng, catalogue, week, n_plays)
+            minutes = np.sort(rng.integers(0, 7 * 24 * 60, n_plays))
+            stamps = (start + np.timedelta64(week * 7 * 24 * 60, 'm') + minutes.astype('timedelta64[m]'))
+            text = np.datetime_as_string(stamps, unit='m')  # yyyy-mm-ddThh:mm
+
+            writer.writerows(
+                (*catalogue.names[song], f"{t[8:10]} {MONTHS[int(t[5:7]) - 1]} {t[:4]} {t[11:16]}")
+                for song, t in zip(songs.tolist(), text.tolist())
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description="generate a seeded synthetic last.fm export")
+    parser.add_argument("scrobbles", type=int)
+    parser.add_argument("output_file")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--weeks", type=int, default=None)
+    args = parser.parse_args()
+
+    generate_scrobbles(args.scrobbles, args.output_file, args.seed, args.weeks)
+    print(f"Wrote {args.scrobbles} scrobbles to {args.output_file}")
+
+if __name__ == "__main__":
+    main()
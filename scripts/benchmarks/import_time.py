@@ -0,0 +1,60 @@
+import os
+import statistics
+import subprocess
+import sys
+
+# run from scripts/: python benchmarks/import_time.py [module ...]
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["process_weekly", "extract_number_ones", "process_ones", "process_reports", "process_charts"]
+RUNS = 5
+TOP_IMPORTS = 8
+
+def import_times(module):
+    """[(depth, imported module, cumulative microseconds)] from one cold `python -X importtime` run"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr}")
+
+    times = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package, indented by nesting depth
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append((depth, name.strip(), int(cumulative)))
+    return times
+
+def benchmark(module, runs=RUNS):
+    """median startup cost of a module plus its slowest direct dependencies"""
+    samples = [import_times(module) for _ in range(runs)]
+    totals = []
+    for sample in samples:
+        index = next(i for i, (depth, name, _) in enumerate(sample) if depth == 0 and name == module)
+        totals.append(sample[index][2])
+
+    # children are reported before their parent, so the module's direct imports are the
+    # depth 1 entries right above it
+    direct = []
+    for depth, name, cumulative in reversed(samples[-1][:index]):
+        if depth == 0:
+            break
+        if depth == 1:
+            direct.append((name, cumulative))
+    slowest = sorted(direct, key=lambda item: -item[1])[:TOP_IMPORTS]
+    return statistics.median(totals), slowest
+
+def main():
+    modules = sys.argv[1:] or MODULES
+
+    for module in modules:
+        total, slowest = benchmark(module)
+        print(f"{module}: {total / 1000:.1f} ms (median of {RUNS})")
+        for name, cumulative in slowest:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import quote
+
+# run from scripts/ with serve_charts.py running: python benchmarks/load_test.py --connections 16 --seconds 10
+HOST = "127.0.0.1"
+PORT = 8023
+# share of requests for a random /top or /number-ones range, almost never one the server has cached
+RANDOM_RANGES = 0.5
+
+async def request(reader, writer, host, path, etag=None):
+    """(status, headers, body) of one GET on a keep-alive connection"""
+    lines = [f"GET {path} HTTP/1.1", f"Host: {host}"]
+    if etag:
+        lines.append(f"If-None-Match: {etag}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, body
+
+async def query_mix(host, port):
+    """(one path per query type picked from the latest chart, every week newest first)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, _, body = await request(reader, writer, host, "/weeks")
+        weeks = json.loads(body)["weeks"]
+        _, _, body = await request(reader, writer, host, "/chart/latest")
+        top_entry = json.loads(body)["entries"][0]
+    finally:
+        writer.close()
+
+    latest, year_ago = weeks[0], weeks[min(52, len(weeks) - 1)]
+    return weeks, [
+        "/chart/latest",
+        f"/chart/{weeks[len(weeks) // 2]}",
+        f"/song/{top_entry['songId']}",
+        f"/artist/{quote(top_entry['artist'])}",
+        f"/number-ones?from={year_ago}&to={latest}",
+        f"/top?from={year_ago}&to={latest}&n=25",
+    ]
+
+def random_range(rng, weeks):
+    """a /top or /number-ones path over random weeks, with a random n for /top"""
+    start, end = sorted(rng.sample(weeks, 2)) if len(weeks) > 1 else (weeks[0], weeks[0])
+    if rng.random() < 0.5:
+        return f"/number-ones?from={start}&to={end}"
+    return f"/top?from={start}&to={end}&n={rng.randint(1, 100)}"
+
+async def worker(host, port, paths, weeks, random_ranges, rng, deadline, use_etags, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    try:
+        i = 0
+        while time.perf_counter() < deadline:
+            if rng.random() < random_ranges:
+                path = random_range(rng, weeks)
+            else:
+                path = paths[i % len(paths)]
+                i += 1
+            started = time.perf_counter()
+            status, headers, _ = await request(reader, writer, host, path, etags.get(path) if use_etags else None)
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if "etag" in headers:
+                etags[path] = headers["etag"]
+    finally:
+        writer.close()
+
+async def run(host, port, connections, seconds, use_etags, random_ranges=RANDOM_RANGES, seed=23):
+    weeks, paths = await query_mix(host, port)
+    latencies = []
+    statuses = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        worker(host, port, paths, weeks, random_ranges, random.Random(seed + i), started + seconds,
+               use_etags, latencies, statuses)
+        for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    print(f"{len(latencies)} requests over {connections} connection(s) in {elapsed:.2f}s: "
+          f"{len(latencies) / elapsed:.0f} req/s")
+    print(f"latency p50 {percentile(0.5):.2f}ms, p99 {percentile(0.99):.2f}ms, max {latencies[-1] * 1000:.2f}ms")
+    print("statuses: " + ", ".join(f"{status} x{count}" for status, count in sorted(statuses.items())))
+
+def main():
+    parser = argparse.ArgumentParser(description="measure requests per second against serve_charts.py")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--etags", action="store_true", help="revalidate with If-None-Match like a browser cache")
+    parser.add_argument("--random-ranges", type=float, default=RANDOM_RANGES,
+                        help="share of requests for random ranges instead of the fixed paths, 0 measures cached responses only")
+    parser.add_argument("--seed", type=int, default=23)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.host, args.port, args.connections, args.seconds, args.etags, args.random_ranges, args.seed))
+
+if __name__ == "__main__":
+    main()
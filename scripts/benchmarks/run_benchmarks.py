@@ -0,0 +1,257 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# run from scripts/: python benchmarks/run_benchmarks.py --sizes 100k 1m
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCHMARKS_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+
+DATA_DIR = os.path.join(BENCHMARKS_DIR, "data")
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, "results")
+SIZES = {"100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+STAGES = ["split", "aggregate", "build", "reports"]
+CHART_LIMIT = 100
+# the feed title, key.py holds the real one and is not part of a checkout
+CHART_NAME = "Benchmark Chart"
+
+class OfflineCoverClient:
+    """stands in for last.fm so report timings never include network calls"""
+
+    def get_album_cover(self, album_name, artist_name):
+        return ""
+
+def _years(folder):
+    return sorted(name[:4] for name in os.listdir(folder) if name[:4].isdigit())
+
+def stage_split(workdir):
+    from services.lastfm_parser import LastFmParser
+
+    data_dir = os.path.join(workdir, "data") + os.sep
+    os.makedirs(data_dir, exist_ok=True)
+    years, invalid = LastFmParser(time_offset_hours=8).parse_and_split(
+        os.path.join(workdir, "scrobbles.csv"), data_dir
+    )
+    return {}, {"years": years, "invalid_rows": invalid}
+
+def stage_aggregate(workdir):
+    from services.plays_aggregator import PlaysAggregator
+
+    data_dir = os.path.join(workdir, "data") + os.sep
+    aggregator = PlaysAggregator()
+
+    started = time.perf_counter()
+    aggregator.process_years(_years(data_dir), data_folder=data_dir)
+    aggregated = time.perf_counter()
+    aggregator.save_weekly_files(output_root=os.path.join(workdir, "plays"))
+    written = time.perf_counter()
+
+    timings = {"aggregate": aggregated - started, "write_plays": written - aggregated}
+    counters = {
+        "weeks": len(aggregator.weekly_plays),
+        "weekly_rows": sum(len(plays) for plays in aggregator.weekly_plays.values()),
+    }
+    return timings, counters
+
+def stage_build(workdir):
+    from process_points import build_points
+    from services.instrumentation import get_metrics
+
+    plays_root = os.path.join(workdir, "plays")
+    points_root = os.path.join(workdir, "points")
+    # the production rebuild, journal, checkpoints and per-week ledger appends included
+    build_points(
+        years=_years(plays_root), plays_root=plays_root, points_root=points_root, chart_limit=CHART_LIMIT,
+        charted_cache_file=os.path.join(points_root, "ever_charted.csv"),
+        number_ones_file=os.path.join(points_root, "number_ones.csv"),
+        journal_file=os.path.join(points_root, "rebuild_journal.txt"),
+        checkpoint_dir=os.path.join(points_root, "checkpoints"),
+        fresh=True
+    )
+
+    stages = get_metrics().summary().get("stages", {})
+    timings = {
+        name: stages[name]["seconds"]
+        for name in ("fingerprint", "load_plays", "build", "write_points", "journal") if name in stages
+    }
+    return timings, {"weeks": stages.get("build", {}).get("calls", 0)}
+
+def stage_reports(workdir):
+    from reports.all_time_report import AllTimeReport
+    from reports.feed_report import FeedReport
+    from reports.number_ones_report import NumberOnesSummaryReport
+    from reports.updates_report import UpdatesReport
+    from reports.year_end_report import YearEndReport
+    from services.album_cover_service import AlbumCoverService
+    from services.report_engine import ReportEngine
+
+    points_root = os.path.join(workdir, "points")
+    output_dir = os.path.join(workdir, "reports")
+    cover_service = AlbumCoverService(os.path.join(workdir, "album_covers.csv"), client=OfflineCoverClient())
+    engine = ReportEngine(points_root=points_root, cover_service=cover_service)
+
+    years = _years(points_root)
+    engine.add(NumberOnesSummaryReport(os.path.join(points_root, "number_ones.csv"), os.path.join(output_dir, "number_ones.txt")))
+    engine.add(AllTimeReport(os.path.join(output_dir, "all_time.csv"), chart_limit=CHART_LIMIT))
+    engine.add(FeedReport(CHART_NAME, output_dir=os.path.join(output_dir, "feeds")))
+    for year in years:
+        engine.add(YearEndReport(year, output_dir=os.path.join(output_dir, "year_end"), chart_limit=CHART_LIMIT))
+        engine.add(UpdatesReport(year, output_dir=os.path.join(output_dir, "updates"), chart_limit=CHART_LIMIT))
+
+    os.makedirs(output_dir, exist_ok=True)
+    engine.run()
+    return {}, {"years": len(years), "reports": len(engine.accumulators)}
+
+STAGE_FUNCTIONS = {
+    "split": stage_split,
+    "aggregate": stage_aggregate,
+    "build": stage_build,
+    "reports": stage_reports,
+}
+
+def peak_rss_mb():
+    """peak resident set size of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_stage_in_process(stage, workdir):
+    """run one stage here and return its measurements, stage output is silenced"""
+    from services import instrumentation
+
+    os.chdir(SCRIPTS_DIR)
+    metrics = instrumentation.enable()
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        timings, counters = STAGE_FUNCTIONS[stage](workdir)
+    summary = metrics.summary()
+    return {
+        "seconds": time.perf_counter() - started,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "timings": {name: round(value, 4) for name, value in timings.items()},
+        "counters": counters,
+        # per-week detail is left to HOT100_METRICS reports
+        "metrics": {"totals": summary["totals"], "stages": summary["stages"]},
+    }
+
+def run_stage(stage, workdir):
+    """run one stage in a fresh interpreter so peak rss belongs to that stage alone"""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--stage", stage, "--workdir", workdir],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"stage {stage} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def prepare_workdir(size_name, scrobbles, seed):
+    """fresh workdir holding a cached synthetic export for this size"""
+    from benchmarks.generate_scrobbles import generate_scrobbles
+
+    export_file = os.path.join(DATA_DIR, f"scrobbles_{size_name}_{seed}.csv")
+    generated = None
+    if not os.path.exists(export_file):
+        started = time.perf_counter()
+        generate_scrobbles(scrobbles, export_file, seed)
+        generated = time.perf_counter() - started
+
+    workdir = os.path.join(DATA_DIR, size_name)
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(workdir)
+    shutil.copyfile(export_file, os.path.join(workdir, "scrobbles.csv"))
+    return workdir, generated
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPTS_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_suite(size_names, seed, stages=STAGES):
+    results = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": seed,
+        "sizes": {},
+    }
+
+    for size_name in size_names:
+        workdir, generated = prepare_workdir(size_name, SIZES[size_name], seed)
+        size_result = {"scrobbles": SIZES[size_name], "generate_seconds": generated, "stages": {}}
+
+        for stage in stages:
+            stage_result = run_stage(stage, workdir)
+            size_result["stages"][stage] = stage_result
+            print(f"{size_name:>5} {stage:<10} {stage_result['seconds']:9.2f}s "
+                  f"{stage_result['peak_rss_mb']:9.1f} MB  {stage_result['timings']}")
+
+        size_result["total_seconds"] = round(sum(s["seconds"] for s in size_result["stages"].values()), 4)
+        results["sizes"][size_name] = size_result
+
+    return results
+
+def compare(baseline_file, current_file):
+    """print per-stage time and memory ratios between two result files"""
+    with open(baseline_file, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(current_file, encoding="utf-8") as f:
+        current = json.load(f)
+
+    print(f"{baseline.get('commit')} -> {current.get('commit')}")
+    for size_name, size_result in current["sizes"].items():
+        before_size = baseline["sizes"].get(size_name)
+        if before_size is None:
+            continue
+        for stage, after in size_result["stages"].items():
+            before = before_size["stages"].get(stage)
+            if before is None:
+                continue
+            print(f"{size_name:>5} {stage:<10} {before['seconds']:8.2f}s -> {after['seconds']:8.2f}s "
+                  f"({after['seconds'] / max(before['seconds'], 1e-9):5.2f}x)  "
+                  f"{before['peak_rss_mb']:8.1f} -> {after['peak_rss_mb']:8.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="end-to-end pipeline benchmarks on synthetic scrobbles")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["100k", "1m"])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--seed", type=int, default=23)
+    parser.add_argument("--output", help="results json, defaults to results/<timestamp>-<commit>.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"))
+    # internal: run a single stage in this process
+    parser.add_argument("--stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        print(json.dumps(run_stage_in_process(args.stage, args.workdir)))
+        return
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run_suite(args.sizes, args.seed, args.stages)
+
+    output_file = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{results['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output_file}")
+
+if __name__ == "__main__":
+    main()
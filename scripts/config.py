@@ -1 +1,33 @@
-YEAR_END_LIMIT = 100
\ No newline at end of file
+import os
+
+# shared paths and settings, every path is relative to this scripts folder
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+YEARS = [str(year) for year in range(2020, 2027)]
+REPORT_YEAR = "2025"
+CHART_LIMIT = 100
+YEAR_END_LIMIT = 100
+TIME_OFFSET_HOURS = 8
+
+EXPORT_FILE = os.path.join(SCRIPT_DIR, 'ptrn23.csv')
+DATA_DIR = os.path.join(SCRIPT_DIR, 'data')
+PLAYS_DIR = os.path.join(SCRIPT_DIR, 'plays')
+POINTS_DIR = os.path.join(SCRIPT_DIR, 'points')
+WEEKLY_CHARTS_DIR = os.path.join(SCRIPT_DIR, 'weekly_charts')
+YEAR_END_DIR = os.path.join(SCRIPT_DIR, 'year_end')
+UPDATES_DIR = os.path.join(SCRIPT_DIR, 'updates')
+FEEDS_DIR = os.path.join(SCRIPT_DIR, 'feeds')
+
+CHARTED_CACHE_FILE = os.path.join(POINTS_DIR, 'ever_charted.csv')
+NUMBER_ONES_FILE = os.path.join(POINTS_DIR, 'number_ones.csv')
+ALL_TIME_FILE = os.path.join(POINTS_DIR, 'all_time.csv')
+NUMBER_ONES_SUMMARY_FILE = os.path.join(SCRIPT_DIR, 'number_ones.txt')
+
+# process_points.py: weeks finished by the last rebuild and builder checkpoints to resume from
+POINTS_JOURNAL_FILE = os.path.join(POINTS_DIR, 'rebuild_journal.txt')
+POINTS_CHECKPOINT_DIR = os.path.join(POINTS_DIR, 'checkpoints')
+
+# run_pipeline.py: input fingerprints of the last successful run of every stage
+PIPELINE_STATE_FILE = os.path.join(SCRIPT_DIR, 'pipeline_state.json')
+# parallel report stages, None for one per cpu
+PIPELINE_WORKERS = None
@@ -0,0 +1,33 @@
+import os
+import sys
+
+from services.report_engine import ReportEngine
+from reports.json_api_report import JsonApiReport
+from reports.delta_chart_report import DeltaChartReport, verify_delta_export
+
+# CONFIG
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+POINTS_DIR = os.path.join(SCRIPT_DIR, 'points')
+API_DIR = os.path.join(SCRIPT_DIR, '..', 'public', 'data', 'api')
+DELTA_DIR = os.path.join(SCRIPT_DIR, '..', 'public', 'data', 'delta')
+STATE_FILE = os.path.join(POINTS_DIR, 'api_state.pkl')
+DELTA_STATE_FILE = os.path.join(POINTS_DIR, 'delta_state.pkl')
+CHART_LIMIT = 100
+# decode every delta bundle after writing and compare it against the points files, tests/test_delta_chart_report.py
+# covers the round trip so this is only for checking a real history by hand
+VERIFY_DELTA = False
+
+def main():
+    engine = ReportEngine(points_root=POINTS_DIR)
+    engine.add(JsonApiReport(output_dir=API_DIR, chart_limit=CHART_LIMIT, state_file=STATE_FILE))
+    engine.add(DeltaChartReport(output_dir=DELTA_DIR, chart_limit=CHART_LIMIT, state_file=DELTA_STATE_FILE))
+    engine.run()
+
+    if VERIFY_DELTA:
+        mismatched = verify_delta_export(engine, DELTA_DIR, CHART_LIMIT)
+        if mismatched:
+            print(f"Delta round trip failed for: {', '.join(mismatched)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,18 @@ import csv
 import json
 import os
 
+from services.album_cover_service import AlbumCoverService
+from services.cover_mirror import CoverMirror
+
 # CONFIG
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 # Note: Ensure this matches your actual CSV filename
 CSV_PATH = os.path.join(SCRIPT_DIR, 'weekly_charts', '2026_01-23.csv')
 OUTPUT_PATH = os.path.join(SCRIPT_DIR, '..', 'public', 'data', 'latest_chart.json')
+PUBLIC_DIR = os.path.join(SCRIPT_DIR, '..', 'public')
+COVERS_DIR = os.path.join(PUBLIC_DIR, 'covers')
+COVER_CACHE = os.path.join(SCRIPT_DIR, 'album_covers.csv')
+THUMBNAIL_SIZE = 150
 
 def convert_csv_to_json():
     if not os.path.exists(CSV_PATH):
@@ -19,64 +26,70 @@ def convert_csv_to_json():
     }
 
     with open(CSV_PATH, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        
-        for row in reader:
-            try:
-                rank = int(row['Position'])
-            except ValueError:
-                continue 
+        rows = list(csv.DictReader(f))
 
-            # Helper to safely parse floats/ints
-            def parse_num(key, type_func=int):
-                val = row.get(key, '').strip().replace('%', '')
-                return type_func(float(val)) if val else 0
+    # mirrored thumbnails are served by the site instead of hotlinking last.fm
+    cover_service = AlbumCoverService(COVER_CACHE, mirror=CoverMirror(COVERS_DIR))
+    cover_service.prefetch((row.get('Album', ''), row.get('Artist', '')) for row in rows)
+    cover_service.save_cache()
 
-            # Logic for Rank Change
-            last_week_raw = row.get('Previous Rank', '')
-            last_week = int(last_week_raw) if last_week_raw.isdigit() else None
-            status = "stable"
-            change = 0
-            
-            if last_week is None:
-                status = "new"
-            elif rank < last_week:
-                status = "rise"
-                change = last_week - rank
-            elif rank > last_week:
-                status = "fall"
-                change = rank - last_week
+    for row in rows:
+        try:
+            rank = int(row['Position'])
+        except ValueError:
+            continue 
+
+        # Helper to safely parse floats/ints
+        def parse_num(key, type_func=int):
+            val = row.get(key, '').strip().replace('%', '')
+            return type_func(float(val)) if val else 0
 
-            # Build the rich entry
-            song_entry = {
-                "rank": rank,
-                "title": row.get('Song', ''),
-                "artist": row.get('Artist', ''),
-                "coverUrl": row.get('Album Cover', ''),
-                "status": status,
-                "change": change,
-                
-                # --- NEW METRICS ---
-                "points": parse_num('Total Weighted Points'),
-                "pointsPct": row.get('%', '-'), # Keep as string to handle "--" or formatting
-                
-                "peak": row.get('Peak', '-'),
-                "peakStreak": row.get('Peak Streak', ''), # For the blue "4x" text
-                "woc": row.get('WOC', '-'),
-                
-                "sales": parse_num('Sales Units'),
-                "salesPct": row.get('Sales %', ''),
-                
-                "streams": parse_num('Streams Units'),
-                "streamsPct": row.get('Streams %', ''),
-                
-                "airplay": parse_num('Airplay Units'),
-                "airplayPct": row.get('Airplay %', ''),
-                
-                "units": parse_num('Total Units')
-            }
+        # Logic for Rank Change
+        last_week_raw = row.get('Previous Rank', '')
+        last_week = int(last_week_raw) if last_week_raw.isdigit() else None
+        status = "stable"
+        change = 0
+        
+        if last_week is None:
+            status = "new"
+        elif rank < last_week:
+            status = "rise"
+            change = last_week - rank
+        elif rank > last_week:
+            status = "fall"
+            change = rank - last_week
+
+        # Build the rich entry
+        song_entry = {
+            "rank": rank,
+            "title": row.get('Song', ''),
+            "artist": row.get('Artist', ''),
+            "coverUrl": row.get('Album Cover', ''),
+            "coverThumb": thumbnail_url(cover_service, row.get('Album', ''), row.get('Artist', '')),
+            "status": status,
+            "change": change,
+            
+            # --- NEW METRICS ---
+            "points": parse_num('Total Weighted Points'),
+            "pointsPct": row.get('%', '-'), # Keep as string to handle "--" or formatting
             
-            chart_data["songs"].append(song_entry)
+            "peak": row.get('Peak', '-'),
+            "peakStreak": row.get('Peak Streak', ''), # For the blue "4x" text
+            "woc": row.get('WOC', '-'),
+            
+            "sales": parse_num('Sales Units'),
+            "salesPct": row.get('Sales %', ''),
+            
+            "streams": parse_num('Streams Units'),
+            "streamsPct": row.get('Streams %', ''),
+            
+            "airplay": parse_num('Airplay Units'),
+            "airplayPct": row.get('Airplay %', ''),
+            
+            "units": parse_num('Total Units')
+        }
+        
+        chart_data["songs"].append(song_entry)
 
     chart_data["songs"].sort(key=lambda x: x["rank"])
     
@@ -85,5 +98,12 @@ def convert_csv_to_json():
         json.dump(chart_data, f, indent=2)
         print(f"Success! Exported {len(chart_data['songs'])} songs with detailed metrics.")
 
+def thumbnail_url(cover_service, album, artist):
+    """site path of the mirrored thumbnail, "" when the cover is not mirrored"""
+    path = cover_service.get_thumbnail_path(album, artist, THUMBNAIL_SIZE)
+    if not path:
+        return ""
+    return "/" + os.path.relpath(path, PUBLIC_DIR).replace(os.sep, "/")
+
 if __name__ == "__main__":
     convert_csv_to_json()
\ No newline at end of file
@@ -1,3 +1,11 @@
+import csv
+import os
+
+def _build_rise_fall_lookup(limit=1000):
+    """format_rise_fall result for every value a chart can contain"""
+    values = ["", "=", "NEW", "RE"] + [str(n) for n in range(-limit, limit + 1)]
+    return {value: SpreadsheetFormatter.format_rise_fall(value) for value in values}
+
 class SpreadsheetFormatter:
     """formats chart data for spreadsheet applications (Google Sheets, Excel)"""
     
@@ -30,9 +38,60 @@ class SpreadsheetFormatter:
     @staticmethod
     def add_album_covers(chart_data, album_cover_service):
         """add album cover urls to chart data"""
+        album_cover_service.prefetch(
+            (entry.get('Album', ''), entry.get('Artist', '')) for entry in chart_data
+        )
+        
         for entry in chart_data:
             album = entry.get('Album', '')
             artist = entry.get('Artist', '')
             entry['Album Cover'] = album_cover_service.get_cover_url(album, artist)
         
-        return chart_data
\ No newline at end of file
+        return chart_data
+
+    @staticmethod
+    def format_rise_fall_fast(value):
+        """format_rise_fall through the precomputed lookup"""
+        formatted = RISE_FALL.get(value)
+        if formatted is None:
+            return SpreadsheetFormatter.format_rise_fall(value)
+        return formatted
+
+    @staticmethod
+    def format_chart_file(input_path, output_path, covers, chart_limit=100):
+        """stream a weekly points csv into its spreadsheet version, returns rows written"""
+        # covers maps (album, artist) to a cover url, Album Cover becomes the last column
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+        with open(input_path, 'r', encoding='utf-8', newline='') as src:
+            reader = csv.reader(src)
+            header = next(reader, None)
+            if header is None:
+                return 0
+
+            keep = [i for i, name in enumerate(header) if name != 'Album Cover']
+            rise_fall = header.index('Rise/Fall') if 'Rise/Fall' in header else None
+            album = header.index('Album')
+            artist = header.index('Artist')
+            format_rise_fall = SpreadsheetFormatter.format_rise_fall_fast
+
+            written = 0
+            with open(output_path, 'w', encoding='utf-8', newline='') as dst:
+                writer = csv.writer(dst)
+                for row in reader:
+                    if written == 0:
+                        writer.writerow([header[i] for i in keep] + ['Album Cover'])
+                    if written == chart_limit:
+                        break
+
+                    if rise_fall is not None:
+                        row[rise_fall] = format_rise_fall(row[rise_fall])
+                    cover_url = covers.get((row[album], row[artist]), "")
+                    writer.writerow([row[i] for i in keep] + [cover_url])
+                    written += 1
+
+        if written == 0:
+            os.remove(output_path)
+        return written
+
+RISE_FALL = _build_rise_fall_lookup()
@@ -1,15 +1,20 @@
+import os
+
+from config import DATA_DIR, EXPORT_FILE, TIME_OFFSET_HOURS
 from services.lastfm_parser import LastFmParser
 
-def main():
-    input_file = '/home/ptrn23/personal-hot-100/scripts/ptrn23.csv'
-    output_folder = '/home/ptrn23/personal-hot-100/scripts/data/'
-    
-    parser = LastFmParser(time_offset_hours=8)
-    num_years, num_invalid = parser.parse_and_split(input_file, output_folder)
+def split_export(input_file=EXPORT_FILE, output_folder=DATA_DIR, time_offset_hours=TIME_OFFSET_HOURS):
+    """split the last.fm export into one csv per year"""
+    os.makedirs(output_folder, exist_ok=True)
+    parser = LastFmParser(time_offset_hours=time_offset_hours)
+    num_years, num_invalid = parser.parse_and_split(input_file, os.path.join(output_folder, ''))
     
     print(f"Data split into {num_years} year file(s) in '{output_folder}' directory.")
     if num_invalid > 0:
         print(f"Warning: {num_invalid} rows had invalid timestamps.")
 
+def main():
+    split_export()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
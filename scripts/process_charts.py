@@ -1,15 +1,17 @@
-import csv
-import os
-from datetime import datetime
-from collections import defaultdict
-from key import API_KEY, API_SECRET
-from points.album_cover import get_album_cover, get_dominant_color, rgb_to_hex
-
-YEAR = 2025
-POINTS_DIR = f'points/{YEAR}'
-OUTPUT_FILE = f'charts/{YEAR}.csv'
-COLORS_FILE = f'colors/{YEAR}_colors.txt'
-ALBUM_COVERS_FILE = "album_covers.csv"
+from services.album_color_service import AlbumColorService, DEFAULT_COLOR
+from services.album_cover_service import AlbumCoverService
+from services.cover_mirror import CoverMirror
+from services.report_engine import ReportEngine
+from reports.flourish_pivot_report import FlourishPivotReport
+
+START_YEAR = 2025
+END_YEAR = 2025
+START_WEEK = f"{START_YEAR}-01-01"
+END_WEEK = f"{END_YEAR}-12-31"
+POINTS_DIR = 'points'
+CHART_NAME = f"{START_YEAR}" if START_YEAR == END_YEAR else f"{START_YEAR}-{END_YEAR}"
+OUTPUT_FILE = f'charts/{CHART_NAME}.csv'
+COLORS_FILE = f'colors/{CHART_NAME}_colors.txt'
 
 INCLUDED_ARTISTS = ["ALL"]
 INCLUDED_ALBUMS = ["ALL"]
@@ -40,109 +42,47 @@ INCLUDED_TRACKS = [
 ]
 
 GENERATE_COLORS = False
-
-def load_album_cover_cache():
-    album_cover_cache = {}
-    if os.path.exists(ALBUM_COVERS_FILE):
-        with open(ALBUM_COVERS_FILE, "r", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            next(reader)
-            for row in reader:
-                album, artist, cover_url = row
-                album_cover_cache[(album, artist)] = cover_url
-    return album_cover_cache
-
-def save_album_cover_cache(album_cover_cache):
-    with open(ALBUM_COVERS_FILE, "w", encoding="utf-8", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(['Album', 'Artist', 'Cover URL'])
-        for (album, artist), cover_url in album_cover_cache.items():
-            writer.writerow([album, artist, cover_url])
-
-def format_week(week_str):
-    dt = datetime.strptime(f"{YEAR}-{week_str}", "%Y-%m-%d")
-    return dt.strftime("%y-%m-%d")
-
-weekly_data = defaultdict(list)
-weeks = []
-
-for week_file in sorted(os.listdir(POINTS_DIR)):
-    if not week_file.endswith(".csv"):
-        continue
-
-    week_str = week_file.replace(".csv", "")
-    formatted_week = format_week(week_str)
-    weeks.append(formatted_week)
-
-    week_path = os.path.join(POINTS_DIR, week_file)
-    with open(week_path, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            weekly_data[formatted_week].append((
-                row['Song'],
-                row['Artist'],
-                row['Album'],
-                int(row['Position'])
-            ))
-
-flourish_data = defaultdict(lambda: {"positions": [""] * len(weeks), "album": ""})
-
-for week_idx, week in enumerate(weeks):
-    for song, artist, album, position in weekly_data[week]:
-        key = (song, artist)
-        flourish_data[key]["positions"][week_idx] = position
-        if flourish_data[key]["album"] == "":
-            flourish_data[key]["album"] = album
-
-with open(OUTPUT_FILE, 'w', encoding='utf-8', newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow(["Song Name", "Artist Name", "Album Name", "Image Link"] + weeks)
-    
-    album_cover_cache = load_album_cover_cache()
-
-    for (song, artist), data in flourish_data.items():
-        album = data["album"]
-        if ("ALL" in INCLUDED_ARTISTS or artist in INCLUDED_ARTISTS) and \
-           ("ALL" in INCLUDED_ALBUMS or album in INCLUDED_ALBUMS) and \
-           ("ALL" in INCLUDED_TRACKS or song in INCLUDED_TRACKS):
-
-            key = (album, artist)
-            
-            if key in album_cover_cache:
-                cover_url = album_cover_cache[key]
-            else:
-                cover_url = get_album_cover(album, artist)
-                album_cover_cache[key] = cover_url
-
-            writer.writerow([song, artist, album, cover_url] + data["positions"])
-
-print(f"Chart data saved to {OUTPUT_FILE}")
-
-save_album_cover_cache(album_cover_cache)
-
-if GENERATE_COLORS:
-    album_color_cache = {}
-    album_cover_cache = load_album_cover_cache()
+# keep local copies and thumbnails of every cover, colors are then computed from disk
+MIRROR_COVERS = False
+COVERS_DIR = '../public/covers'
+
+def main():
+    cover_service = AlbumCoverService(mirror=CoverMirror(COVERS_DIR) if MIRROR_COVERS else None)
+    years = range(START_YEAR, END_YEAR + 1)
+    engine = ReportEngine(points_root=POINTS_DIR, years=years, cover_service=cover_service)
+    pivot = engine.add(FlourishPivotReport(
+        START_WEEK, END_WEEK, OUTPUT_FILE,
+        included_artists=INCLUDED_ARTISTS,
+        included_albums=INCLUDED_ALBUMS,
+        included_tracks=INCLUDED_TRACKS
+    ))
+    engine.run()
+
+    if GENERATE_COLORS:
+        write_colors(pivot, cover_service)
+
+def write_colors(pivot, cover_service):
+    color_service = AlbumColorService()
+
+    songs = pivot.included_songs()
+    cover_urls = {
+        (album, artist): cover_service.cache.get((album, artist))
+        for _, song, artist, album in songs
+    }
+    local_paths = {
+        cover_urls[key]: cover_service.get_local_path(*key)
+        for key in cover_urls if cover_urls[key]
+    }
+    colors = color_service.get_colors(cover_urls.values(), local_paths)
+    color_service.save_cache()
 
     with open(COLORS_FILE, 'w', encoding='utf-8') as f:
-        for (song, artist), data in flourish_data.items():
-            album = data["album"]
-
-            if ("ALL" in INCLUDED_ARTISTS or artist in INCLUDED_ARTISTS) and \
-                ("ALL" in INCLUDED_ALBUMS or album in INCLUDED_ALBUMS) and \
-                ("ALL" in INCLUDED_TRACKS or song in INCLUDED_TRACKS):
-
-                if album in album_color_cache:
-                    hex_color = album_color_cache[album]
-                else:
-                    cover_url = album_cover_cache.get((album, artist))
-                    if cover_url:
-                        dominant_rgb = get_dominant_color(cover_url)
-                        hex_color = rgb_to_hex(dominant_rgb)
-                        album_color_cache[album] = hex_color
-                    else:
-                        hex_color = "#ffffff"
+        for _, song, artist, album in songs:
+            cover_url = cover_urls[(album, artist)]
+            hex_color = colors[cover_url] if cover_url else DEFAULT_COLOR
+            f.write(f"{song}: {hex_color}\n")
 
-                f.write(f"{song}: {hex_color}\n")
+    print(f"Colors file saved to {COLORS_FILE}")
 
-    print(f"Colors file saved to {COLORS_FILE}")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
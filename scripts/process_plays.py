@@ -1,11 +1,16 @@
+import os
+
+from config import DATA_DIR, PLAYS_DIR, YEARS
 from services.plays_aggregator import PlaysAggregator
 
-def main():
-    years = [str(year) for year in range(2020, 2027)]
-    
+def aggregate_plays(years=YEARS, data_folder=DATA_DIR, output_root=PLAYS_DIR):
+    """aggregate yearly play files into one csv of song stats per chart week"""
     aggregator = PlaysAggregator()
-    aggregator.process_years(years, data_folder='/home/ptrn23/personal-hot-100/scripts/data/')
-    aggregator.save_weekly_files(output_root='/home/ptrn23/personal-hot-100/scripts/plays/')
+    aggregator.process_years(years, data_folder=os.path.join(data_folder, ''))
+    aggregator.save_weekly_files(output_root=output_root)
+
+def main():
+    aggregate_plays()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,57 +1,181 @@
+import argparse
 import os
 import csv
 from datetime import datetime
 
+from config import (CHART_LIMIT, CHARTED_CACHE_FILE, NUMBER_ONES_FILE, PLAYS_DIR, POINTS_CHECKPOINT_DIR,
+                    POINTS_DIR, POINTS_JOURNAL_FILE, YEARS)
 from services.points_calculator import PointsCalculator
 from services.chart_builder import ChartBuilder
 from repositories.chart_repository import ChartRepository
+from services.instrumentation import get_metrics
+from services.memory_profile import MemoryProfiler
+from services.rebuild_journal import RebuildJournal, file_digest
 from models.weekly_play import WeeklyPlay
 from models.song import Song
 
-def main():
-    years = [str(year) for year in range(2020, 2027)]
-    chart_limit = 100
-    charted_cache_file = "/home/ptrn23/personal-hot-100/scripts/points/ever_charted.csv"
-    
-    # initialize services
-    calculator = PointsCalculator()
-    builder = ChartBuilder(calculator, chart_limit)
-    builder.load_charted_cache(charted_cache_file)
-    
-    # process each year
+# set to n to snapshot builder memory with tracemalloc every n weeks (slow, for profiling only)
+MEMORY_PROFILE_EVERY = None
+MEMORY_PROFILE_FILE = os.path.join(POINTS_DIR, "memory_profile.csv")
+# weeks between builder checkpoints an interrupted rebuild can resume from, and how many of the latest are kept
+CHECKPOINT_EVERY = 26
+CHECKPOINTS_KEPT = 3
+
+def list_weeks(years=YEARS, plays_root=PLAYS_DIR, points_root=POINTS_DIR):
+    """[(week key, plays file, points file)] of every week to build, in chart order"""
+    weeks = []
     for year in years:
-        plays_dir = f"/home/ptrn23/personal-hot-100/scripts/plays/{year}"
-        points_dir = f"/home/ptrn23/personal-hot-100/scripts/points/{year}"
-        os.makedirs(points_dir, exist_ok=True)
+        plays_dir = os.path.join(plays_root, year)
         
         if not os.path.exists(plays_dir):
             continue
         
-        # process each week
         for filename in sorted(os.listdir(plays_dir)):
             if not filename.endswith(".csv"):
                 continue
             
-            filepath = os.path.join(plays_dir, filename)
             week_str = filename.replace(".csv", "")
             week_date = datetime.strptime(f"{year}-{week_str}", "%Y-%m-%d")
-            week_key = week_date.strftime("%Y-%m-%d")
+            weeks.append((
+                week_date.strftime("%Y-%m-%d"),
+                os.path.join(plays_dir, filename),
+                os.path.join(points_root, year, f"{week_str}.csv")
+            ))
+    return weeks
+
+def stray_outputs(weeks, years=YEARS, plays_root=PLAYS_DIR, points_root=POINTS_DIR):
+    """points files without a plays week behind them and temp files left by an interrupted write
+
+    only years with a plays folder are looked at, points of a year whose plays are gone are kept as history
+    """
+    expected = {points_file for _, _, points_file in weeks}
+    stray = []
+    for year in years:
+        points_dir = os.path.join(points_root, year)
+        if not os.path.isdir(os.path.join(plays_root, year)) or not os.path.isdir(points_dir):
+            continue
+        for filename in sorted(os.listdir(points_dir)):
+            path = os.path.join(points_dir, filename)
+            if filename.endswith(".tmp") or (filename.endswith(".csv") and path not in expected):
+                stray.append(path)
+    return stray
+
+def build_points(years=YEARS, plays_root=PLAYS_DIR, points_root=POINTS_DIR, chart_limit=CHART_LIMIT,
+                 charted_cache_file=CHARTED_CACHE_FILE, number_ones_file=NUMBER_ONES_FILE,
+                 journal_file=POINTS_JOURNAL_FILE, checkpoint_dir=POINTS_CHECKPOINT_DIR, fresh=False, repair=False):
+    """replay every week of plays into weekly points files, the charted cache and the #1 ledger
+
+    weeks whose plays and points files still match the journal of the last run are not rewritten,
+    and building resumes from the latest checkpoint before the first week that does not,
+    stray outputs are only reported unless repair is set
+    """
+    # initialize services
+    metrics = get_metrics()
+    calculator = PointsCalculator()
+    builder = ChartBuilder(calculator, chart_limit)
+    builder.load_charted_cache(charted_cache_file)
+    
+    weeks = list_weeks(years, plays_root, points_root)
+    for year in years:
+        os.makedirs(os.path.join(points_root, year), exist_ok=True)
+    for path in stray_outputs(weeks, years, plays_root, points_root):
+        if repair:
+            os.remove(path)
+            print(f"Removed stray output: {path}")
+        else:
+            print(f"Stray output: {path}, run with --repair to remove it")
+    
+    with metrics.stage("fingerprint"):
+        fingerprints = [(week_key, file_digest(plays_file), file_digest(points_file))
+                        for week_key, plays_file, points_file in weeks]
+    journal = RebuildJournal(journal_file, checkpoint_dir, {"chart_limit": chart_limit}, CHECKPOINT_EVERY,
+                             CHECKPOINTS_KEPT)
+    state, first_week, first_write = None, 0, 0
+    if not fresh:
+        journal.load()
+        state, first_week, first_write = journal.resume(fingerprints)
+    if state is not None:
+        builder.set_state(state)
+        print(f"Resuming after {weeks[first_week - 1][0]}, {first_write} of {len(weeks)} weeks already up to date")
+    journal.start(first_week)
+    # the ledger is cut back to the weeks the builder resumes after, then grows with every week built
+    ChartRepository.save_number_ones_ledger(builder.number_ones_ledger, number_ones_file)
+    
+    profiler = None
+    if MEMORY_PROFILE_EVERY:
+        profiler = MemoryProfiler(builder, MEMORY_PROFILE_EVERY, MEMORY_PROFILE_FILE)
+        profiler.start()
+    week_key = None
+    
+    try:
+        # process each week
+        for index in range(first_week, len(weeks)):
+            week_key, filepath, output_file = weeks[index]
             
             # load weekly plays
-            weekly_plays = load_weekly_plays(filepath, week_key)
+            with metrics.stage("load_plays", week=week_key):
+                weekly_plays = load_weekly_plays(filepath, week_key)
             
             # build chart
+            ledger_size = len(builder.number_ones_ledger)
             chart_entries = builder.build_weekly_chart(weekly_plays, week_key)
             
-            # save chart
-            output_file = os.path.join(points_dir, f"{week_str}.csv")
-            ChartRepository.save_weekly_chart(chart_entries, output_file)
+            # save chart, weeks before the first dirty one are already on disk as built
+            points_digest = fingerprints[index][2]
+            if index >= first_write:
+                with metrics.stage("write_points", week=week_key):
+                    ChartRepository.save_weekly_chart(chart_entries, output_file)
+                    points_digest = file_digest(output_file)
+            with metrics.stage("journal", week=week_key):
+                ChartRepository.append_number_ones_ledger(builder.number_ones_ledger[ledger_size:], number_ones_file)
+                journal.week_done(week_key, fingerprints[index][1], points_digest, builder)
             
-            # print(f"Saved weekly points: {week_str}-{year}")
+            if profiler:
+                profiler.week_done(week_key)
+    finally:
+        journal.close()
+    
+    if profiler:
+        profiler.stop(week_key)
     
     # save charted cache
     ChartRepository.save_charted_cache(builder.charted_cache, charted_cache_file)
     print(f"Updated charted history cache: {charted_cache_file}")
+    print(f"Updated #1 ledger: {number_ones_file}")
+
+def check_points(years=YEARS, plays_root=PLAYS_DIR, points_root=POINTS_DIR, chart_limit=CHART_LIMIT,
+                 journal_file=POINTS_JOURNAL_FILE, checkpoint_dir=POINTS_CHECKPOINT_DIR):
+    """report what a rebuild would redo without touching anything, returns whether the tree is consistent"""
+    weeks = list_weeks(years, plays_root, points_root)
+    fingerprints = [(week_key, file_digest(plays_file), file_digest(points_file))
+                    for week_key, plays_file, points_file in weeks]
+    journal = RebuildJournal(journal_file, checkpoint_dir, {"chart_limit": chart_limit}, CHECKPOINT_EVERY,
+                             CHECKPOINTS_KEPT)
+    journal.load()
+    state, first_week, first_write = journal.resume(fingerprints)
+    stray = stray_outputs(weeks, years, plays_root, points_root)
+    
+    for path in stray:
+        print(f"Stray output: {path}")
+    if first_write < len(weeks):
+        week_key, plays_digest, points_digest = fingerprints[first_write]
+        reason = "missing" if points_digest is None else "not in the journal or changed since"
+        print(f"{first_write} of {len(weeks)} weeks up to date, {week_key} onward needs rebuilding ({reason}), "
+              f"building would resume from " + (weeks[first_week - 1][0] if state is not None else "the start"))
+    else:
+        print(f"All {len(weeks)} weeks up to date")
+    return first_write == len(weeks) and not stray
+
+def main():
+    parser = argparse.ArgumentParser(description="build weekly points from weekly plays, resuming an interrupted rebuild")
+    parser.add_argument("--fresh", action="store_true", help="ignore the journal and checkpoints and rebuild every week")
+    parser.add_argument("--check", action="store_true", help="only report weeks that are missing, stale or half-written")
+    parser.add_argument("--repair", action="store_true", help="remove stray points and temp files instead of reporting them")
+    args = parser.parse_args()
+    
+    if args.check:
+        raise SystemExit(0 if check_points() else 1)
+    build_points(fresh=args.fresh, repair=args.repair)
 
 def load_weekly_plays(filepath, week_key):
     """load weekly play data from CSV"""
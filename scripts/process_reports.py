@@ -0,0 +1,42 @@
+from services.report_engine import ReportEngine
+from reports.all_time_report import AllTimeReport
+from reports.year_end_report import YearEndReport
+from reports.number_ones_report import NumberOnesSummaryReport, YearlyNumberOnesReport
+from reports.updates_report import UpdatesReport
+from reports.flourish_pivot_report import FlourishPivotReport
+from process_charts import INCLUDED_ARTISTS, INCLUDED_ALBUMS, INCLUDED_TRACKS
+
+YEARS = [str(year) for year in range(2020, 2027)]
+REPORT_YEAR = "2025"
+CHART_LIMIT = 100
+
+def main():
+    """build every report from a single scan of the points history"""
+    engine = ReportEngine(points_root="points", years=YEARS)
+
+    engine.add(AllTimeReport(
+        output_file="points/all_time.csv",
+        chart_limit=CHART_LIMIT,
+        state_file="points/all_time_state.pkl"
+    ))
+    engine.add(NumberOnesSummaryReport(ledger_file="points/number_ones.csv", output_file="number_ones.txt"))
+    engine.add(YearlyNumberOnesReport(REPORT_YEAR, ledger_file="points/number_ones.csv", output_dir="weekly_charts"))
+    engine.add(UpdatesReport(REPORT_YEAR, output_dir="updates", chart_limit=CHART_LIMIT))
+    engine.add(FlourishPivotReport(
+        f"{REPORT_YEAR}-01-01", f"{REPORT_YEAR}-12-31", f"charts/{REPORT_YEAR}.csv",
+        included_artists=INCLUDED_ARTISTS,
+        included_albums=INCLUDED_ALBUMS,
+        included_tracks=INCLUDED_TRACKS
+    ))
+    for year in YEARS:
+        engine.add(YearEndReport(
+            year,
+            output_dir="year_end",
+            chart_limit=CHART_LIMIT,
+            state_file=f"year_end/{year}_state.pkl"
+        ))
+
+    engine.run()
+
+if __name__ == "__main__":
+    main()
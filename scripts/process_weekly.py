@@ -1,11 +1,16 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 
+from config import CHART_LIMIT, POINTS_DIR, WEEKLY_CHARTS_DIR
 from services.album_cover_service import AlbumCoverService
 from formatters.spreadsheet_formatter import SpreadsheetFormatter
 from repositories.chart_repository import ChartRepository
+from services.instrumentation import get_metrics
 
-def process_weekly_charts(year, chart_limit=100, specific_week=None, output_dir="/home/ptrn23/personal-hot-100/scripts/weekly_charts"):
-    points_dir = f"/home/ptrn23/personal-hot-100/scripts/points/{year}"
+def process_weekly_charts(year, chart_limit=CHART_LIMIT, specific_week=None, output_dir=WEEKLY_CHARTS_DIR,
+                          max_workers=None, points_root=POINTS_DIR, weeks=None):
+    """format one year's points files into spreadsheet charts, every week unless specific_week or weeks (mm-dd) is given"""
+    points_dir = os.path.join(points_root, str(year))
     
     if not os.path.exists(points_dir):
         print(f"Points directory not found: {points_dir}")
@@ -14,55 +19,69 @@ def process_weekly_charts(year, chart_limit=100, specific_week=None, output_dir=
     os.makedirs(output_dir, exist_ok=True)
     
     # determine which files to process
-    files_to_process = _get_files_to_process(points_dir, specific_week)
+    files_to_process = _get_files_to_process(points_dir, specific_week, weeks)
     if not files_to_process:
         return
     
-    # initialize services
+    # resolve every cover up front, workers then share one read-only copy
+    metrics = get_metrics()
     cover_service = AlbumCoverService()
-    formatter = SpreadsheetFormatter()
-    
-    # process each week
+    jobs = []
+    keys = []
     for filename in files_to_process:
         week = filename.replace(".csv", "")
         input_path = os.path.join(points_dir, filename)
         output_path = os.path.join(output_dir, f"{year}_{week}.csv")
-        
-        # load chart data
-        chart_data = ChartRepository.load_weekly_chart(input_path)
-        
-        # limit to top N
-        chart_data = chart_data[:chart_limit]
-        
-        # format for spreadsheet
-        for entry in chart_data:
-            if 'Rise/Fall' in entry:
-                entry['Rise/Fall'] = formatter.format_rise_fall(entry['Rise/Fall'])
-        
-        # add album covers
-        formatter.add_album_covers(chart_data, cover_service)
-        
-        # save formatted chart
-        original_fieldnames = list(chart_data[0].keys()) if chart_data else []
-        # move Album Cover to end if it exists
-        if 'Album Cover' in original_fieldnames:
-            original_fieldnames.remove('Album Cover')
-            fieldnames = original_fieldnames + ['Album Cover']
+        jobs.append((week, input_path, output_path, chart_limit))
+
+        # only the album and artist of the charted rows, the workers parse each week in full
+        keys.extend(ChartRepository.load_cover_keys(input_path, chart_limit))
+
+    with metrics.stage("covers"):
+        try:
+            cover_service.prefetch(keys)
+            covers = {key: cover_service.get_cover_url(*key) for key in dict.fromkeys(keys)}
+        finally:
+            # keep whatever was fetched even if a lookup fails, the rerun only fetches the rest
+            cover_service.save_cache()
+            print(f"Album cover cache updated")
+
+    # a single week is not worth starting worker processes for
+    with metrics.stage("format"):
+        if len(jobs) == 1 or max_workers == 1:
+            _init_worker(covers)
+            results = map(_format_week, jobs)
+            _format_all(results, year, chart_limit)
         else:
-            fieldnames = original_fieldnames
-        
-        ChartRepository.save_formatted_chart(chart_data, output_path, fieldnames)
-        
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(covers,)) as pool:
+                _format_all(pool.map(_format_week, jobs), year, chart_limit)
+
+def _format_all(results, year, chart_limit):
+    metrics = get_metrics()
+    for week, output_path in results:
+        metrics.count_bytes(output_path, week=f"{year}-{week}")
         print(f"Top {chart_limit} chart for {week} saved to {output_path}")
-    
-    # save album cover cache
-    cover_service.save_cache()
-    print(f"Album cover cache updated")
 
-def _get_files_to_process(points_dir, specific_week):
+_covers = None
+
+def _init_worker(covers):
+    """give each worker the shared cover lookup once instead of per week"""
+    global _covers
+    _covers = covers
+
+def _format_week(job):
+    week, input_path, output_path, chart_limit = job
+    SpreadsheetFormatter.format_chart_file(input_path, output_path, _covers, chart_limit)
+    return week, output_path
+
+def _get_files_to_process(points_dir, specific_week, weeks=None):
     """determine which csv files to process"""
     all_files = [f for f in sorted(os.listdir(points_dir)) if f.endswith('.csv')]
     
+    if weeks is not None:
+        wanted = {f"{week}.csv" for week in weeks}
+        return [f for f in all_files if f in wanted]
+    
     if specific_week:
         filename = f"{specific_week}.csv"
         if filename in all_files:
@@ -79,9 +98,9 @@ def main():
     
     process_weekly_charts(
         year=year,
-        chart_limit=100,
+        chart_limit=CHART_LIMIT,
         specific_week=specific_week,
-        output_dir="/home/ptrn23/personal-hot-100/scripts/weekly_charts"
+        output_dir=WEEKLY_CHARTS_DIR
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+import os
+import csv
+
+from reports.report_accumulator import IncrementalReportAccumulator, to_int
+from reports.ranked_totals import RankedTotals
+
+class AllTimeReport(IncrementalReportAccumulator):
+    """cumulative all-time chart across every charted week"""
+
+    def __init__(self, output_file="points/all_time.csv", years=None, chart_limit=100, top_n=200,
+                 state_file=None):
+        super().__init__(state_file)
+        self.output_file = output_file
+        self.years = set(str(year) for year in years) if years else None
+        self.chart_limit = chart_limit
+        self.top_n = top_n
+        self.original_song_names = {}
+        self.all_time_data = {}
+        self.ranking = RankedTotals()
+
+    def _new_song_data(self):
+        return {
+            "streams": 0,
+            "sales": 0,
+            "airplay": 0,
+            "total_points": 0,
+            "streams_points": 0,
+            "sales_points": 0,
+            "airplay_points": 0,
+            "streams_units": 0,
+            "sales_units": 0,
+            "airplay_units": 0,
+            "streams_percent_sum": 0.0,
+            "sales_percent_sum": 0.0,
+            "airplay_percent_sum": 0.0,
+            "total_units": 0,
+            "current_week_points": 0,
+            "previous_week_points": 0,
+            "two_weeks_ago_points": 0,
+            "peak": self.chart_limit + 1,
+            "woc": 0,
+            "peak_streak": 0,
+            "album": "",
+            "weeks_count": 0,
+        }
+
+    def covers_week(self, year, week):
+        return self.years is None or year in self.years
+
+    def get_state(self):
+        return self.original_song_names, self.all_time_data, self.ranking
+
+    def set_state(self, state):
+        self.original_song_names, self.all_time_data, self.ranking = state
+
+    def apply_week(self, year, week, rows):
+        for row in rows:
+            song = row['Song']
+            artist = row['Artist']
+            key = (song.lower(), artist)
+
+            if key not in self.original_song_names:
+                self.original_song_names[key] = song
+
+            data = self.all_time_data.get(key)
+            if data is None:
+                data = self.all_time_data[key] = self._new_song_data()
+
+            if not data["album"]:
+                data["album"] = row['Album']
+
+            data["streams"] += int(row['Streams'])
+            data["sales"] += int(row['Sales'])
+            data["airplay"] += int(row['Airplay'])
+
+            data["total_points"] += int(row['Total Weighted Points'])
+
+            data["streams_points"] += int(row['Streams Points'])
+            data["sales_points"] += int(row['Sales Points'])
+            data["airplay_points"] += int(row['Airplay Points'])
+
+            data["streams_units"] += int(row['Streams Units'])
+            data["sales_units"] += int(row['Sales Units'])
+            data["airplay_units"] += int(row['Airplay Units'])
+
+            data["streams_percent_sum"] += float(row['Streams %'])
+            data["sales_percent_sum"] += float(row['Sales %'])
+            data["airplay_percent_sum"] += float(row['Airplay %'])
+
+            data["total_units"] += int(row['Total Units'])
+
+            data["current_week_points"] += int(row['Current Week Points'])
+            data["previous_week_points"] += int(row['Previous Week Points'])
+            data["two_weeks_ago_points"] += int(row['Two Weeks Ago Points'])
+
+            data["peak"] = to_int(row['Peak'], self.chart_limit + 1)
+            data["woc"] = to_int(row['WOC'])
+            data["peak_streak"] = to_int(row['Peak Streak'])
+
+            data["weeks_count"] += 1
+
+            self.ranking.update(key, data["total_points"])
+
+    def cover_keys(self):
+        return [(self.all_time_data[key]["album"], key[1]) for key in self.ranking.top(self.top_n)]
+
+    def finish(self, cover_service):
+        os.makedirs(os.path.dirname(self.output_file) or ".", exist_ok=True)
+        with open(self.output_file, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                'Position', 'Song', 'Artist', 'Album', 'Total Weighted Points',
+                'Streams', 'Sales', 'Airplay',
+                'Streams Points', 'Sales Points', 'Airplay Points',
+                'Streams Units', 'Sales Units', 'Airplay Units',
+                'Avg Streams %', 'Avg Sales %', 'Avg Airplay %',
+                'Total Units',
+                'Total Current Week Points', 'Sum Previous Week Points', 'Sum Two Weeks Ago Points',
+                'Peak', 'Weeks On Chart', 'Peak Streak', 'Album Cover'
+            ])
+
+            for rank, key in enumerate(self.ranking.top(self.top_n), start=1):
+                data = self.all_time_data[key]
+                song_lower, artist = key
+                song = self.original_song_names.get(key, song_lower)
+
+                # average %s over weeks
+                weeks_count = data["weeks_count"]
+                avg_streams_percent = round(data["streams_percent_sum"] / weeks_count, 4) if weeks_count else 0
+                avg_sales_percent = round(data["sales_percent_sum"] / weeks_count, 4) if weeks_count else 0
+                avg_airplay_percent = round(data["airplay_percent_sum"] / weeks_count, 4) if weeks_count else 0
+
+                album = data["album"]
+                album_cover = cover_service.get_cover_url(album, artist)
+
+                writer.writerow([
+                    rank,
+                    song,
+                    artist,
+                    album,
+                    data["total_points"],
+                    data["streams"],
+                    data["sales"],
+                    data["airplay"],
+                    data["streams_points"],
+                    data["sales_points"],
+                    data["airplay_points"],
+                    data["streams_units"],
+                    data["sales_units"],
+                    data["airplay_units"],
+                    avg_streams_percent,
+                    avg_sales_percent,
+                    avg_airplay_percent,
+                    data["total_units"],
+                    data["current_week_points"],
+                    data["previous_week_points"],
+                    data["two_weeks_ago_points"],
+                    data["peak"],
+                    data["woc"],
+                    data["peak_streak"],
+                    album_cover,
+                ])
+
+        self.save_state()
+        print(f"Saved all-time cumulative data from points CSV: {self.output_file}")
@@ -0,0 +1,166 @@
+import gzip
+import json
+import os
+
+from repositories.chart_repository import ChartRepository
+from reports.json_api_report import chart_entry, chart_status, write_json
+from reports.report_accumulator import IncrementalReportAccumulator, to_int
+
+try:
+    import brotli
+except ImportError:  # .br variants are skipped without the brotli package
+    brotli = None
+
+# per-week fields carried in an encoded row after the song id; status and change are derived
+ROW_FIELDS = [
+    "rank", "lastWeek", "points", "pointsPct", "peak", "peakStreak", "isNewPeak", "isRePeak", "woc",
+    "streamsUnits", "streamsPct", "salesUnits", "salesPct", "airplayUnits", "airplayPct", "units"
+]
+SONG_FIELDS = ["title", "artist", "album", "coverUrl"]
+
+def encode_row(song_id, entry):
+    return [song_id] + [entry[field] for field in ROW_FIELDS]
+
+def encode_week(week_id, previous, current):
+    """delta of one week's {song id: row} against the previous week's"""
+    return {
+        "week": week_id,
+        "exits": sorted(song_id for song_id in previous if song_id not in current),
+        # new entries plus every row where anything moved
+        "changed": sorted(
+            (row for song_id, row in current.items() if previous.get(song_id) != row),
+            key=lambda row: row[1]
+        ),
+    }
+
+def decode_weeks(bundle):
+    """yield (week, [row]) for every week in a year bundle, replaying the deltas in order"""
+    rows = {}
+    for week in bundle["weeks"]:
+        for song_id in week["exits"]:
+            del rows[song_id]
+        for row in week["changed"]:
+            rows[row[0]] = row
+        yield week["week"], sorted(rows.values(), key=lambda row: row[1])
+
+def expand_row(row, songs):
+    """a decoded row as the same entry dict the json api serves, minus its song id"""
+    entry = dict(zip(SONG_FIELDS, songs[row[0]]))
+    entry.update(zip(ROW_FIELDS, row[1:]))
+    entry["status"], entry["change"] = chart_status(entry["rank"], entry["lastWeek"], entry["woc"])
+    return entry
+
+def write_compressed(path, data):
+    """minified json plus precompressed .gz (and .br when available) variants, returns whether it wrote"""
+    if not write_json(path, data):
+        return False
+
+    with open(path, 'rb') as f:
+        payload = f.read()
+
+    # mtime=0 keeps the .gz byte-identical for identical json
+    with open(f"{path}.gz.tmp", 'wb') as f:
+        f.write(gzip.compress(payload, compresslevel=9, mtime=0))
+    os.replace(f"{path}.gz.tmp", f"{path}.gz")
+
+    if brotli is not None:
+        with open(f"{path}.br.tmp", 'wb') as f:
+            f.write(brotli.compress(payload, quality=11))
+        os.replace(f"{path}.br.tmp", f"{path}.br")
+    return True
+
+def load_bundle(path):
+    """read a year bundle or song dictionary back from its .gz variant"""
+    with gzip.open(f"{path}.gz", 'rb') as f:
+        return json.loads(f.read().decode("utf-8"))
+
+class DeltaChartReport(IncrementalReportAccumulator):
+    """compact chart history for the site: a song dictionary plus one delta-encoded bundle per year"""
+
+    def __init__(self, output_dir="../public/data/delta", chart_limit=100, state_file=None):
+        super().__init__(state_file)
+        self.output_dir = output_dir
+        self.chart_limit = chart_limit
+
+        self.song_ids = {}   # {(song, artist, album): index into songs.json}
+        self.years = {}      # {year: [encoded week]}
+        self.previous = {}   # {song id: row} for the last applied week
+        self.dirty_years = set()
+
+    def get_state(self):
+        return self.song_ids, self.years, self.previous
+
+    def set_state(self, state):
+        self.song_ids, self.years, self.previous = state
+
+    def apply_week(self, year, week, rows):
+        # every year bundle opens with a full week so years decode independently
+        if year not in self.years:
+            self.years[year] = []
+            self.previous = {}
+
+        current = {}
+        for row in rows:
+            if to_int(row["Position"]) > self.chart_limit:
+                continue
+
+            key = (row["Song"], row["Artist"], row["Album"])
+            song_id = self.song_ids.get(key)
+            if song_id is None:
+                song_id = self.song_ids[key] = len(self.song_ids)
+            current[song_id] = encode_row(song_id, chart_entry(row))
+
+        self.years[year].append(encode_week(f"{year}-{week}", self.previous, current))
+        self.previous = current
+        self.dirty_years.add(year)
+
+    def cover_keys(self):
+        return [(album, artist) for _, artist, album in self.song_ids]
+
+    def song_table(self, cover_service):
+        """songs.json rows in id order"""
+        songs = [None] * len(self.song_ids)
+        for (song, artist, album), song_id in self.song_ids.items():
+            songs[song_id] = [song, artist, album, cover_service.get_cover_url(album, artist)]
+        return songs
+
+    def finish(self, cover_service):
+        written = int(write_compressed(os.path.join(self.output_dir, "songs.json"), {
+            "fields": SONG_FIELDS,
+            "songs": self.song_table(cover_service),
+        }))
+
+        for year in sorted(self.dirty_years):
+            written += write_compressed(os.path.join(self.output_dir, f"{year}.json"), {
+                "year": year,
+                "fields": ["song"] + ROW_FIELDS,
+                "weeks": self.years[year],
+            })
+
+        self.save_state()
+        print(f"Delta charts: {len(self.dirty_years)} year bundle(s) updated, "
+              f"{written} file(s) written to {self.output_dir}")
+
+def verify_delta_export(engine, output_dir, chart_limit=100):
+    """decode every year bundle from its .gz variant and check each week against the points files, returns mismatched weeks"""
+    songs = load_bundle(os.path.join(output_dir, "songs.json"))["songs"]
+    decoded = {}
+    for year in {year for year, _, _ in engine.iter_weeks()}:
+        for week_id, rows in decode_weeks(load_bundle(os.path.join(output_dir, f"{year}.json"))):
+            decoded[week_id] = [expand_row(row, songs) for row in rows]
+
+    mismatched = []
+    for year, week, filepath in engine.iter_weeks():
+        expected = [
+            chart_entry(row) for row in ChartRepository.load_weekly_rows(filepath)
+            if to_int(row["Position"]) <= chart_limit
+        ]
+        actual = decoded.get(f"{year}-{week}", [])
+        for entry in actual:
+            entry.pop("coverUrl")
+
+        if actual != expected:
+            mismatched.append(f"{year}-{week}")
+
+    print(f"Verified {len(decoded)} decoded week(s), {len(mismatched)} mismatch(es)")
+    return mismatched
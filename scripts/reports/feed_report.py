@@ -0,0 +1,231 @@
+import os
+
+from reports.report_accumulator import ReportAccumulator
+
+MILESTONE_WEEKS = {20, 30, 40, 50, 60, 70, 80, 90, 100}
+SPECIAL_MILESTONES = {52: "one year", 104: "two years"}
+REENTRY_LABELS = {"RE", "RE-ENTRY", "REENTRY"}
+
+def ordinal(n):
+    if 10 <= n % 100 <= 20:
+        suffix = 'th'
+    else:
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f"{n}{suffix}"
+
+def try_parse_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def try_parse_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_row(row):
+    """typed fields every feed rule reads, parsed once per chart row"""
+    rise_fall = str(row["Rise/Fall"])
+    return {
+        'song': row["Song"],
+        'artist': row["Artist"],
+        'position_text': str(row["Position"]),
+        'position': try_parse_int(row["Position"]),
+        'previous_rank': try_parse_int(row["Previous Rank"]),
+        'rise_fall_label': rise_fall.strip().upper(),
+        'rise_fall': try_parse_int(rise_fall),
+        'new_peak': str(row["New Peak?"]).strip().lower() == "true",
+        'percent': try_parse_float(row["%"]),
+        'points': try_parse_float(row["Total Weighted Points"]),
+        'peak': try_parse_int(row["Peak"]),
+        'peak_streak': try_parse_int(row["Peak Streak"]),
+        'woc': try_parse_int(row["WOC"]),
+    }
+
+def spots(n):
+    return f'{n} spot{"s" if n != 1 else ""}'
+
+class FeedReport(ReportAccumulator):
+    """news feed lines for every week in a range, one text file per week"""
+
+    def __init__(self, chart_name, start_week=None, end_week=None, output_dir="feeds"):
+        self.chart_name = chart_name
+        self.start_week = start_week
+        self.end_week = end_week
+        self.output_dir = output_dir
+        self.weeks_written = 0
+        self.lines_written = 0
+
+    def wants_week(self, year, week):
+        week_key = f"{year}-{week}"
+        return (self.start_week is None or week_key >= self.start_week) and \
+               (self.end_week is None or week_key <= self.end_week)
+
+    def add_week(self, year, week, rows):
+        lines = self.feed_lines(rows)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        output_path = os.path.join(self.output_dir, f"{year}_{week}.txt")
+        with open(output_path, "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(line + "\n")
+
+        self.weeks_written += 1
+        self.lines_written += len(lines)
+
+    def finish(self, cover_service):
+        print(f"Feeds written to {self.output_dir} for {self.weeks_written} week(s) "
+              f"with {self.lines_written} update(s).")
+
+    def feed_lines(self, rows):
+        """every feed line for one week, evaluating all rules in a single pass over the chart"""
+        lines = []
+
+        # the max / min keys match the original per-rule passes, first extreme wins
+        percentage_gainer = position_gainer = percentage_faller = position_faller = None
+        inf = float('inf')
+
+        for row in rows:
+            entry = parse_row(row)
+
+            line = self.format_row_update(entry)
+            if line:
+                lines.append(line)
+
+            line = self.format_milestone_weeks(entry)
+            if line:
+                lines.append(line)
+
+            percent = entry['percent'] or 0
+            if percentage_gainer is None or percent > percentage_gainer[0]:
+                percentage_gainer = (percent, entry)
+
+            percent = entry['percent'] or inf
+            if percentage_faller is None or percent < percentage_faller[0]:
+                percentage_faller = (percent, entry)
+
+            rise_fall = entry['rise_fall'] or 0
+            if position_gainer is None or rise_fall > position_gainer[0]:
+                position_gainer = (rise_fall, entry)
+            if position_faller is None or rise_fall < position_faller[0]:
+                position_faller = (rise_fall, entry)
+
+        if percentage_gainer is None:
+            return lines
+
+        for line in (
+            self.format_biggest_percentage_gainer(percentage_gainer[1]),
+            self.format_biggest_position_gainer(position_gainer[1]),
+            self.format_biggest_percentage_faller(percentage_faller[1]),
+            self.format_biggest_position_faller(position_faller[1]),
+        ):
+            if line:
+                lines.append(line)
+
+        return lines
+
+    def format_row_update(self, entry):
+        """the single headline update for a chart row, in rule priority order"""
+        rise_fall_label = entry['rise_fall_label']
+
+        if rise_fall_label == "NEW":
+            return self.format_debut(entry)
+
+        line = self.format_number_one_update(entry)
+        if line:
+            return line
+
+        if entry['new_peak'] and rise_fall_label not in REENTRY_LABELS and \
+                entry['rise_fall'] is not None and entry['rise_fall'] > 0:
+            return self.format_climber_new_peak(entry)
+
+        line = self.format_top_10_or_5_climber(entry)
+        if line:
+            return line
+
+        if rise_fall_label in REENTRY_LABELS:
+            return self.format_reentry(entry)
+
+        return None
+
+    def format_debut(self, entry):
+        return f'“{entry["song"]}” by {entry["artist"]} debuts at #{entry["position_text"]} in {self.chart_name} Hot 100.'
+
+    def format_reentry(self, entry):
+        if entry['new_peak']:
+            return f'“{entry["song"]}” by {entry["artist"]} reaches a new peak in {self.chart_name} Hot 100, reentering at #{entry["position_text"]}.'
+        else:
+            return f'“{entry["song"]}” by {entry["artist"]} reenters {self.chart_name} Hot 100 at #{entry["position_text"]}.'
+
+    def format_biggest_percentage_gainer(self, entry):
+        percent, points = entry['percent'], entry['points']
+        if percent is None or points is None:
+            return None
+        return f'“{entry["song"]}” by {entry["artist"]} is the biggest percentage gainer in {self.chart_name} Hot 100 this week, rising {int(percent * 100)}% to {int(points)} points.'
+
+    def format_biggest_position_gainer(self, entry):
+        spots_up, pos = entry['rise_fall'], entry['position']
+        if spots_up is None or pos is None:
+            return None
+        return f'“{entry["song"]}” by {entry["artist"]} is the biggest position gainer in {self.chart_name} Hot 100 this week, rising {spots(spots_up)} to #{pos}.'
+
+    def format_biggest_percentage_faller(self, entry):
+        percent, points = entry['percent'], entry['points']
+        if percent is None or points is None:
+            return None
+        return f'“{entry["song"]}” by {entry["artist"]} is the biggest percentage faller in {self.chart_name} Hot 100 this week, dropping {abs(int(percent * 100))}% to {int(points)} points.'
+
+    def format_biggest_position_faller(self, entry):
+        spots_down, pos = entry['rise_fall'], entry['position']
+        if spots_down is None or pos is None:
+            return None
+        return f'“{entry["song"]}” by {entry["artist"]} drops {spots(abs(spots_down))} to #{pos} — the biggest drop this week in {self.chart_name} Hot 100.'
+
+    def format_number_one_update(self, entry):
+        if entry['position'] != 1 or entry['peak'] != 1:
+            return None
+
+        song = entry['song']
+        artist = entry['artist']
+        peak_streak = entry['peak_streak']
+
+        if peak_streak == 1:
+            return f'“{song}” by {artist} reaches #1 in the {self.chart_name} Hot 100 for the first time.'
+        elif entry['previous_rank'] == 1:
+            return f'“{song}” by {artist} spends a {ordinal(peak_streak)} week at #1 in the {self.chart_name} Hot 100.'
+        else:
+            return f'“{song}” by {artist} returns to #1 in the {self.chart_name} Hot 100 for a {ordinal(peak_streak)} nonconsecutive week at the top.'
+
+    def format_milestone_weeks(self, entry):
+        woc = entry['woc']
+        if woc is None:
+            return None
+
+        song = entry['song']
+        artist = entry['artist']
+
+        if woc in SPECIAL_MILESTONES:
+            return f'“{song}” by {artist} has now completed {SPECIAL_MILESTONES[woc]} ({woc} weeks of charting) in {self.chart_name} Hot 100.'
+        elif woc in MILESTONE_WEEKS:
+            return f'“{song}” by {artist} spends its {ordinal(woc)} week in {self.chart_name} Hot 100 this week.'
+
+        return None
+
+    def format_climber_new_peak(self, entry):
+        return f'“{entry["song"]}” by {entry["artist"]} reaches a new peak in {self.chart_name} Hot 100, rising {spots(entry["rise_fall"])} to #{entry["position_text"]}.'
+
+    def format_top_10_or_5_climber(self, entry):
+        pos = entry['position']
+        prev = entry['previous_rank']
+
+        if pos is None or prev is None:
+            return None
+
+        if pos <= 5 and prev > 5:
+            return f'“{entry["song"]}” by {entry["artist"]} climbs inside the top 5 of {self.chart_name} Hot 100, rising {spots(entry["rise_fall"])} to #{entry["position_text"]}.'
+        elif pos <= 10 and prev > 10:
+            return f'“{entry["song"]}” by {entry["artist"]} climbs inside the top 10 of {self.chart_name} Hot 100, rising {spots(entry["rise_fall"])} to #{entry["position_text"]}.'
+
+        return None
@@ -0,0 +1,99 @@
+import os
+import csv
+from array import array
+
+import numpy as np
+
+from reports.report_accumulator import ReportAccumulator
+
+class FlourishPivotReport(ReportAccumulator):
+    """song x week position grid for a flourish bar chart race over any range of weeks"""
+
+    def __init__(self, start_week, end_week, output_file, included_artists=("ALL",),
+                 included_albums=("ALL",), included_tracks=("ALL",), chart_limit=100):
+        self.start_week = start_week
+        self.end_week = end_week
+        self.output_file = output_file
+        self.chart_limit = chart_limit
+        # None means no filter
+        self.included_artists = self._as_filter(included_artists)
+        self.included_albums = self._as_filter(included_albums)
+        self.included_tracks = self._as_filter(included_tracks)
+
+        self.weeks = []
+        self.song_index = {}  # {(song, artist): row in the matrix}
+        self.songs = []       # [(song, artist, first album)]
+        self.cells_song = array('I')
+        self.cells_week = array('I')
+        self.cells_position = array('H')
+
+    @staticmethod
+    def _as_filter(included):
+        return None if "ALL" in included else frozenset(included)
+
+    def wants_week(self, year, week):
+        week_key = f"{year}-{week}"
+        return (self.start_week is None or week_key >= self.start_week) and \
+               (self.end_week is None or week_key <= self.end_week)
+
+    def add_week(self, year, week, rows):
+        week_idx = len(self.weeks)
+        # yyyy-mm-dd -> yy-mm-dd
+        self.weeks.append(f"{year}-{week}"[2:])
+
+        for row in rows:
+            key = (row['Song'], row['Artist'])
+            song_idx = self.song_index.get(key)
+            if song_idx is None:
+                song_idx = self.song_index[key] = len(self.songs)
+                self.songs.append((row['Song'], row['Artist'], row['Album']))
+            elif not self.songs[song_idx][2]:
+                self.songs[song_idx] = (row['Song'], row['Artist'], row['Album'])
+
+            self.cells_song.append(song_idx)
+            self.cells_week.append(week_idx)
+            self.cells_position.append(int(row['Position']))
+
+    def is_included(self, song, artist, album):
+        """apply the artist / album / track filters"""
+        return (self.included_artists is None or artist in self.included_artists) and \
+               (self.included_albums is None or album in self.included_albums) and \
+               (self.included_tracks is None or song in self.included_tracks)
+
+    def included_songs(self):
+        """(matrix row, song, artist, album) for every song passing the filters"""
+        return [
+            (song_idx, song, artist, album)
+            for song_idx, (song, artist, album) in enumerate(self.songs)
+            if self.is_included(song, artist, album)
+        ]
+
+    def build_matrix(self):
+        """dense songs x weeks matrix of positions, 0 where the song did not chart"""
+        matrix = np.zeros((len(self.songs), len(self.weeks)), dtype=np.uint16)
+        matrix[
+            np.frombuffer(self.cells_song, dtype=np.uint32),
+            np.frombuffer(self.cells_week, dtype=np.uint32)
+        ] = np.frombuffer(self.cells_position, dtype=np.uint16)
+        return matrix
+
+    def cover_keys(self):
+        return [(album, artist) for _, song, artist, album in self.included_songs()]
+
+    def finish(self, cover_service):
+        matrix = self.build_matrix()
+
+        # position -> csv text, with "" for weeks off the chart
+        max_position = max(self.chart_limit, int(matrix.max()) if matrix.size else 0)
+        labels = np.array([""] + [str(position) for position in range(1, max_position + 1)], dtype=object)
+
+        os.makedirs(os.path.dirname(self.output_file) or ".", exist_ok=True)
+        with open(self.output_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Song Name", "Artist Name", "Album Name", "Image Link"] + self.weeks)
+
+            for song_idx, song, artist, album in self.included_songs():
+                cover_url = cover_service.get_cover_url(album, artist)
+                writer.writerow([song, artist, album, cover_url] + labels[matrix[song_idx]].tolist())
+
+        print(f"Chart data saved to {self.output_file}")
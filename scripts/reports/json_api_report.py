@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+
+from reports.report_accumulator import IncrementalReportAccumulator, to_int
+
+def shard_id(*parts):
+    """stable url-safe id for a song or artist"""
+    return hashlib.blake2b("\0".join(parts).encode("utf-8"), digest_size=6).hexdigest()
+
+def write_json(path, data):
+    """write minified json atomically, skipping files whose content is unchanged, returns whether it wrote"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+
+    if os.path.exists(path) and os.path.getsize(path) == len(payload):
+        with open(path, 'rb') as f:
+            if f.read() == payload:
+                return False
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return True
+
+def chart_status(rank, last_week, woc):
+    """(status, change) as shown on the site"""
+    if last_week is None:
+        return ("new" if woc == 1 else "re"), 0
+    if rank < last_week:
+        return "rise", last_week - rank
+    if rank > last_week:
+        return "fall", rank - last_week
+    return "stable", 0
+
+def chart_entry(row):
+    """one chart row as served to the site, field names follow the frontend's SongEntry"""
+    rank = to_int(row["Position"])
+    woc = to_int(row["WOC"])
+    # "--" for debuts and re-entries
+    last_week = str(row["Previous Rank"])
+    last_week = int(last_week) if last_week.isdigit() else None
+    status, change = chart_status(rank, last_week, woc)
+
+    return {
+        "rank": rank,
+        "title": row["Song"],
+        "artist": row["Artist"],
+        "album": row["Album"],
+        "lastWeek": last_week,
+        "status": status,
+        "change": change,
+        "points": to_int(row["Total Weighted Points"]),
+        "pointsPct": str(row["%"]) or "--",
+        "peak": to_int(row["Peak"]),
+        "peakStreak": to_int(row["Peak Streak"]),
+        "isNewPeak": str(row["New Peak?"]) == "True",
+        "isRePeak": str(row["Re-peak?"]) == "True",
+        "woc": woc,
+        "streamsUnits": to_int(row["Streams Units"]),
+        "streamsPct": str(row["Streams %"]) or "-",
+        "salesUnits": to_int(row["Sales Units"]),
+        "salesPct": str(row["Sales %"]) or "-",
+        "airplayUnits": to_int(row["Airplay Units"]),
+        "airplayPct": str(row["Airplay %"]) or "-",
+        "units": to_int(row["Total Units"]),
+    }
+
+class JsonApiReport(IncrementalReportAccumulator):
+    """static json api for the site: a shard per week, per song and per artist plus a compact index"""
+
+    def __init__(self, output_dir="../public/data/api", chart_limit=100, state_file=None):
+        super().__init__(state_file)
+        self.output_dir = output_dir
+        self.chart_limit = chart_limit
+
+        self.weeks = []    # ["yyyy-mm-dd"] in chart order
+        self.songs = {}    # {(song, artist): {id, title, artist, album, run: [[week, rank, points]]}}
+        self.artists = {}  # {artist: {id, name, songs: [(song, artist)]}}
+
+        # shards touched by the weeks applied in this run
+        self.new_weeks = {}  # {"yyyy-mm-dd": [week entry]}
+        self.dirty_songs = set()
+        self.dirty_artists = set()
+
+    def get_state(self):
+        return self.weeks, self.songs, self.artists
+
+    def set_state(self, state):
+        self.weeks, self.songs, self.artists = state
+
+    def apply_week(self, year, week, rows):
+        week_id = f"{year}-{week}"
+        self.weeks.append(week_id)
+
+        entries = []
+        for row in rows:
+            rank = to_int(row["Position"])
+            if rank > self.chart_limit:
+                continue
+
+            key = (row["Song"], row["Artist"])
+            song = self.songs.get(key)
+            if song is None:
+                song = self.songs[key] = {
+                    "id": shard_id(*key),
+                    "title": row["Song"],
+                    "artist": row["Artist"],
+                    "album": row["Album"],
+                    "run": []
+                }
+                artist = self.artists.get(row["Artist"])
+                if artist is None:
+                    artist = self.artists[row["Artist"]] = {
+                        "id": shard_id(row["Artist"]),
+                        "name": row["Artist"],
+                        "songs": []
+                    }
+                artist["songs"].append(key)
+
+            if row["Album"]:
+                song["album"] = row["Album"]
+            points = to_int(row["Total Weighted Points"])
+            song["run"].append([week_id, rank, points])
+
+            self.dirty_songs.add(key)
+            self.dirty_artists.add(row["Artist"])
+            entries.append({"songId": song["id"], **chart_entry(row)})
+
+        self.new_weeks[week_id] = entries
+
+    def cover_keys(self):
+        keys = [(self.songs[key]["album"], key[1]) for key in self.dirty_songs]
+        keys.extend(
+            (entry["album"], entry["artist"])
+            for entries in self.new_weeks.values() for entry in entries
+        )
+        return keys
+
+    @staticmethod
+    def _song_summary(song):
+        ranks = [rank for _, rank, _ in song["run"]]
+        return {
+            "peak": min(ranks),
+            "weeksAtPeak": ranks.count(min(ranks)),
+            "weeks": len(ranks),
+            "debut": song["run"][0][0],
+        }
+
+    def finish(self, cover_service):
+        rebuilt = bool(self.weeks) and len(self.new_weeks) == len(self.weeks)
+        written = 0
+
+        for week_id, entries in self.new_weeks.items():
+            for entry in entries:
+                entry["coverUrl"] = cover_service.get_cover_url(entry["album"], entry["artist"])
+            written += write_json(
+                os.path.join(self.output_dir, "weeks", f"{week_id}.json"),
+                {"week": week_id, "entries": entries}
+            )
+
+        for key in self.dirty_songs:
+            song = self.songs[key]
+            written += write_json(os.path.join(self.output_dir, "songs", f"{song['id']}.json"), {
+                "id": song["id"],
+                "title": song["title"],
+                "artist": song["artist"],
+                "artistId": self.artists[song["artist"]]["id"],
+                "album": song["album"],
+                "coverUrl": cover_service.get_cover_url(song["album"], song["artist"]),
+                **self._song_summary(song),
+                "runFields": ["week", "rank", "points"],
+                "run": song["run"],
+            })
+
+        for name in self.dirty_artists:
+            artist = self.artists[name]
+            written += write_json(os.path.join(self.output_dir, "artists", f"{artist['id']}.json"), {
+                "id": artist["id"],
+                "name": name,
+                "songs": [
+                    {"id": self.songs[key]["id"], "title": self.songs[key]["title"], **self._song_summary(self.songs[key])}
+                    for key in artist["songs"]
+                ],
+            })
+
+        if self.new_weeks or not os.path.exists(os.path.join(self.output_dir, "index.json")):
+            written += write_json(os.path.join(self.output_dir, "index.json"), {
+                "weeks": self.weeks[::-1],
+                "songFields": ["id", "title", "artistId", "peak", "weeks"],
+                "songs": [
+                    [song["id"], song["title"], self.artists[song["artist"]]["id"],
+                     min(rank for _, rank, _ in song["run"]), len(song["run"])]
+                    for song in self.songs.values()
+                ],
+                "artistFields": ["id", "name", "songs"],
+                "artists": [
+                    [artist["id"], name, len(artist["songs"])]
+                    for name, artist in self.artists.items()
+                ],
+            })
+
+        if rebuilt:
+            self._remove_stale_shards()
+
+        self.save_state()
+        print(f"JSON API: {len(self.new_weeks)} new week(s), {len(self.dirty_songs)} song and "
+              f"{len(self.dirty_artists)} artist shard(s) updated, {written} file(s) written to {self.output_dir}")
+
+    def _remove_stale_shards(self):
+        """after a full rebuild, drop shards for weeks, songs or artists no longer in the history"""
+        current = {
+            "weeks": set(self.weeks),
+            "songs": {song["id"] for song in self.songs.values()},
+            "artists": {artist["id"] for artist in self.artists.values()},
+        }
+        for folder, ids in current.items():
+            folder_path = os.path.join(self.output_dir, folder)
+            if not os.path.isdir(folder_path):
+                continue
+            for filename in os.listdir(folder_path):
+                if filename.endswith(".json") and filename[:-len(".json")] not in ids:
+                    os.remove(os.path.join(folder_path, filename))
@@ -0,0 +1,119 @@
+import os
+
+from formatters.spreadsheet_formatter import SpreadsheetFormatter
+from repositories.chart_repository import ChartRepository, NUMBER_ONES_LEDGER_COLUMNS
+from reports.report_accumulator import ReportAccumulator
+
+class NumberOnesLedgerReport(ReportAccumulator):
+    """report built from the #1 ledger written by ChartBuilder, never from weekly files"""
+
+    def __init__(self, ledger_file, ledger=None):
+        self.ledger_file = ledger_file
+        self.ledger = ledger  # rows already in memory, as ChartRepository.number_ones_ledger_rows gives them
+
+    def wants_week(self, year, week):
+        return False
+
+    def load_ledger(self):
+        if self.ledger is not None:
+            return self.ledger
+        return ChartRepository.load_number_ones_ledger(self.ledger_file)
+
+class NumberOnesSummaryReport(NumberOnesLedgerReport):
+    """text list of every #1 hit, chronological and by weeks at #1"""
+
+    def __init__(self, ledger_file="points/number_ones.csv", output_file="number_ones.txt", ledger=None):
+        super().__init__(ledger_file, ledger)
+        self.output_file = output_file
+
+    def finish(self, cover_service):
+        number_ones = {}
+        years = set()
+
+        for row in self.load_ledger():
+            years.add(row['Week'][:4])
+            key = (row['Song'], row['Artist'])
+
+            if key not in number_ones:
+                number_ones[key] = {
+                    'song': row['Song'],
+                    'artist': row['Artist'],
+                    'first_week': row['First Week at #1'],
+                    'chrono_index': len(number_ones)
+                }
+            number_ones[key]['total_weeks'] = int(row['Total Weeks at #1'])
+
+        chrono_list = list(number_ones.values())
+
+        most_weeks_list = sorted(
+            number_ones.values(),
+            key=lambda x: (-x['total_weeks'], x['chrono_index'])
+        )
+
+        with open(self.output_file, 'w', encoding='utf-8') as f:
+            f.write("PERSONAL HOT 100 - NUMBER ONE HITS 🏆\n")
+            f.write("="*50 + "\n\n")
+
+            f.write("PART 1: CHRONOLOGICAL ORDER (When they first hit #1)\n")
+            f.write("-" * 50 + "\n")
+            for i, data in enumerate(chrono_list, start=1):
+                weeks_text = "week" if data['total_weeks'] == 1 else "weeks"
+                f.write(f"{i}. \"{data['song']}\" by {data['artist']}\n")
+                f.write(f"   └ First #1: {data['first_week']} ({data['total_weeks']} {weeks_text} total)\n\n")
+
+            f.write("\n")
+            f.write("PART 2: RANKED BY WEEKS AT #1\n")
+            f.write("-" * 50 + "\n")
+            for i, data in enumerate(most_weeks_list, start=1):
+                weeks_text = "week" if data['total_weeks'] == 1 else "weeks"
+                f.write(f"{i}. \"{data['song']}\" by {data['artist']} - {data['total_weeks']} {weeks_text}\n")
+                f.write(f"   └ First hit #1: {data['first_week']}\n\n")
+
+        print(f"Successfully processed {len(years)} years of data.")
+        print(f"Found {len(number_ones)} unique #1 songs.")
+        print(f"Saved list to: {self.output_file}")
+
+class YearlyNumberOnesReport(NumberOnesLedgerReport):
+    """spreadsheet of each week's #1 entry for one year"""
+
+    def __init__(self, year, ledger_file="points/number_ones.csv", output_dir="weekly_charts", ledger=None):
+        super().__init__(ledger_file, ledger)
+        self.year = str(year)
+        self.output_dir = output_dir
+
+    def finish(self, cover_service):
+        number_ones = []
+        for row in self.load_ledger():
+            if not row['Week'].startswith(f"{self.year}-"):
+                continue
+
+            number_one = {name: value for name, value in row.items()
+                          if name not in NUMBER_ONES_LEDGER_COLUMNS}
+            # week as mm-dd, matching the weekly file names
+            number_one['Week'] = row['Week'][5:]
+            number_ones.append(number_one)
+
+        if not number_ones:
+            print(f"No #1 entries found for {self.year}")
+            return
+
+        formatter = SpreadsheetFormatter()
+
+        for entry in number_ones:
+            if 'Rise/Fall' in entry:
+                entry['Rise/Fall'] = formatter.format_rise_fall(entry['Rise/Fall'])
+
+        formatter.add_album_covers(number_ones, cover_service)
+
+        # reorder: Week first, Album Cover last
+        original_fieldnames = list(number_ones[0].keys())
+        original_fieldnames.remove('Week')
+        original_fieldnames.remove('Album Cover')
+        fieldnames = ['Week'] + original_fieldnames + ['Album Cover']
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        output_path = os.path.join(self.output_dir, f"{self.year}_ones.csv")
+        ChartRepository.save_formatted_chart(number_ones, output_path, fieldnames)
+
+        print(f"Extracted {len(number_ones)} #1 entries for {self.year}")
+        print(f"Saved to {output_path}")
@@ -0,0 +1,45 @@
+from heapq import heapify, heappop, heappush
+
+class RankedTotals:
+    """keeps song keys ordered by running total, ties broken by first appearance"""
+
+    def __init__(self):
+        self.heap = []     # [(-total, first_seen, key)], including entries a later update superseded
+        self.entries = {}  # {key: (-total, first_seen, key)}, the current entry of every key
+
+    def __setstate__(self, state):
+        # states saved before the heap kept a sorted list, which is already a valid heap
+        if "ranking" in state:
+            state["heap"] = state.pop("ranking")
+        self.__dict__.update(state)
+
+    def update(self, key, total):
+        """set a key's total in O(log n), the entry it replaces is dropped lazily"""
+        entry = self.entries.get(key)
+        first_seen = len(self.entries) if entry is None else entry[1]
+
+        entry = (-total, first_seen, key)
+        self.entries[key] = entry
+        heappush(self.heap, entry)
+
+        # rebuild once superseded entries outnumber current ones, amortized O(1) per update
+        if len(self.heap) > 2 * len(self.entries):
+            self.heap = list(self.entries.values())
+            heapify(self.heap)
+
+    def top(self, n):
+        """top n keys by total"""
+        popped = []
+        top = []
+        while self.heap and len(top) < n:
+            entry = heappop(self.heap)
+            # an update that kept the total leaves an equal superseded entry behind
+            if self.entries.get(entry[2]) == entry and (not popped or popped[-1] != entry):
+                popped.append(entry)
+                top.append(entry[2])
+        for entry in popped:
+            heappush(self.heap, entry)
+        return top
+
+    def __len__(self):
+        return len(self.entries)
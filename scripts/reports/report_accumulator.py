@@ -0,0 +1,108 @@
+import os
+import pickle
+
+class ReportAccumulator:
+    """base class for reports fed by ReportEngine"""
+
+    def begin(self, weeks):
+        """called before the scan with every (year, week, fingerprint) in the history"""
+        pass
+
+    def wants_week(self, year, week):
+        """whether this report needs the given week's rows"""
+        return True
+
+    def add_week(self, year, week, rows):
+        """consume one week of typed chart rows (ordered by position)"""
+        raise NotImplementedError
+
+    def cover_keys(self):
+        """(album, artist) keys finish() will need covers for, so they can be prefetched together"""
+        return []
+
+    def finish(self, cover_service):
+        """write the report once the history scan is complete"""
+        raise NotImplementedError
+
+class IncrementalReportAccumulator(ReportAccumulator):
+    """report whose running state is persisted, so later runs only apply new weeks"""
+
+    STATE_VERSION = 1
+
+    def __init__(self, state_file=None):
+        self.state_file = state_file
+        self.applied_weeks = []  # [(year, week, fingerprint)] already folded into the state
+        self.pending_weeks = set()
+        self.fingerprints = {}
+
+    def covers_week(self, year, week):
+        """whether the week belongs to this report at all"""
+        return True
+
+    def get_state(self):
+        """picklable running state"""
+        raise NotImplementedError
+
+    def set_state(self, state):
+        """restore running state from get_state()"""
+        raise NotImplementedError
+
+    def apply_week(self, year, week, rows):
+        """fold one week into the running state"""
+        raise NotImplementedError
+
+    def begin(self, weeks):
+        weeks = [(year, week, fingerprint) for year, week, fingerprint in weeks
+                 if self.covers_week(year, week)]
+        self.fingerprints = {(year, week): fingerprint for year, week, fingerprint in weeks}
+
+        # saved state is only reusable if it was built from an unchanged prefix of the history
+        saved = self._load_state()
+        if saved is not None:
+            applied_weeks, state = saved
+            if weeks[:len(applied_weeks)] == applied_weeks:
+                self.set_state(state)
+                self.applied_weeks = applied_weeks
+
+        self.pending_weeks = {(year, week) for year, week, _ in weeks[len(self.applied_weeks):]}
+
+    def wants_week(self, year, week):
+        return (year, week) in self.pending_weeks
+
+    def add_week(self, year, week, rows):
+        self.apply_week(year, week, rows)
+        self.applied_weeks.append((year, week, self.fingerprints.get((year, week))))
+
+    def save_state(self):
+        """persist running state next to the report"""
+        if not self.state_file:
+            return
+
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(
+                (self.STATE_VERSION, self.applied_weeks, self.get_state()),
+                f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(tmp_file, self.state_file)
+
+    def _load_state(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return None
+
+        try:
+            with open(self.state_file, 'rb') as f:
+                version, applied_weeks, state = pickle.load(f)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            return None
+
+        if version != self.STATE_VERSION:
+            return None
+        return applied_weeks, state
+
+def to_int(value, default=0):
+    """parse a possibly empty chart value as int"""
+    if value == "" or value is None:
+        return default
+    return int(value)
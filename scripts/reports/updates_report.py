@@ -0,0 +1,50 @@
+import os
+from datetime import datetime, timedelta
+
+from reports.report_accumulator import ReportAccumulator
+
+class UpdatesReport(ReportAccumulator):
+    """plain-text weekly chart rundowns for one year"""
+
+    def __init__(self, year, output_dir="updates", chart_limit=100):
+        self.year = str(year)
+        self.output_file = os.path.join(output_dir, f"{self.year}.txt")
+        self.chart_limit = chart_limit
+        self.ranked_weeks = []
+
+    def wants_week(self, year, week):
+        return year == self.year
+
+    def add_week(self, year, week, rows):
+        self.ranked_weeks.append((week, [
+            {
+                'position': row['Position'],
+                'is_new_peak': row['New Peak?'],
+                'song': row['Song'],
+                'points': row['Total Weighted Points'],
+                'status': row['Rise/Fall']
+            }
+            for row in rows[:self.chart_limit]
+        ]))
+
+    def finish(self, cover_service):
+        os.makedirs(os.path.dirname(self.output_file) or ".", exist_ok=True)
+
+        with open(self.output_file, 'w', encoding='utf-8') as updates:
+            for week, chart in self.ranked_weeks:
+                update_date = get_friday(f'{self.year}-{week}')
+                updates.write(f"Billboard Hot 100 — {datetime.strptime(update_date, '%Y-%m-%d').strftime('%B %d, %Y')}\n\n")
+                for entry in chart:
+                    if entry['is_new_peak'] == "True":
+                        updates.write(f"#{entry['position']} ({entry['status']}): {entry['song']} — {entry['points']} *new peak*\n")
+                    else:
+                        updates.write(f"#{entry['position']} ({entry['status']}): {entry['song']} — {entry['points']}\n")
+                updates.write("\n" + ("-" * 40) + "\n\n")
+
+        print(f"Weekly updates have been saved to {self.output_file}")
+
+def get_friday(date_str):
+    date = datetime.strptime(date_str, "%Y-%m-%d")
+    days_to_friday = (4 - date.weekday()) % 7
+    friday_date = date + timedelta(days=days_to_friday)
+    return friday_date.strftime("%Y-%m-%d")
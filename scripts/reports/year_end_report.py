@@ -0,0 +1,96 @@
+import os
+import csv
+
+from reports.report_accumulator import IncrementalReportAccumulator
+from reports.ranked_totals import RankedTotals
+
+class YearEndReport(IncrementalReportAccumulator):
+    """year-end chart ranked by total points within one year"""
+
+    def __init__(self, year, output_dir="year_end", chart_limit=100, state_file=None):
+        super().__init__(state_file)
+        self.year = str(year)
+        self.output_dir = output_dir
+        self.chart_limit = chart_limit
+        self.song_stats = {}
+        self.ranking = RankedTotals()
+
+    def _new_song_stats(self):
+        return {
+            "total_points": 0,
+            "total_streams": 0,
+            "total_sales": 0,
+            "total_airplay": 0,
+            "total_units": 0,
+            "most_recent_points": 0,
+            "album": "",
+            "peak": self.chart_limit + 1,
+            "peak_streak": 0,
+            "woc": 0
+        }
+
+    def covers_week(self, year, week):
+        return year == self.year
+
+    def get_state(self):
+        return self.song_stats, self.ranking
+
+    def set_state(self, state):
+        self.song_stats, self.ranking = state
+
+    def apply_week(self, year, week, rows):
+        for row in rows:
+            key = (row["Song"], row["Artist"])
+            points = int(row.get("Total Weighted Points", 0))
+
+            stats = self.song_stats.get(key)
+            if stats is None:
+                stats = self.song_stats[key] = self._new_song_stats()
+
+            stats["album"] = row["Album"]
+            stats["total_points"] += points
+            stats["total_streams"] += int(row.get("Streams Units", 0))
+            stats["total_sales"] += int(row.get("Sales Units", 0))
+            stats["total_airplay"] += int(row.get("Airplay Units", 0))
+            stats["total_units"] += int(row.get("Total Units", 0))
+            stats["most_recent_points"] = points
+            stats["peak"] = int(row.get("Peak", 0))
+            stats["peak_streak"] = int(row.get("Peak Streak", 0))
+            stats["woc"] += 1
+
+            self.ranking.update(key, stats["total_points"])
+
+    def cover_keys(self):
+        return [(self.song_stats[key]["album"], key[1]) for key in self.ranking.top(self.chart_limit)]
+
+    def finish(self, cover_service):
+        if not self.song_stats:
+            print(f"No weekly points found for {self.year}")
+            return
+
+        output_path = os.path.join(self.output_dir, f"{self.year}_year_end.csv")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        with open(output_path, "w", newline='', encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                "Rank", "Song", "Artist", "Album", "Album Cover",
+                "Total Points", "Most Recent Week Points",
+                "Total Streams", "Total Sales", "Total Airplay", "Total Units",
+                "Peak", "Peak Streak", "Weeks on Chart"
+            ])
+            for rank, key in enumerate(self.ranking.top(self.chart_limit), start=1):
+                song, artist = key
+                stats = self.song_stats[key]
+                album = stats["album"]
+                cover_url = cover_service.get_cover_url(album, artist)
+
+                writer.writerow([
+                    rank, song, artist, album, cover_url,
+                    stats["total_points"], stats["most_recent_points"],
+                    stats["total_streams"], stats["total_sales"], stats["total_airplay"], stats["total_units"],
+                    stats["peak"], stats["peak_streak"], stats["woc"]
+                ])
+
+        self.save_state()
+        print(f"Year-end chart saved to {output_path}")
@@ -1,5 +1,32 @@
 import csv
+import hashlib
 import os
+import pickle
+from array import array
+from itertools import islice
+
+from services.instrumentation import get_metrics
+
+CACHE_SUFFIX = '.cache'
+CACHE_VERSION = 1
+
+WEEKLY_CHART_HEADER = [
+    'Week', 'Position', 'Rise/Fall', 'Previous Rank', 'New Peak?', 'Re-peak?',
+    'Total Weighted Points', '%',
+    'Song', 'Artist', 'Album',
+    'Streams', 'Sales', 'Airplay',
+    'Streams Points', 'Sales Points', 'Airplay Points',
+    'Streams Units', 'Sales Units', 'Airplay Units',
+    'Streams %', 'Sales %', 'Airplay %',
+    'Total Units',
+    'Current Week Points', 'Previous Week Points', 'Two Weeks Ago Points',
+    'Previous Week Raw Points', 'Two Weeks Ago Raw Points',
+    'Peak', 'WOC', 'Peak Streak'
+]
+
+# names stay text even when a whole week happens to be numeric (an album called "1989")
+TEXT_COLUMNS = {'Week', 'Song', 'Artist', 'Album', 'Album Cover'}
+NUMBER_ONES_LEDGER_COLUMNS = ['Weeks at #1 Streak', 'Total Weeks at #1', 'First Week at #1']
 
 class ChartRepository:
     """handles reading and writing chart data"""
@@ -7,66 +34,208 @@ class ChartRepository:
     @staticmethod
     def load_weekly_chart(filepath):
         """load chart data from csv as list of dicts"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            return list(reader)
+        header, columns = ChartRepository._load_columns(filepath)
+        as_text = [ChartRepository._column_as_text(columns[name]) for name in header]
+        return [dict(zip(header, values)) for values in zip(*as_text)]
+    
+    @staticmethod
+    def load_weekly_columns(filepath):
+        """load chart data as typed columns: {column name: array or list of str}"""
+        header, columns = ChartRepository._load_columns(filepath)
+        return columns
+    
+    @staticmethod
+    def load_cover_keys(filepath, limit=None):
+        """[(album, artist)] of the first limit entries, reading only as many csv rows and no other columns"""
+        with open(filepath, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            album, artist = header.index('Album'), header.index('Artist')
+            # csv.reader yields [] for blank lines, e.g. a trailing newline
+            return [(row[album], row[artist]) for row in islice(filter(None, reader), limit)]
+    
+    @staticmethod
+    def load_weekly_rows(filepath):
+        """load chart data as list of dicts with typed values"""
+        header, columns = ChartRepository._load_columns(filepath)
+        return ChartRepository.rows_from_columns(header, columns)
+    
+    @staticmethod
+    def rows_from_columns(header, columns):
+        typed = [columns[name] for name in header]
+        return [dict(zip(header, values)) for values in zip(*typed)]
+    
+    @staticmethod
+    def columns_from_entries(chart_entries):
+        """typed columns for chart entries, identical to loading them back from save_weekly_chart's csv"""
+        raw_columns = zip(*map(ChartRepository.entry_row, chart_entries)) if chart_entries else [() for _ in WEEKLY_CHART_HEADER]
+        columns = {
+            name: ChartRepository._column_from_values(name, values)
+            for name, values in zip(WEEKLY_CHART_HEADER, raw_columns)
+        }
+        return WEEKLY_CHART_HEADER, columns
+    
+    @staticmethod
+    def _column_from_values(name, values):
+        """type a column of python values without formatting them, falling back to the csv text rules"""
+        if name not in TEXT_COLUMNS:
+            kinds = set(map(type, values))
+            try:
+                if kinds == {int} or not values:
+                    return array('q', values)
+                if kinds == {float}:
+                    # repr round-trips every float, so a csv column of them always types as floats
+                    return array('d', values)
+            except OverflowError:
+                pass
+        
+        # csv writes None as an empty field and str() of everything else
+        texts = [value if isinstance(value, str) else "" if value is None else str(value) for value in values]
+        if name in TEXT_COLUMNS:
+            return texts
+        return ChartRepository._type_column(texts)
+    
+    @staticmethod
+    def fingerprint(filepath):
+        """content digest of a chart file, unchanged when a rebuild rewrites identical data"""
+        with open(filepath, 'rb') as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _load_columns(filepath):
+        """load parsed columns from the binary sidecar, re-parsing the csv if it changed"""
+        stat = os.stat(filepath)
+        cache_file = filepath + CACHE_SUFFIX
+        
+        try:
+            with open(cache_file, 'rb') as f:
+                version, size, mtime_ns, header, columns = pickle.load(f)
+            if (version, size, mtime_ns) == (CACHE_VERSION, stat.st_size, stat.st_mtime_ns):
+                get_metrics().count("sidecar_hits")
+                return header, columns
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            pass
+        
+        get_metrics().count("sidecar_misses")
+        header, columns = ChartRepository._parse_columns(filepath)
+        
+        # sidecar is best-effort, a read-only tree just skips caching
+        try:
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(
+                    (CACHE_VERSION, stat.st_size, stat.st_mtime_ns, header, columns),
+                    f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+        
+        return header, columns
+    
+    @staticmethod
+    def _parse_columns(filepath):
+        """parse csv into typed columns"""
+        with open(filepath, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            rows = []
+            for row in reader:
+                # csv.reader yields [] for blank lines, e.g. a trailing newline
+                if not row:
+                    continue
+                if len(row) != len(header):
+                    raise ValueError(f"{filepath}: line {reader.line_num} has {len(row)} fields, the header has {len(header)}")
+                rows.append(row)
+        
+        raw_columns = zip(*rows) if rows else [() for _ in header]
+        columns = {
+            name: list(values) if name in TEXT_COLUMNS else ChartRepository._type_column(values)
+            for name, values in zip(header, raw_columns)
+        }
+        return header, columns
+    
+    @staticmethod
+    def _type_column(values):
+        """store a column as int64 / float64 only if every value round-trips to the same text"""
+        try:
+            ints = array('q', (int(v) for v in values))
+            if all(str(i) == v for i, v in zip(ints, values)):
+                return ints
+        except (ValueError, OverflowError):
+            pass
+        
+        try:
+            floats = array('d', (float(v) for v in values))
+            if all(repr(x) == v for x, v in zip(floats, values)):
+                return floats
+        except ValueError:
+            pass
+        
+        return list(values)
+    
+    @staticmethod
+    def _column_as_text(column):
+        """convert a typed column back to its original csv text"""
+        if isinstance(column, array):
+            if column.typecode == 'd':
+                return [repr(x) for x in column]
+            return [str(x) for x in column]
+        return column
     
     @staticmethod
     def save_weekly_chart(chart_entries, output_file):
-        """save chart entries to csv"""
+        """save chart entries to csv, replacing the file in one step so a crash never leaves it half-written"""
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8', newline='') as f:
             writer = csv.writer(f)
-            writer.writerow([
-                'Week', 'Position', 'Rise/Fall', 'Previous Rank', 'New Peak?', 'Re-peak?',
-                'Total Weighted Points', '%',
-                'Song', 'Artist', 'Album',
-                'Streams', 'Sales', 'Airplay',
-                'Streams Points', 'Sales Points', 'Airplay Points',
-                'Streams Units', 'Sales Units', 'Airplay Units',
-                'Streams %', 'Sales %', 'Airplay %',
-                'Total Units',
-                'Current Week Points', 'Previous Week Points', 'Two Weeks Ago Points',
-                'Previous Week Raw Points', 'Two Weeks Ago Raw Points',
-                'Peak', 'WOC', 'Peak Streak'
-            ])
+            writer.writerow(WEEKLY_CHART_HEADER)
             
             for entry in chart_entries:
-                writer.writerow([
-                    entry.week,
-                    entry.position,
-                    entry.status,
-                    entry.previous_position,
-                    entry.is_new_peak,
-                    entry.is_repeak,
-                    entry.points,
-                    entry.percent_change,
-                    entry.song.name,
-                    entry.song.artist,
-                    entry.song.album,
-                    entry.song.streams,
-                    entry.song.sales,
-                    entry.song.airplay,
-                    entry.streams_points,
-                    entry.sales_points,
-                    entry.airplay_points,
-                    entry.streams_units,
-                    entry.sales_units,
-                    entry.airplay_units,
-                    entry.streams_percent,
-                    entry.sales_percent,
-                    entry.airplay_percent,
-                    entry.total_units,
-                    entry.current_week_points,
-                    entry.previous_week_points,
-                    entry.two_weeks_ago_points,
-                    entry.previous_week_raw_points,
-                    entry.two_weeks_ago_raw_points,
-                    entry.peak_position,
-                    entry.weeks_on_chart,
-                    entry.peak_streak
-                ])
+                writer.writerow(ChartRepository.entry_row(entry))
+        os.replace(tmp_file, output_file)
+        
+        get_metrics().count_bytes(output_file)
+    
+    @staticmethod
+    def entry_row(entry):
+        """csv row for a chart entry, matching WEEKLY_CHART_HEADER"""
+        return [
+            entry.week,
+            entry.position,
+            entry.status,
+            entry.previous_position,
+            entry.is_new_peak,
+            entry.is_repeak,
+            entry.points,
+            entry.percent_change,
+            entry.song.name,
+            entry.song.artist,
+            entry.song.album,
+            entry.song.streams,
+            entry.song.sales,
+            entry.song.airplay,
+            entry.streams_points,
+            entry.sales_points,
+            entry.airplay_points,
+            entry.streams_units,
+            entry.sales_units,
+            entry.airplay_units,
+            entry.streams_percent,
+            entry.sales_percent,
+            entry.airplay_percent,
+            entry.total_units,
+            entry.current_week_points,
+            entry.previous_week_points,
+            entry.two_weeks_ago_points,
+            entry.previous_week_raw_points,
+            entry.two_weeks_ago_raw_points,
+            entry.peak_position,
+            entry.weeks_on_chart,
+            entry.peak_streak
+        ]
     
     @staticmethod
     def save_formatted_chart(chart_data, output_file, fieldnames=None):
@@ -83,12 +252,67 @@ class ChartRepository:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
             writer.writerows(chart_data)
+        
+        get_metrics().count_bytes(output_file)
     
     @staticmethod
     def save_charted_cache(charted_cache, output_file):
         """save history of first chart appearances"""
-        with open(output_file, 'w', encoding='utf-8', newline='') as f:
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8', newline='') as f:
             writer = csv.writer(f)
             writer.writerow(['Song', 'Artist', 'First_Week'])
             for (song, artist), week in sorted(charted_cache.items(), key=lambda x: x[1]):
-                writer.writerow([song, artist, week])
\ No newline at end of file
+                writer.writerow([song, artist, week])
+        os.replace(tmp_file, output_file)
+    
+    @staticmethod
+    def save_number_ones_ledger(ledger, output_file):
+        """save every week's #1 entry with its streak, total weeks and first week at #1"""
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(WEEKLY_CHART_HEADER + NUMBER_ONES_LEDGER_COLUMNS)
+            for record in ledger:
+                writer.writerow(ChartRepository.ledger_row(record))
+        os.replace(tmp_file, output_file)
+    
+    @staticmethod
+    def append_number_ones_ledger(records, output_file):
+        """append the #1 entries of newly built weeks, fsynced so the ledger never runs behind the points files"""
+        with open(output_file, 'a', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            if f.tell() == 0:
+                writer.writerow(WEEKLY_CHART_HEADER + NUMBER_ONES_LEDGER_COLUMNS)
+            for record in records:
+                writer.writerow(ChartRepository.ledger_row(record))
+            f.flush()
+            os.fsync(f.fileno())
+    
+    @staticmethod
+    def ledger_row(record):
+        return ChartRepository.entry_row(record['entry']) + [
+            record['streak'],
+            record['total_weeks'],
+            record['first_week']
+        ]
+    
+    @staticmethod
+    def load_number_ones_ledger(filepath):
+        """load the #1 ledger as list of dicts, one per week in chronological order"""
+        if not os.path.exists(filepath):
+            return []
+        return ChartRepository.load_weekly_chart(filepath)
+    
+    @staticmethod
+    def number_ones_ledger_rows(ledger):
+        """the builder's ledger as load_number_ones_ledger reads it back after save_number_ones_ledger"""
+        header = WEEKLY_CHART_HEADER + NUMBER_ONES_LEDGER_COLUMNS
+        raw_columns = zip(*map(ChartRepository.ledger_row, ledger)) if ledger else [() for _ in header]
+        as_text = [
+            ChartRepository._column_as_text(ChartRepository._column_from_values(name, values))
+            for name, values in zip(header, raw_columns)
+        ]
+        return [dict(zip(header, values)) for values in zip(*as_text)]
@@ -0,0 +1,292 @@
+import argparse
+import os
+
+import config
+from services.pipeline import Pipeline, Stage
+
+# run from scripts/: python run_pipeline.py [stage ...] [--force] [--dry-run]
+#                or: python run_pipeline.py --in-process [--persist]
+
+def week_of(path):
+    """(year, mm-dd) of a weekly points file path"""
+    year_dir, filename = os.path.split(path)
+    return os.path.basename(year_dir), filename[:-len(".csv")]
+
+def changed_weeks(changed):
+    """yyyy-mm-dd keys of the changed points files that still exist"""
+    return sorted("-".join(week_of(path)) for path in changed if os.path.exists(path))
+
+def split_stage(changed, time_offset_hours):
+    from main import split_export
+    split_export(config.EXPORT_FILE, config.DATA_DIR, time_offset_hours)
+
+def plays_stage(changed):
+    from process_plays import aggregate_plays
+    aggregate_plays(config.YEARS, config.DATA_DIR, config.PLAYS_DIR)
+
+def points_stage(changed, chart_limit):
+    # every week's chart depends on all earlier ones, so any change replays the history,
+    # files whose content comes out identical leave downstream stages untouched
+    from process_points import build_points
+    build_points(config.YEARS, config.PLAYS_DIR, config.POINTS_DIR, chart_limit)
+
+def weekly_stage(changed, year):
+    from process_weekly import process_weekly_charts
+    weeks = None if changed is None else [week for _, week in map(week_of, changed)]
+    process_weekly_charts(year, output_dir=config.WEEKLY_CHARTS_DIR, points_root=config.POINTS_DIR, weeks=weeks)
+
+def year_end_stage(changed, year):
+    from reports.year_end_report import YearEndReport
+    from services.report_engine import ReportEngine
+
+    engine = ReportEngine(points_root=config.POINTS_DIR, years=[year])
+    engine.add(YearEndReport(
+        year,
+        output_dir=config.YEAR_END_DIR,
+        chart_limit=config.YEAR_END_LIMIT,
+        state_file=os.path.join(config.YEAR_END_DIR, f"{year}_state.pkl")
+    ))
+    engine.run()
+
+def all_time_stage(changed):
+    from reports.all_time_report import AllTimeReport
+    from services.report_engine import ReportEngine
+
+    engine = ReportEngine(points_root=config.POINTS_DIR, years=config.YEARS)
+    engine.add(AllTimeReport(
+        output_file=config.ALL_TIME_FILE,
+        chart_limit=config.CHART_LIMIT,
+        state_file=os.path.join(config.POINTS_DIR, "all_time_state.pkl")
+    ))
+    engine.run()
+
+def number_ones_stage(changed, report_year):
+    from reports.number_ones_report import NumberOnesSummaryReport, YearlyNumberOnesReport
+    from services.report_engine import ReportEngine
+
+    # both read the #1 ledger only, no weeks need scanning
+    engine = ReportEngine(points_root=config.POINTS_DIR, years=[])
+    engine.add(NumberOnesSummaryReport(ledger_file=config.NUMBER_ONES_FILE, output_file=config.NUMBER_ONES_SUMMARY_FILE))
+    engine.add(YearlyNumberOnesReport(report_year, ledger_file=config.NUMBER_ONES_FILE, output_dir=config.WEEKLY_CHARTS_DIR))
+    engine.run()
+
+def updates_stage(changed, year):
+    from reports.updates_report import UpdatesReport
+    from services.report_engine import ReportEngine
+
+    engine = ReportEngine(points_root=config.POINTS_DIR, years=[year])
+    engine.add(UpdatesReport(year, output_dir=config.UPDATES_DIR, chart_limit=config.CHART_LIMIT))
+    engine.run()
+
+def feeds_stage(changed):
+    from key import CHART_NAME
+    from reports.feed_report import FeedReport
+    from services.report_engine import ReportEngine
+
+    # feeds are per week, so only the changed range is rewritten
+    start_week = end_week = years = None
+    if changed is not None:
+        weeks = changed_weeks(changed)
+        if not weeks:
+            return
+        start_week, end_week = weeks[0], weeks[-1]
+        years = range(int(start_week[:4]), int(end_week[:4]) + 1)
+
+    engine = ReportEngine(points_root=config.POINTS_DIR, years=years)
+    engine.add(FeedReport(CHART_NAME, start_week, end_week, output_dir=config.FEEDS_DIR))
+    engine.run()
+
+def api_stage(changed):
+    import export_api
+    export_api.main()
+
+def latest_json_stage(changed):
+    import export_json
+    export_json.convert_csv_to_json()
+
+def in_memory_reports(number_ones):
+    """reports fed straight from the built charts and #1 ledger rows, without state files since every week is replayed
+
+    the weekly spreadsheets and latest json are not among them, they still come from the staged run
+    """
+    from key import CHART_NAME
+    import export_api
+    from reports.all_time_report import AllTimeReport
+    from reports.delta_chart_report import DeltaChartReport
+    from reports.feed_report import FeedReport
+    from reports.json_api_report import JsonApiReport
+    from reports.number_ones_report import NumberOnesSummaryReport, YearlyNumberOnesReport
+    from reports.updates_report import UpdatesReport
+    from reports.year_end_report import YearEndReport
+
+    reports = [
+        AllTimeReport(output_file=config.ALL_TIME_FILE, chart_limit=config.CHART_LIMIT),
+        UpdatesReport(config.REPORT_YEAR, output_dir=config.UPDATES_DIR, chart_limit=config.CHART_LIMIT),
+        FeedReport(CHART_NAME, output_dir=config.FEEDS_DIR),
+        JsonApiReport(output_dir=export_api.API_DIR, chart_limit=config.CHART_LIMIT),
+        DeltaChartReport(output_dir=export_api.DELTA_DIR, chart_limit=config.CHART_LIMIT),
+        NumberOnesSummaryReport(ledger_file=config.NUMBER_ONES_FILE, output_file=config.NUMBER_ONES_SUMMARY_FILE,
+                                ledger=number_ones),
+        YearlyNumberOnesReport(config.REPORT_YEAR, ledger_file=config.NUMBER_ONES_FILE,
+                               output_dir=config.WEEKLY_CHARTS_DIR, ledger=number_ones),
+    ]
+    reports.extend(
+        YearEndReport(year, output_dir=config.YEAR_END_DIR, chart_limit=config.YEAR_END_LIMIT)
+        for year in config.YEARS
+    )
+    return reports
+
+def run_in_process(persist=False):
+    """aggregate, build and report with plays and charts handed over in memory, persist writes their files in the background"""
+    from repositories.chart_repository import ChartRepository
+    from services.background_writer import BackgroundWriter
+    from services.chart_builder import ChartBuilder
+    from services.instrumentation import get_metrics
+    from services.plays_aggregator import PlaysAggregator
+    from services.points_calculator import PointsCalculator
+    from services.report_engine import ReportEngine
+
+    metrics = get_metrics()
+    aggregator = PlaysAggregator()
+    aggregator.process_years(config.YEARS, data_folder=os.path.join(config.DATA_DIR, ''))
+
+    builder = ChartBuilder(PointsCalculator(), config.CHART_LIMIT)
+    builder.load_charted_cache(config.CHARTED_CACHE_FILE)
+
+    weeks = []
+    writer = BackgroundWriter() if persist else None
+    try:
+        if writer:
+            writer.submit(ChartRepository.save_number_ones_ledger, [], config.NUMBER_ONES_FILE)
+        for week_start, plays in sorted(aggregator.weekly_plays.items()):
+            year, week = str(week_start.year), week_start.strftime("%m-%d")
+            # process_points only builds weeks filed under a configured year
+            if year not in config.YEARS:
+                continue
+            if writer:
+                writer.submit(PlaysAggregator.save_weekly_file, plays,
+                              PlaysAggregator.weekly_file_path(week_start, config.PLAYS_DIR))
+
+            ledger_size = len(builder.number_ones_ledger)
+            chart_entries = builder.build_weekly_chart(plays, f"{year}-{week}")
+            with metrics.stage("to_rows", week=f"{year}-{week}"):
+                weeks.append((year, week, ChartRepository.rows_from_columns(
+                    *ChartRepository.columns_from_entries(chart_entries)
+                )))
+
+            if writer:
+                writer.submit(ChartRepository.save_weekly_chart, chart_entries,
+                              os.path.join(config.POINTS_DIR, year, f"{week}.csv"))
+                writer.submit(ChartRepository.append_number_ones_ledger, builder.number_ones_ledger[ledger_size:],
+                              config.NUMBER_ONES_FILE)
+
+        if writer:
+            writer.submit(ChartRepository.save_charted_cache, builder.charted_cache, config.CHARTED_CACHE_FILE)
+
+        engine = ReportEngine(points_root=config.POINTS_DIR, years=config.YEARS)
+        for report in in_memory_reports(ChartRepository.number_ones_ledger_rows(builder.number_ones_ledger)):
+            engine.add(report)
+        engine.run_in_memory(weeks)
+    finally:
+        if writer:
+            writer.close()
+
+    if writer:
+        print(f"Wrote {writer.written} plays and points file(s) in the background")
+
+def build_stages():
+    """the refresh dag, from the last.fm export down to every report"""
+    import export_api
+    import export_json
+
+    points = os.path.join(config.POINTS_DIR, "*", "*.csv")
+    stages = [
+        Stage("split", split_stage,
+              inputs=[config.EXPORT_FILE],
+              outputs=[os.path.join(config.DATA_DIR, "*.csv")],
+              params={"time_offset_hours": config.TIME_OFFSET_HOURS}),
+        Stage("plays", plays_stage,
+              inputs=[os.path.join(config.DATA_DIR, "*.csv")],
+              outputs=[os.path.join(config.PLAYS_DIR, "*", "*.csv")],
+              after=["split"]),
+        Stage("points", points_stage,
+              inputs=[os.path.join(config.PLAYS_DIR, "*", "*.csv")],
+              outputs=[points, config.NUMBER_ONES_FILE],
+              after=["plays"],
+              params={"chart_limit": config.CHART_LIMIT}),
+        Stage("all_time", all_time_stage,
+              inputs=[points],
+              outputs=[config.ALL_TIME_FILE],
+              after=["points"]),
+        Stage("number_ones", number_ones_stage,
+              inputs=[config.NUMBER_ONES_FILE],
+              outputs=[config.NUMBER_ONES_SUMMARY_FILE],
+              after=["points"],
+              params={"report_year": config.REPORT_YEAR}),
+        Stage("updates", updates_stage,
+              inputs=[os.path.join(config.POINTS_DIR, config.REPORT_YEAR, "*.csv")],
+              outputs=[os.path.join(config.UPDATES_DIR, f"{config.REPORT_YEAR}.txt")],
+              after=["points"],
+              params={"year": config.REPORT_YEAR}),
+        Stage("feeds", feeds_stage,
+              inputs=[points],
+              outputs=[os.path.join(config.FEEDS_DIR, "*.txt")],
+              after=["points"]),
+        Stage("api", api_stage,
+              inputs=[points],
+              outputs=[os.path.join(export_api.API_DIR, "index.json"), os.path.join(export_api.DELTA_DIR, "songs.json")],
+              after=["points"]),
+    ]
+
+    weekly_stages = []
+    for year in config.YEARS:
+        year_points = os.path.join(config.POINTS_DIR, year, "*.csv")
+        stages.append(Stage(f"year_end:{year}", year_end_stage,
+                            inputs=[year_points],
+                            outputs=[os.path.join(config.YEAR_END_DIR, f"{year}_year_end.csv")],
+                            after=["points"],
+                            params={"year": year}))
+        stages.append(Stage(f"weekly:{year}", weekly_stage,
+                            inputs=[year_points],
+                            outputs=[os.path.join(config.WEEKLY_CHARTS_DIR, f"{year}_[0-9]*.csv")],
+                            after=["points"],
+                            params={"year": year}))
+        weekly_stages.append(f"weekly:{year}")
+
+    stages.append(Stage("latest_json", latest_json_stage,
+                        inputs=[export_json.CSV_PATH],
+                        outputs=[export_json.OUTPUT_PATH],
+                        after=weekly_stages))
+    return stages
+
+def main():
+    parser = argparse.ArgumentParser(description="refresh every chart output, skipping stages whose inputs are unchanged")
+    parser.add_argument("stages", nargs="*", help="stages to bring up to date along with their upstream stages, default all")
+    parser.add_argument("--force", action="store_true", help="rerun the selected stages even if they are fresh")
+    parser.add_argument("--dry-run", action="store_true", help="only print what would run")
+    parser.add_argument("--workers", type=int, default=config.PIPELINE_WORKERS)
+    parser.add_argument("--list", action="store_true", help="print the stages and what they run after")
+    parser.add_argument("--in-process", action="store_true",
+                        help="replay plays, points and reports in one process without csv hand-offs, "
+                             "skipping the weekly spreadsheets and latest json")
+    parser.add_argument("--persist", action="store_true", help="with --in-process, also write plays and points files")
+    args = parser.parse_args()
+
+    os.chdir(config.SCRIPT_DIR)
+    if args.in_process:
+        run_in_process(args.persist)
+        return
+
+    stages = build_stages()
+    if args.list:
+        for stage in stages:
+            print(f"{stage.name:<16} after {', '.join(stage.after) or '-'}")
+        return
+
+    pipeline = Pipeline(stages, state_file=config.PIPELINE_STATE_FILE, max_workers=args.workers)
+    status = pipeline.run(args.stages or None, force=args.force, dry_run=args.dry_run)
+    if any(s in ("failed", "blocked") for s in status.values()):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import config
+from services.album_cover_service import AlbumCoverService
+from services.chart_index import ChartIndex
+
+# run from scripts/: python serve_charts.py [--port 8023]
+#   /weeks                          every chart week, newest first
+#   /chart/<yyyy-mm-dd|latest>      one week, ?limit=n
+#   /song/<id>                      a song and its chart run
+#   /artist/<id or name>            an artist's songs and every chart entry
+#   /number-ones?from=&to=          each week's #1, both ends optional and inclusive
+#   /top?from=&to=&n=10             most chart points over the range
+HOST = "127.0.0.1"  # local only, there is no auth
+PORT = 8023
+RELOAD_INTERVAL = 2.0  # seconds between checks of points/ for new or rewritten weeks
+MAX_CACHED_RESPONSES = 4096
+COVER_CACHE_FILE = os.path.join(config.SCRIPT_DIR, 'album_covers.csv')
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+def load_index(points_root, chart_limit):
+    started = time.perf_counter()
+    covers = AlbumCoverService(COVER_CACHE_FILE).cache
+    index = ChartIndex(points_root, chart_limit, covers).load()
+    print(f"Indexed {len(index.weeks)} weeks, {len(index.songs)} songs and {len(index.artists)} artists "
+          f"in {time.perf_counter() - started:.2f}s")
+    return index
+
+def count_param(query, name, default=None):
+    """a positive whole number from the query string, ValueError otherwise"""
+    if name not in query:
+        return default
+    value = int(query[name])
+    if value < 1:
+        raise ValueError(f"{name} must be at least 1, got {value}")
+    return value
+
+class ChartServer:
+    """answers chart queries from a ChartIndex, swapping in a fresh one whenever points/ changes"""
+
+    def __init__(self, points_root=config.POINTS_DIR, chart_limit=config.CHART_LIMIT):
+        self.points_root = points_root
+        self.chart_limit = chart_limit
+        self.signature = ChartIndex.signature(points_root)
+        self.index = load_index(points_root, chart_limit)
+        self.responses = {}  # {request target: (status, body, etag)} for the current index
+
+    def route(self, target):
+        """(status, payload) for a request target"""
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        index = self.index
+
+        try:
+            if parts == ["weeks"]:
+                return 200, {"weeks": index.weeks[::-1]}
+            if len(parts) == 2 and parts[0] == "chart":
+                payload = index.chart(parts[1], count_param(query, "limit"))
+            elif len(parts) == 2 and parts[0] == "song":
+                payload = index.song(parts[1])
+            elif len(parts) == 2 and parts[0] == "artist":
+                payload = index.artist(parts[1])
+            elif parts == ["number-ones"]:
+                payload = index.number_ones_between(query.get("from"), query.get("to"))
+            elif parts == ["top"]:
+                payload = index.top(query.get("from"), query.get("to"), count_param(query, "n", 10))
+            else:
+                return 404, {"error": f"unknown path {url.path}"}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+        if payload is None:
+            return 404, {"error": f"nothing found for {url.path}"}
+        return 200, payload
+
+    def respond(self, target):
+        """(status, body, etag), cached until the next reload since the index never changes in between"""
+        cached = self.responses.get(target)
+        if cached is None:
+            status, payload = self.route(target)
+            body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            cached = (status, body, etag)
+            if len(self.responses) >= MAX_CACHED_RESPONSES:
+                self.responses.clear()
+            self.responses[target] = cached
+        return cached
+
+    async def handle(self, reader, writer):
+        """one keep-alive connection, GET only"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                if method not in ("GET", "HEAD"):
+                    status, body, etag = 405, b'{"error":"read only"}', None
+                else:
+                    status, body, etag = self.respond(target)
+                    if status == 200 and headers.get("if-none-match") == etag:
+                        status, body = 304, b""
+
+                head = [
+                    f"HTTP/1.1 {status} {REASONS[status]}",
+                    "Content-Type: application/json; charset=utf-8",
+                    f"Content-Length: {len(body)}",
+                    "Cache-Control: no-cache",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                if etag:
+                    head.append(f"ETag: {etag}")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def reload_when_changed(self, interval=RELOAD_INTERVAL):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            signature = await loop.run_in_executor(None, ChartIndex.signature, self.points_root)
+            if signature == self.signature:
+                continue
+            # built off the event loop, requests keep being answered from the old index meanwhile
+            index = await loop.run_in_executor(None, load_index, self.points_root, self.chart_limit)
+            self.index, self.responses, self.signature = index, {}, signature
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving charts on http://{host}:{port}/")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.reload_when_changed())
+
+def main():
+    parser = argparse.ArgumentParser(description="serve chart queries from an in-memory index of points/")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--points", default=config.POINTS_DIR)
+    args = parser.parse_args()
+
+    os.chdir(config.SCRIPT_DIR)
+    try:
+        asyncio.run(ChartServer(args.points).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import csv
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from services.album_cover import dominant_color_from_bytes, rgb_to_hex
+from services.album_cover_service import drop_torn_tail, locked
+
+COLOR_CACHE_HEADER = ['Cover URL', 'Color']
+DEFAULT_COLOR = "#ffffff"
+HEX_COLOR = re.compile(r"#[0-9a-f]{6}")
+
+def compute_color(cover_url, local_path=None):
+    """dominant color of a cover as hex, read from the local mirror when available, None on failure"""
+    import requests
+
+    try:
+        if local_path and os.path.exists(local_path):
+            with open(local_path, 'rb') as f:
+                image_bytes = f.read()
+        else:
+            response = requests.get(cover_url, timeout=10)
+            response.raise_for_status()
+            image_bytes = response.content
+        return rgb_to_hex(dominant_color_from_bytes(image_bytes))
+    except Exception as e:
+        print(f"Error computing dominant color for {cover_url}: {e}")
+        return None
+
+class AlbumColorService:
+    """dominant album colors keyed by cover url, persisted as an append-only csv"""
+
+    def __init__(self, cache_file="album_colors.csv", max_workers=None):
+        self.cache_file = cache_file
+        self.max_workers = max_workers  # None uses every core
+        self.cache = {}
+        self.pending = []  # [(cover_url, color)] not yet appended
+        self._load_cache()
+
+    def _load_cache(self):
+        if not os.path.exists(self.cache_file):
+            return
+
+        with open(self.cache_file, 'r', encoding='utf-8', newline='') as f:
+            data = f.read()
+        rows = list(csv.reader(io.StringIO(data)))[1:]  # Skip header
+        if rows and not data.endswith("\n"):
+            # a write cut short leaves its row without a line break, e.g. url,#ab
+            rows.pop()
+
+        for row in rows:
+            if len(row) == 2 and HEX_COLOR.fullmatch(row[1]):
+                self.cache[row[0]] = row[1]
+
+    def save_cache(self):
+        """append newly computed colors to the cache file"""
+        if not self.pending:
+            return
+
+        with locked(self.cache_file):
+            drop_torn_tail(self.cache_file)
+            write_header = not os.path.exists(self.cache_file) or os.path.getsize(self.cache_file) == 0
+            with open(self.cache_file, 'a', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                if write_header:
+                    writer.writerow(COLOR_CACHE_HEADER)
+                writer.writerows(self.pending)
+        self.pending = []
+
+    def get_colors(self, cover_urls, local_paths=None):
+        """{cover_url: hex color}, computing uncached covers in a process pool"""
+        # {cover_url: mirrored copy}, read instead of downloading
+        local_paths = local_paths or {}
+        cover_urls = list(dict.fromkeys(url for url in cover_urls if url))
+        missing = [url for url in cover_urls if url not in self.cache]
+
+        if missing:
+            computed = 0
+            sources = [local_paths.get(url) for url in missing]
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                for cover_url, color in zip(missing, pool.map(compute_color, missing, sources, chunksize=4)):
+                    # failures stay uncached so the next run retries them
+                    if color is not None:
+                        self.cache[cover_url] = color
+                        self.pending.append([cover_url, color])
+                        computed += 1
+            print(f"Computed {computed} of {len(missing)} missing album colors")
+
+        return {url: self.cache.get(url, DEFAULT_COLOR) for url in cover_urls}
+
+    def get_color(self, cover_url):
+        """dominant color of a single cover, white when it has none"""
+        if not cover_url:
+            return DEFAULT_COLOR
+        return self.get_colors([cover_url])[cover_url]
@@ -1,29 +1,21 @@
-from key import API_KEY, API_SECRET
-BASE_URL = 'http://ws.audioscrobbler.com/2.0/'
+from io import BytesIO
 
-import requests
-import pylast
-import colorsys
+# requests, numpy, PIL and the api key are imported on first use, so runs
+# served entirely from the cover cache never load them
 
-from io import BytesIO
-from collections import Counter
+_client = None
+
+def get_lastfm_client():
+    """shared pooled last.fm client"""
+    global _client
+    if _client is None:
+        from key import API_KEY
+        from services.lastfm_client import LastFmClient
+        _client = LastFmClient(API_KEY)
+    return _client
 
 def get_album_cover(album_name, artist_name):
-    params = {
-        'method': 'album.getInfo',
-        'api_key': API_KEY,
-        'artist': artist_name,
-        'album': album_name,
-        'format': 'json'
-    }
-    response = requests.get(BASE_URL, params=params)
-    data = response.json()
-
-    if 'album' in data and 'image' in data['album']:
-        images = data['album']['image']
-        if images:
-            return images[-1]['#text']
-    return ""
+    return get_lastfm_client().get_album_cover(album_name, artist_name)
 
 def get_dominant_color(image_url, brightness_min = 100, brightness_max = 175, saturation_threshold = 0.15):
     """
@@ -31,46 +23,103 @@ def get_dominant_color(image_url, brightness_min = 100, brightness_max = 175, sa
 
     Args:
     - image_url: URL of the image to process.
-    - brightness_threshold: Minimum brightness value for considering a color (0-255).
+    - brightness_min / brightness_max: Brightness range for considering a color (0-255).
     - saturation_threshold: Minimum saturation value for considering a color (0-1).
 
     Returns:
     - Tuple (R, G, B) of the most dominant bright hue.
     """
+    import requests
+
     try:
-        response = requests.get(image_url)
-        image = Image.open(BytesIO(response.content))
-        image = image.convert("RGB")
-        pixels = list(image.getdata())
-
-        pixel_counts = Counter(pixels)
-
-        best_color = None
-        best_score = -1
-
-        for color, count in pixel_counts.items():
-            r, g, b = color
-            h, l, s = colorsys.rgb_to_hls(r / 255.0, g / 255.0, b / 255.0)
-
-            brightness = l * 255
-            if not (brightness_min < brightness < brightness_max):
-                continue
-            
-            if s < saturation_threshold:
-                continue
-            
-            score = count * s * (brightness / 255)
-            if score > best_score:
-                best_score = score
-                best_color = color
-
-        # Fallback to a default bright color if no suitable color is found
-        return best_color if best_color else (255, 255, 255)
-    
+        response = requests.get(image_url, timeout=10)
+        return dominant_color_from_bytes(
+            response.content, brightness_min, brightness_max, saturation_threshold
+        )
     except Exception as e:
         print(f'Error fetching bright and dominant hue: {str(e)}')
         return (255, 255, 255)
 
+def dominant_color_from_bytes(image_bytes, brightness_min = 100, brightness_max = 175,
+                              saturation_threshold = 0.15, quantize_bits = 5):
+    """Most dominant bright hue of an encoded image, see get_dominant_color."""
+    import numpy as np
+    from PIL import Image
+
+    image = Image.open(BytesIO(image_bytes)).convert("RGB")
+    pixels = np.asarray(image, dtype=np.uint8).reshape(-1, 3)
+    return dominant_color_from_pixels(
+        pixels, brightness_min, brightness_max, saturation_threshold, quantize_bits
+    )
+
+def _color_scores(r, g, b, counts, brightness_min, brightness_max, saturation_threshold):
+    """count * saturation * lightness per color like colorsys.rgb_to_hls, -1 where a filter rejects it"""
+    import numpy as np
+
+    maxc = np.maximum(np.maximum(r, g), b) / 255.0
+    minc = np.minimum(np.minimum(r, g), b) / 255.0
+    sumc = maxc + minc
+    rangec = maxc - minc
+    lightness = sumc / 2.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        saturation = np.where(lightness <= 0.5, rangec / sumc, rangec / (2.0 - maxc - minc))
+    saturation = np.where(rangec == 0, 0.0, saturation)
+
+    brightness = lightness * 255
+    mask = (brightness_min < brightness) & (brightness < brightness_max) & (saturation >= saturation_threshold)
+    return np.where(mask, counts * saturation * (brightness / 255), -1.0)
+
+def dominant_color_from_pixels(pixels, brightness_min = 100, brightness_max = 175,
+                               saturation_threshold = 0.15, quantize_bits = 5):
+    """
+    Vectorized dominant color over an (N, 3) uint8 pixel array.
+
+    Pixels are bucketed to quantize_bits per channel and counted with bincount, buckets
+    are scored by their center color and the winner is the best scoring exact color inside
+    the best bucket. quantize_bits = 8 scores every distinct color exactly like the
+    per-color colorsys loop this replaced.
+    """
+    import numpy as np
+
+    packed = (pixels[:, 0].astype(np.uint32) << 16) | (pixels[:, 1].astype(np.uint32) << 8) | pixels[:, 2]
+    thresholds = (brightness_min, brightness_max, saturation_threshold)
+
+    if quantize_bits < 8:
+        shift = 8 - quantize_bits
+        q = (pixels >> shift).astype(np.uint32)
+        bins = (q[:, 0] << (2 * quantize_bits)) | (q[:, 1] << quantize_bits) | q[:, 2]
+
+        counts = np.bincount(bins, minlength=1 << (3 * quantize_bits))
+        buckets = np.nonzero(counts)[0]
+        counts = counts[buckets]
+        channel_mask = (1 << quantize_bits) - 1
+        half_bucket = 1 << shift >> 1
+        r = (((buckets >> (2 * quantize_bits)) & channel_mask) << shift) + half_bucket
+        g = (((buckets >> quantize_bits) & channel_mask) << shift) + half_bucket
+        b = ((buckets & channel_mask) << shift) + half_bucket
+
+        score = _color_scores(r, g, b, counts, *thresholds)
+        if score.max() < 0:
+            # Fallback to a default bright color if no suitable color is found
+            return (255, 255, 255)
+        # only the winning bucket's pixels are refined exactly
+        packed = packed[bins == buckets[int(np.argmax(score))]]
+
+    colors, first_seen, counts = np.unique(packed, return_index=True, return_counts=True)
+    score = _color_scores((colors >> 16) & 255, (colors >> 8) & 255, colors & 255, counts, *thresholds)
+    if score.max() >= 0:
+        # ties go to the color seen first, as in the colorsys loop
+        tied = np.flatnonzero(score == score.max())
+        best = colors[tied[int(np.argmin(first_seen[tied]))]]
+    elif quantize_bits < 8:
+        # the bucket passed on its center color only, take its most common exact color
+        best = colors[int(np.argmax(counts))]
+    else:
+        return (255, 255, 255)
+
+    best = int(best)
+    return ((best >> 16) & 255, (best >> 8) & 255, best & 255)
+
 def rgb_to_hex(rgb):
     """Convert an RGB color to HEX format."""
     return f'#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}'
\ No newline at end of file
@@ -1,40 +1,247 @@
 import csv
+import io
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from services.album_cover import get_album_cover
+from services.instrumentation import get_metrics
+
+try:
+    import fcntl
+except ImportError:  # windows, no cross-process locking
+    fcntl = None
+
+CACHE_HEADER = ['Album', 'Artist', 'Cover URL', 'Fetched At', 'Local Path']
+
+@contextmanager
+def locked(path):
+    """exclusive lock shared by every process using this cache file"""
+    if fcntl is None:
+        yield
+        return
+
+    with open(f"{path}.lock", 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def drop_torn_tail(path):
+    """cut a last line left without a line break by an interrupted append, hold locked(path) around it
+
+    new rows would otherwise be glued onto it, and ending it with a line break instead would
+    let a row torn partway through pass for a whole one
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b"\n":
+            return
+        f.seek(0)
+        f.truncate(f.read().rfind(b"\n") + 1)
 
 class AlbumCoverService:
-    """manages album cover urls with caching"""
-    
-    def __init__(self, cache_file="album_covers.csv"):
+    """manages album cover urls with an append-only csv cache"""
+
+    def __init__(self, cache_file="album_covers.csv", client=None, max_workers=8,
+                 negative_ttl_days=7, compact_ratio=2, mirror=None):
         self.cache_file = cache_file
+        self.client = client
+        self.mirror = mirror  # CoverMirror, keeps local copies of every cover when set
+        self.max_workers = max_workers
+        self.negative_ttl = negative_ttl_days * 24 * 60 * 60
+        self.compact_ratio = compact_ratio
         self.cache = {}
+        self.fetched_at = {}
+        self.local_paths = {}  # {(album, artist): name in the cover mirror}
+        self.pending = []  # [(album, artist, cover_url, fetched_at, local_path)] not yet appended
+        self.log_rows = 0
         self._load_cache()
-    
+
     def _load_cache(self):
-        """load album cover cache from csv"""
+        """replay the cache log, later rows win"""
+        self.cache, self.fetched_at, self.local_paths, self.log_rows = self._read_log()
+
+    def _read_log(self):
+        cache = {}
+        fetched_at = {}
+        local_paths = {}
+        log_rows = 0
+
         if os.path.exists(self.cache_file):
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                next(reader)  # Skip header
-                for row in reader:
-                    album, artist, cover_url = row
-                    self.cache[(album, artist)] = cover_url
-    
+            with open(self.cache_file, 'r', encoding='utf-8', newline='') as f:
+                data = f.read()
+            rows = list(csv.reader(io.StringIO(data)))[1:]  # Skip header
+            if rows and not data.endswith("\n"):
+                # a write cut short leaves its row without a line break, however many fields made it
+                rows.pop()
+
+            for row in rows:
+                # shorter rows predate timestamps / local paths
+                if not 3 <= len(row) <= 5:
+                    continue
+                album, artist, cover_url = row[:3]
+                try:
+                    timestamp = int(row[3]) if len(row) > 3 and row[3] else None
+                except ValueError:
+                    continue
+                local_path = row[4] if len(row) > 4 else ""
+
+                cache[(album, artist)] = cover_url
+                fetched_at[(album, artist)] = timestamp
+                local_paths[(album, artist)] = local_path
+                log_rows += 1
+
+        return cache, fetched_at, local_paths, log_rows
+
     def save_cache(self):
-        """save album cover cache to csv"""
-        with open(self.cache_file, 'w', encoding='utf-8', newline='') as f:
+        """append new entries to the cache log, compacting it once it has grown enough"""
+        if not self.pending:
+            return
+
+        with locked(self.cache_file):
+            drop_torn_tail(self.cache_file)
+            write_header = not os.path.exists(self.cache_file) or os.path.getsize(self.cache_file) == 0
+            with open(self.cache_file, 'a', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                if write_header:
+                    writer.writerow(CACHE_HEADER)
+                writer.writerows(self.pending)
+
+            self.log_rows += len(self.pending)
+            self.pending = []
+
+            if self.log_rows > self.compact_ratio * max(len(self.cache), 1):
+                self._compact()
+
+    def _compact(self):
+        """rewrite the log with one row per key, must hold the lock"""
+        # re-read so entries appended by other processes survive
+        cache, fetched_at, local_paths, _ = self._read_log()
+
+        tmp_file = f"{self.cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8', newline='') as f:
             writer = csv.writer(f)
-            writer.writerow(['Album', 'Artist', 'Cover URL'])
-            for (album, artist), cover_url in self.cache.items():
-                writer.writerow([album, artist, cover_url])
-    
+            writer.writerow(CACHE_HEADER)
+            for (album, artist), cover_url in cache.items():
+                timestamp = fetched_at[(album, artist)]
+                writer.writerow([
+                    album, artist, cover_url,
+                    '' if timestamp is None else timestamp,
+                    local_paths[(album, artist)]
+                ])
+        os.replace(tmp_file, self.cache_file)
+
+        self.cache.update(cache)
+        self.fetched_at.update(fetched_at)
+        self.local_paths.update(local_paths)
+        self.log_rows = len(cache)
+
+    def needs_fetch(self, key):
+        """uncached, or cached as missing for longer than the negative ttl"""
+        if key not in self.cache:
+            return True
+        if self.cache[key]:
+            return False
+
+        fetched_at = self.fetched_at.get(key)
+        return fetched_at is None or time.time() - fetched_at > self.negative_ttl
+
     def get_cover_url(self, album, artist):
         """get album cover url, fetching if not cached"""
         key = (album, artist)
-        
-        if key not in self.cache:
-            cover_url = get_album_cover(album, artist)
-            self.cache[key] = cover_url
+
+        if self.needs_fetch(key):
+            get_metrics().count("cover_cache_misses")
+            cover_url = self._fetch(album, artist)
+            self._store(key, cover_url)
             return cover_url
-        
-        return self.cache[key]
\ No newline at end of file
+
+        return self.cache[key]
+
+    def prefetch(self, keys):
+        """resolve every uncached (album, artist) key concurrently, returns number fetched"""
+        keys = list(dict.fromkeys(keys))
+        missing = [key for key in keys if self.needs_fetch(key)]
+        metrics = get_metrics()
+        metrics.count("cover_cache_hits", len(keys) - len(missing))
+        metrics.count("cover_cache_misses", len(missing))
+        if not missing:
+            if self.mirror is not None:
+                self.mirror_covers(keys)
+            return 0
+
+        def fetch(key):
+            try:
+                return key, self._fetch(*key)
+            except Exception as e:
+                # leave uncached so the next run retries it
+                print(f"Error fetching album cover for {key[0]} by {key[1]}: {e}")
+                return key, None
+
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for key, cover_url in pool.map(fetch, missing):
+                if cover_url is not None:
+                    self._store(key, cover_url)
+                    fetched += 1
+
+        metrics.count("cover_fetch_failures", len(missing) - fetched)
+        print(f"Fetched {fetched} of {len(missing)} missing album covers")
+        if self.mirror is not None:
+            self.mirror_covers(keys)
+        return fetched
+
+    def mirror_covers(self, keys):
+        """copy every cached cover for the given keys into the local mirror, returns number mirrored"""
+        unmirrored = [
+            key for key in dict.fromkeys(keys)
+            if self.cache.get(key) and not self.mirror.has(self.local_paths.get(key))
+        ]
+        if not unmirrored:
+            return 0
+
+        local_names = self.mirror.mirror(self.cache[key] for key in unmirrored)
+        mirrored = 0
+        for key in unmirrored:
+            local_name = local_names.get(self.cache[key])
+            if local_name:
+                # same url and fetch time, later log rows win
+                self._store(key, self.cache[key], local_name, self.fetched_at.get(key))
+                mirrored += 1
+        return mirrored
+
+    def get_local_path(self, album, artist):
+        """path of the mirrored original cover, None if it is not mirrored"""
+        local_name = self.local_paths.get((album, artist))
+        if self.mirror is None or not local_name:
+            return None
+        path = self.mirror.original_path(local_name)
+        return path if os.path.exists(path) else None
+
+    def get_thumbnail_path(self, album, artist, size):
+        """path of a mirrored thumbnail, None if it is not mirrored"""
+        local_name = self.local_paths.get((album, artist))
+        if self.mirror is None or not local_name:
+            return None
+        path = self.mirror.thumbnail_path(local_name, size)
+        return path if os.path.exists(path) else None
+
+    def _store(self, key, cover_url, local_path="", timestamp=None):
+        if timestamp is None:
+            timestamp = int(time.time())
+        self.cache[key] = cover_url
+        self.fetched_at[key] = timestamp
+        self.local_paths[key] = local_path
+        self.pending.append([key[0], key[1], cover_url, timestamp, local_path])
+
+    def _fetch(self, album, artist):
+        if self.client is not None:
+            return self.client.get_album_cover(album, artist)
+        return get_album_cover(album, artist)
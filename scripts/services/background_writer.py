@@ -0,0 +1,48 @@
+import queue
+import threading
+
+class BackgroundWriter:
+    """runs file writes on one daemon thread, in submission order, so the caller never waits on disk"""
+
+    def __init__(self, max_pending=64):
+        # bounded so a slow disk applies backpressure instead of buffering the whole history
+        self.jobs = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.written = 0
+        self.thread = threading.Thread(target=self._work, name="background-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, func, *args):
+        """queue func(*args), raising straight away if an earlier write failed"""
+        if self.error is not None:
+            raise self.error
+        self.jobs.put((func, args))
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            func, args = job
+            if self.error is not None:
+                continue
+            try:
+                func(*args)
+                self.written += 1
+            except Exception as e:
+                # surfaced to the caller on its next submit or on close
+                self.error = e
+
+    def close(self):
+        """wait for every queued write, then raise the first failure if there was one"""
+        self.jobs.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -1,11 +1,25 @@
+import copy
 import csv
 import os
 from math import floor
 from datetime import datetime
-from collections import defaultdict
+from collections import ChainMap, defaultdict
 from models.song import Song
 from models.chart_entry import ChartEntry
 from models.weekly_play import WeeklyPlay
+from services.instrumentation import get_metrics
+
+class _HistoryOverlay(dict):
+    """all_songs_history seen through a provisional build, an entry is copied the first time it is read"""
+
+    def __init__(self, base):
+        super().__init__()
+        self.base = base
+
+    def __missing__(self, key):
+        entry = dict(self.base[key]) if key in self.base else self.base.default_factory()
+        self[key] = entry
+        return entry
 
 class ChartBuilder:
     """builds weekly charts from play data"""
@@ -23,6 +37,9 @@ class ChartBuilder:
         self.ranked_weeks = []
         self.original_song_names = {}
         self.charted_cache = {}
+        self.number_ones_ledger = []
+        self.number_one_history = {}  # {song key: {"total_weeks", "first_week"}}
+        self.is_provisional = False  # set on provisional() views, whose week may still change
     
     def load_charted_cache(self, cache_file):
         """load history of when songs first charted"""
@@ -35,8 +52,53 @@ class ChartBuilder:
                     key = (song.lower(), artist)
                     self.charted_cache[key] = first_week
     
+    def get_state(self):
+        """running state after the last built week, picklable"""
+        return {
+            "active_songs": self.active_songs,
+            "all_songs_history": dict(self.all_songs_history),
+            "ranked_weeks": self.ranked_weeks,
+            "original_song_names": self.original_song_names,
+            "charted_cache": self.charted_cache,
+            "number_ones_ledger": self.number_ones_ledger,
+            "number_one_history": self.number_one_history,
+        }
+    
+    def set_state(self, state):
+        """continue from a get_state() snapshot as if every week in it had been built here"""
+        self.active_songs = state["active_songs"]
+        self.all_songs_history.clear()
+        self.all_songs_history.update(state["all_songs_history"])
+        self.ranked_weeks = state["ranked_weeks"]
+        self.original_song_names = state["original_song_names"]
+        self.charted_cache = state["charted_cache"]
+        self.number_ones_ledger = state["number_ones_ledger"]
+        self.number_one_history = state["number_one_history"]
+    
+    def provisional(self):
+        """view of this builder to score a week that is not final on, leaving this builder untouched
+
+        it shares every state object it only reads, copies the song history entries it touches and
+        records neither a #1 nor charted weeks
+        """
+        view = copy.copy(self)
+        view.is_provisional = True
+        view.active_songs = dict(self.active_songs)
+        view.original_song_names = ChainMap({}, self.original_song_names)
+        view.all_songs_history = _HistoryOverlay(self.all_songs_history)
+        view.ranked_weeks = copy.copy(self.ranked_weeks)
+        return view
+    
     def build_weekly_chart(self, weekly_plays, week_key):
         """build a chart from weekly play data"""
+        metrics = get_metrics()
+        with metrics.stage("build", week=week_key):
+            chart_entries = self._build_weekly_chart(weekly_plays, week_key, metrics)
+            metrics.count("plays", len(weekly_plays))
+            metrics.gauge("active_songs", len(self.active_songs))
+        return chart_entries
+    
+    def _build_weekly_chart(self, weekly_plays, week_key, metrics):
         for play in weekly_plays.values():
             key = play.song.key
             if key not in self.active_songs:
@@ -127,12 +189,20 @@ class ChartBuilder:
         chart_entries = []
         prev_week_positions = self._get_previous_week_positions()
         
+        if metrics.enabled:
+            seeded = sum(key in self.charted_cache for key, _ in ranked)
+            metrics.count("charted_cache_hits", seeded)
+            metrics.count("charted_cache_misses", len(ranked) - seeded)
+        
         for rank, (key, points) in enumerate(ranked, start=1):
             entry = self._create_chart_entry(
                 key, rank, raw_data[key], prev_week_positions, week_key
             )
             chart_entries.append(entry)
         
+        if ranked and not self.is_provisional:
+            self._record_number_one(ranked[0][0], chart_entries[0], week_key)
+        
         # store this week's rankings
         self.ranked_weeks.append((
             week_key,
@@ -207,12 +277,31 @@ class ChartBuilder:
         else:
             entry.percent_change = "--"
         
-        # update charted cache
-        if key not in self.charted_cache or week_key < self.charted_cache[key]:
+        # update charted cache, a provisional week may still change so it is not recorded
+        if not self.is_provisional and (key not in self.charted_cache or week_key < self.charted_cache[key]):
             self.charted_cache[key] = week_key
         
         return entry
     
+    def _record_number_one(self, song_key, entry, week_key):
+        """append this week's #1 to the ledger with its streak and running totals"""
+        history = self.number_one_history.setdefault(
+            song_key, {"total_weeks": 0, "first_week": week_key}
+        )
+        history["total_weeks"] += 1
+        
+        streak = 1
+        if self.number_ones_ledger and self.number_ones_ledger[-1]['key'] == song_key:
+            streak = self.number_ones_ledger[-1]['streak'] + 1
+        
+        self.number_ones_ledger.append({
+            'key': song_key,
+            'entry': entry,
+            'streak': streak,
+            'total_weeks': history["total_weeks"],
+            'first_week': history["first_week"]
+        })
+    
     def _get_past_data(self, song_key):
         """get data dictionary from previous weeks"""
         prev_data = {}
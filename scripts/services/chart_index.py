@@ -0,0 +1,164 @@
+import os
+from bisect import bisect_left, bisect_right
+from heapq import nsmallest
+
+from reports.json_api_report import JsonApiReport, shard_id
+from repositories.chart_repository import ChartRepository
+
+class ChartIndex:
+    """the whole chart history in memory, answering the same shapes as the static json api"""
+
+    def __init__(self, points_root="points", chart_limit=100, covers=None):
+        self.points_root = points_root
+        self.chart_limit = chart_limit
+        self.covers = covers or {}  # {(album, artist): cover url}, never fetched from here
+
+        self.weeks = []   # ["yyyy-mm-dd"] in chart order
+        self.charts = {}  # {week: [entry]}
+        self.songs = {}   # {song id: song summary with its run}
+        self.artists = {}  # {artist id: artist with its songs}
+        self.artist_ids = {}  # {lowercased name: artist id}
+        self.number_ones = []  # [(week, entry)] in chart order
+        self.song_points = []  # [(song id, [week index], [points before each of those weeks, then the total])]
+
+    @staticmethod
+    def week_files(points_root):
+        """[(year, mm-dd, points file)] of every week in chart order"""
+        files = []
+        for year in sorted(os.listdir(points_root)):
+            year_dir = os.path.join(points_root, year)
+            if not (year.isdigit() and os.path.isdir(year_dir)):
+                continue
+            for filename in sorted(os.listdir(year_dir)):
+                if filename.endswith(".csv"):
+                    files.append((year, filename[:-len(".csv")], os.path.join(year_dir, filename)))
+        return files
+
+    @staticmethod
+    def signature(points_root):
+        """changes whenever a week is added, removed or rewritten"""
+        stats = []
+        for year, week, path in ChartIndex.week_files(points_root):
+            stat = os.stat(path)
+            stats.append((year, week, stat.st_size, stat.st_mtime_ns))
+        return hash(tuple(stats))
+
+    def load(self):
+        """read every week, the json api report does the song and artist bookkeeping"""
+        api = JsonApiReport(output_dir=None, chart_limit=self.chart_limit)
+        for year, week, path in self.week_files(self.points_root):
+            api.apply_week(year, week, ChartRepository.load_weekly_rows(path))
+
+        self.weeks = api.weeks
+        self.charts = api.new_weeks
+        for entries in self.charts.values():
+            for entry in entries:
+                entry["coverUrl"] = self.covers.get((entry["album"], entry["artist"]), "")
+
+        self.songs = {}
+        for song in api.songs.values():
+            self.songs[song["id"]] = {
+                "id": song["id"],
+                "title": song["title"],
+                "artist": song["artist"],
+                "artistId": api.artists[song["artist"]]["id"],
+                "album": song["album"],
+                "coverUrl": self.covers.get((song["album"], song["artist"]), ""),
+                **JsonApiReport._song_summary(song),
+                "runFields": ["week", "rank", "points"],
+                "run": song["run"],
+            }
+
+        self.artists = {}
+        self.artist_ids = {}
+        for name, artist in api.artists.items():
+            songs = [self.songs[shard_id(*key)] for key in artist["songs"]]
+            self.artists[artist["id"]] = {
+                "id": artist["id"],
+                "name": name,
+                "songs": [
+                    {key: song[key] for key in ("id", "title", "peak", "weeksAtPeak", "weeks", "debut")}
+                    for song in songs
+                ],
+                "entryFields": ["week", "rank", "points", "songId"],
+                "entries": sorted(
+                    [week, rank, points, song["id"]]
+                    for song in songs for week, rank, points in song["run"]
+                ),
+            }
+            self.artist_ids[name.lower()] = artist["id"]
+
+        self.number_ones = [(week, self.charts[week][0]) for week in self.weeks if self.charts[week]]
+
+        # running points per song, so its total over any range is one subtraction
+        week_index = {week: index for index, week in enumerate(self.weeks)}
+        self.song_points = []
+        for song_id, song in self.songs.items():
+            indexes, cumulative = [], [0]
+            for week, _, points in sorted(song["run"], key=lambda charted: week_index[charted[0]]):
+                indexes.append(week_index[week])
+                cumulative.append(cumulative[-1] + points)
+            self.song_points.append((song_id, indexes, cumulative))
+        return self
+
+    def chart(self, week, limit=None):
+        if week == "latest" and self.weeks:
+            week = self.weeks[-1]
+        entries = self.charts.get(week)
+        if entries is None:
+            return None
+        return {"week": week, "entries": entries[:limit] if limit is not None else entries}
+
+    def song(self, song_id):
+        return self.songs.get(song_id)
+
+    def artist(self, artist):
+        """by id, or by name ignoring case"""
+        found = self.artists.get(artist)
+        if found is None:
+            found = self.artists.get(self.artist_ids.get(artist.lower()))
+        return found
+
+    def _week_range(self, start, end):
+        """(first index, index past the last) of the weeks from start to end inclusive"""
+        lo = bisect_left(self.weeks, start) if start else 0
+        hi = bisect_right(self.weeks, end) if end else len(self.weeks)
+        return lo, hi
+
+    def number_ones_between(self, start=None, end=None):
+        weeks = [week for week, _ in self.number_ones]
+        lo = bisect_left(weeks, start) if start else 0
+        hi = bisect_right(weeks, end) if end else len(weeks)
+        return {
+            "from": start,
+            "to": end,
+            "entries": [
+                {"week": week, "songId": entry["songId"], "title": entry["title"], "artist": entry["artist"],
+                 "points": entry["points"], "coverUrl": entry["coverUrl"]}
+                for week, entry in self.number_ones[lo:hi]
+            ],
+        }
+
+    def top(self, start=None, end=None, n=10):
+        """songs with the most chart points over the weeks from start to end"""
+        lo, hi = self._week_range(start, end)
+        totals = {}
+        for song_id, indexes, cumulative in self.song_points:
+            if indexes[-1] < lo or indexes[0] >= hi:
+                continue
+            first, past = bisect_left(indexes, lo), bisect_left(indexes, hi)
+            if first < past:
+                totals[song_id] = cumulative[past] - cumulative[first]
+
+        ranked = nsmallest(n, totals, key=lambda song_id: (-totals[song_id], self.songs[song_id]["title"], song_id))
+        return {
+            "from": self.weeks[lo] if lo < hi else start,
+            "to": self.weeks[hi - 1] if lo < hi else end,
+            "weeks": hi - lo,
+            "entries": [
+                {"rank": rank, "songId": song_id, "title": self.songs[song_id]["title"],
+                 "artist": self.songs[song_id]["artist"], "points": totals[song_id],
+                 "coverUrl": self.songs[song_id]["coverUrl"]}
+                for rank, song_id in enumerate(ranked, start=1)
+            ],
+        }
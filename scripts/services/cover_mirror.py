@@ -0,0 +1,139 @@
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlparse
+
+THUMBNAIL_SIZES = (64, 150)
+THUMBNAIL_FORMAT = 'WEBP'
+THUMBNAIL_QUALITY = 85
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
+
+def write_atomic(path, data):
+    """write bytes to path via a temp file, so readers never see a partial image"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # unique per call, download threads of one process can write the same cover at once
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)  # mkstemp makes it owner-only, covers are served to everyone
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def make_thumbnails(original_path, thumbnail_paths):
+    """resize one original into every missing {size: path} thumbnail, returns number written"""
+    from PIL import Image
+
+    written = 0
+    with Image.open(original_path) as image:
+        image = image.convert('RGB')
+        for size, path in thumbnail_paths.items():
+            if os.path.exists(path):
+                continue
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size), Image.LANCZOS)
+            buffer = BytesIO()
+            thumbnail.save(buffer, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+            write_atomic(path, buffer.getvalue())
+            written += 1
+    return written
+
+class CoverMirror:
+    """content-addressed local copies of album covers plus resized thumbnails"""
+
+    def __init__(self, root="../public/covers", sizes=THUMBNAIL_SIZES, download_workers=8,
+                 max_workers=None, timeout=10):
+        self.root = root
+        self.sizes = tuple(sizes)
+        self.download_workers = download_workers
+        self.max_workers = max_workers  # thumbnail processes, None uses every core
+        self.timeout = timeout
+        self._session = None  # created on the first download
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    @staticmethod
+    def local_name(image_bytes, cover_url):
+        """content address of an image, e.g. ab/ab12...ef.jpg"""
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        extension = os.path.splitext(urlparse(cover_url).path)[1].lower()
+        if extension not in IMAGE_EXTENSIONS:
+            extension = '.jpg'
+        return f"{digest[:2]}/{digest}{extension}"
+
+    def original_path(self, local_name):
+        return os.path.join(self.root, "original", local_name)
+
+    def thumbnail_path(self, local_name, size):
+        stem = os.path.splitext(local_name)[0]
+        return os.path.join(self.root, str(size), f"{stem}.{THUMBNAIL_FORMAT.lower()}")
+
+    def has(self, local_name):
+        """whether the original and every thumbnail are on disk"""
+        return bool(local_name) and os.path.exists(self.original_path(local_name)) and \
+            all(os.path.exists(self.thumbnail_path(local_name, size)) for size in self.sizes)
+
+    def read(self, local_name):
+        with open(self.original_path(local_name), 'rb') as f:
+            return f.read()
+
+    def download(self, cover_url):
+        """fetch one cover into the store, returns its local name"""
+        response = self.session.get(cover_url, timeout=self.timeout)
+        response.raise_for_status()
+
+        local_name = self.local_name(response.content, cover_url)
+        path = self.original_path(local_name)
+        if not os.path.exists(path):
+            write_atomic(path, response.content)
+        return local_name
+
+    def mirror(self, cover_urls):
+        """download covers concurrently, then build thumbnails in a process pool, returns {url: local name}"""
+        cover_urls = list(dict.fromkeys(url for url in cover_urls if url))
+
+        def download(cover_url):
+            try:
+                return cover_url, self.download(cover_url)
+            except Exception as e:
+                print(f"Error mirroring album cover {cover_url}: {e}")
+                return cover_url, None
+
+        local_names = {}
+        with ThreadPoolExecutor(max_workers=self.download_workers) as pool:
+            for cover_url, local_name in pool.map(download, cover_urls):
+                if local_name is not None:
+                    local_names[cover_url] = local_name
+
+        jobs = {}
+        for local_name in set(local_names.values()):
+            thumbnails = {size: self.thumbnail_path(local_name, size) for size in self.sizes}
+            if not all(os.path.exists(path) for path in thumbnails.values()):
+                jobs[local_name] = (self.original_path(local_name), thumbnails)
+
+        failed = set()
+        if jobs:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {
+                    local_name: pool.submit(make_thumbnails, original_path, thumbnails)
+                    for local_name, (original_path, thumbnails) in jobs.items()
+                }
+                for local_name, future in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Error creating thumbnails for {local_name}: {e}")
+                        failed.add(local_name)
+
+        print(f"Mirrored {len(local_names)} of {len(cover_urls)} album covers ({len(jobs)} resized)")
+        return {url: name for url, name in local_names.items() if name not in failed}
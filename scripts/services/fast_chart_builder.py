@@ -0,0 +1,135 @@
+import copy
+from collections import deque
+from heapq import nlargest
+
+from services.chart_builder import ChartBuilder
+
+class FastChartBuilder(ChartBuilder):
+    """ChartBuilder with bounded history and constant-time lookups of the last two charts"""
+
+    def __init__(self, points_calculator, chart_limit=100):
+        super().__init__(points_calculator, chart_limit)
+        # scoring only ever looks two charts back
+        self.ranked_weeks = deque(maxlen=2)
+        self.recent_data = deque(maxlen=2)  # [{song key: raw data}] for the last two charts
+        self.previous_positions = {}
+
+    def get_state(self):
+        state = super().get_state()
+        state["recent_data"] = self.recent_data
+        state["previous_positions"] = self.previous_positions
+        return state
+
+    def set_state(self, state):
+        super().set_state(state)
+        self.recent_data = state["recent_data"]
+        self.previous_positions = state["previous_positions"]
+
+    def provisional(self):
+        view = super().provisional()
+        view.recent_data = copy.copy(self.recent_data)
+        return view
+
+    def _build_weekly_chart(self, weekly_plays, week_key, metrics):
+        calculator = self.calculator
+        active_songs = self.active_songs
+        history = self.all_songs_history
+
+        totals = {}
+        for play in weekly_plays.values():
+            key = play.song.key
+            if key not in active_songs:
+                active_songs[key] = play.song
+                self.original_song_names[key] = play.song.name
+
+            counts = totals.get(key)
+            if counts is None:
+                totals[key] = [play.streams, play.sales, play.airplay]
+            else:
+                counts[0] += play.streams
+                counts[1] += play.sales
+                counts[2] += play.airplay
+
+        print(f"Saved weekly points: {week_key}. Songs: {len(active_songs)}")
+
+        empty = {}
+        prev_week = self.recent_data[-1] if len(self.recent_data) >= 1 else empty
+        two_weeks = self.recent_data[-2] if len(self.recent_data) >= 2 else empty
+
+        raw_data = {}
+        dead_songs = []
+        for key, song in active_songs.items():
+            streams, sales, airplay = totals.get(key, (0, 0, 0))
+            prev_data = prev_week.get(key, empty)
+            two_weeks_data = two_weeks.get(key, empty)
+            prev_pts = prev_data.get('weighted_points', 0)
+            two_weeks_pts = two_weeks_data.get('weighted_points', 0)
+
+            raw_points = calculator.calculate_raw_points(streams, sales, airplay)
+            weighted_points = calculator.calculate_weighted_points(raw_points, prev_pts, two_weeks_pts)
+
+            if weighted_points <= 0:
+                dead_songs.append(key)
+                continue
+
+            w_metrics = calculator.calculate_weighted_metrics(
+                {'streams': streams, 'sales': sales, 'airplay': airplay},
+                prev_data,
+                two_weeks_data
+            )
+
+            raw_data[key] = {
+                'streams': streams,
+                'sales': sales,
+                'airplay': airplay,
+                'weighted_streams': w_metrics['streams'],
+                'weighted_sales': w_metrics['sales'],
+                'weighted_airplay': w_metrics['airplay'],
+                'raw_points': raw_points,
+                'prev_pts': prev_pts,
+                'two_weeks_pts': two_weeks_pts,
+                'weighted_points': weighted_points
+            }
+
+            if not history[key]["album"]:
+                history[key]["album"] = song.album
+
+        for key in dead_songs:
+            del active_songs[key]
+
+        # song keys are unique, so the top n by this key matches a full sort
+        ranked = nlargest(
+            self.chart_limit,
+            raw_data,
+            key=lambda key: (raw_data[key]['weighted_points'], raw_data[key]['raw_points'], key[0], key[1])
+        )
+
+        if metrics.enabled:
+            seeded = sum(key in self.charted_cache for key in ranked)
+            metrics.count("charted_cache_hits", seeded)
+            metrics.count("charted_cache_misses", len(ranked) - seeded)
+
+        chart_entries = [
+            self._create_chart_entry(key, rank, raw_data[key], self.previous_positions, week_key)
+            for rank, key in enumerate(ranked, start=1)
+        ]
+
+        if ranked and not self.is_provisional:
+            self._record_number_one(ranked[0], chart_entries[0], week_key)
+
+        self.ranked_weeks.append((
+            week_key,
+            [(key, rank, raw_data[key]['weighted_points'], raw_data[key]) for rank, key in enumerate(ranked, start=1)]
+        ))
+        self.recent_data.append({key: raw_data[key] for key in ranked})
+        self.previous_positions = {key: rank for rank, key in enumerate(ranked, start=1)}
+
+        return chart_entries
+
+    def _get_past_data(self, song_key):
+        prev_data = self.recent_data[-1].get(song_key, {}) if len(self.recent_data) >= 1 else {}
+        two_weeks_data = self.recent_data[-2].get(song_key, {}) if len(self.recent_data) >= 2 else {}
+        return prev_data, two_weeks_data
+
+    def _get_previous_week_positions(self):
+        return dict(self.previous_positions)
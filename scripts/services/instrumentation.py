@@ -0,0 +1,172 @@
+import atexit
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import datetime
+
+# set to a json path to record a run report for any script, e.g.
+# HOT100_METRICS=metrics/refresh.json python process_points.py
+METRICS_ENV = "HOT100_METRICS"
+
+_NULL_STAGE = nullcontext()
+
+class NullMetrics:
+    """default instrumentation, every call is a no-op"""
+
+    enabled = False
+
+    def stage(self, name, week=None):
+        """context manager timing a pipeline stage, optionally attributed to one chart week"""
+        return _NULL_STAGE
+
+    def count(self, name, value=1, week=None):
+        """add to a counter in the current stage (and week)"""
+
+    def gauge(self, name, value, week=None):
+        """record the latest value of a level such as the active song count"""
+
+    def count_bytes(self, path, week=None):
+        """add the size of a file just written to bytes_written"""
+
+    def summary(self):
+        return {}
+
+    def write_report(self, report_file=None):
+        pass
+
+class _Stage:
+    __slots__ = ("metrics", "name", "week", "started")
+
+    def __init__(self, metrics, name, week):
+        self.metrics = metrics
+        self.name = name
+        self.week = week
+
+    def __enter__(self):
+        self.metrics.stack.append((self.name, self.week))
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        self.metrics.stack.pop()
+
+        stage = self.metrics.stages[self.name]
+        stage["seconds"] += elapsed
+        stage["calls"] += 1
+        if self.week is not None:
+            self.metrics.weeks[self.week][f"{self.name}_seconds"] += elapsed
+        return False
+
+class RunMetrics(NullMetrics):
+    """records per-stage and per-week timings, counters and gauges for one run"""
+
+    # counts inside a stage opened with a week are attributed to that week as well
+
+    enabled = True
+
+    def __init__(self, report_file=None):
+        self.report_file = report_file
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.stack = []
+        self.stages = defaultdict(lambda: {"seconds": 0.0, "calls": 0, "counters": defaultdict(int), "gauges": {}})
+        self.weeks = defaultdict(lambda: defaultdict(int))
+        self.totals = defaultdict(int)
+
+    def stage(self, name, week=None):
+        return _Stage(self, name, week)
+
+    def _current_stage(self):
+        return self.stages[self.stack[-1][0] if self.stack else "run"]
+
+    def _current_week(self, week):
+        """explicit week, else the week of the innermost stage that has one"""
+        if week is None:
+            for _, stage_week in reversed(self.stack):
+                if stage_week is not None:
+                    return stage_week
+        return week
+
+    def count(self, name, value=1, week=None):
+        self._current_stage()["counters"][name] += value
+        self.totals[name] += value
+        week = self._current_week(week)
+        if week is not None:
+            self.weeks[week][name] += value
+
+    def gauge(self, name, value, week=None):
+        gauges = self._current_stage()["gauges"]
+        peak = gauges.get(name, {}).get("max", value)
+        gauges[name] = {"last": value, "max": max(peak, value)}
+        week = self._current_week(week)
+        if week is not None:
+            self.weeks[week][name] = value
+
+    def count_bytes(self, path, week=None):
+        try:
+            self.count("bytes_written", os.path.getsize(path), week)
+        except OSError:
+            pass
+
+    def summary(self):
+        """json-ready snapshot of everything recorded so far"""
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self.started, 4),
+            "argv": sys.argv,
+            "peak_rss_mb": _peak_rss_mb(),
+            "totals": dict(self.totals),
+            "stages": {
+                name: {
+                    "seconds": round(stage["seconds"], 4),
+                    "calls": stage["calls"],
+                    "counters": dict(stage["counters"]),
+                    "gauges": stage["gauges"],
+                }
+                for name, stage in self.stages.items()
+            },
+            "weeks": {
+                week: {name: round(value, 4) if isinstance(value, float) else value for name, value in values.items()}
+                for week, values in sorted(self.weeks.items())
+            },
+        }
+
+    def write_report(self, report_file=None):
+        report_file = report_file or self.report_file
+        if not report_file:
+            return
+
+        os.makedirs(os.path.dirname(report_file) or ".", exist_ok=True)
+        with open(report_file, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+        print(f"Run metrics saved to {report_file}")
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+_metrics = NullMetrics()
+
+def get_metrics():
+    """the active instrumentation, fetched at call time so enable() applies everywhere"""
+    return _metrics
+
+def enable(report_file=None):
+    """switch recording on for the rest of the process, writing the report at exit"""
+    global _metrics
+    _metrics = RunMetrics(report_file)
+    if report_file:
+        atexit.register(_metrics.write_report)
+    return _metrics
+
+if os.environ.get(METRICS_ENV):
+    enable(os.environ[METRICS_ENV])
@@ -0,0 +1,90 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = 'http://ws.audioscrobbler.com/2.0/'
+
+# last.fm error codes worth retrying: 11 service offline, 16 temporarily unavailable, 29 rate limit exceeded
+RETRYABLE_API_ERRORS = {11, 16, 29}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """thread-safe token bucket, refilled at `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """block until a token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class RetryableError(Exception):
+    """transient last.fm failure"""
+
+class LastFmClient:
+    """pooled, rate-limited last.fm api client with retries"""
+
+    def __init__(self, api_key, base_url=BASE_URL, max_connections=8, requests_per_second=5,
+                 max_retries=3, backoff=0.5, timeout=10):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(requests_per_second)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get_album_cover(self, album_name, artist_name):
+        """largest album image url, or "" when last.fm has none"""
+        data = self._call({
+            'method': 'album.getInfo',
+            'artist': artist_name,
+            'album': album_name,
+        })
+
+        if 'album' in data and 'image' in data['album']:
+            images = data['album']['image']
+            if images:
+                return images[-1]['#text']
+        return ""
+
+    def _call(self, params):
+        """GET the api with rate limiting, retrying transient failures with exponential backoff"""
+        params = dict(params, api_key=self.api_key, format='json')
+
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                if response.status_code in RETRYABLE_STATUS_CODES:
+                    raise RetryableError(f"HTTP {response.status_code}")
+
+                data = response.json()
+                if data.get('error') in RETRYABLE_API_ERRORS:
+                    raise RetryableError(f"last.fm error {data['error']}: {data.get('message', '')}")
+                return data
+
+            except (RetryableError, requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
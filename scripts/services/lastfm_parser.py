@@ -2,6 +2,7 @@ import csv
 from datetime import datetime, timedelta
 from collections import defaultdict
 from models.song import Song
+from services.instrumentation import get_metrics
 
 class LastFmParser:
     """parses last.fm csv data and splits by year"""
@@ -13,8 +14,9 @@ class LastFmParser:
         """parse last.fm data and split into yearly files"""
         data_by_year = defaultdict(list)
         invalid_rows = []
+        metrics = get_metrics()
         
-        with open(input_file, 'r', encoding='utf-8') as file:
+        with metrics.stage("split"), open(input_file, 'r', encoding='utf-8') as file:
             reader = csv.reader(file)
             
             for row in reader:
@@ -24,16 +26,29 @@ class LastFmParser:
                     data_by_year[adjusted_dt.year].append(row)
                 else:
                     invalid_rows.append(row)
+            
+            metrics.count("rows", reader.line_num)
+            metrics.count("invalid_rows", len(invalid_rows))
         
         # write yearly files
         for year, rows in data_by_year.items():
             output_file = f'{output_folder}{year}.csv'
-            with open(output_file, 'w', encoding='utf-8', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerows(rows)
+            with metrics.stage("write_years"):
+                with open(output_file, 'w', encoding='utf-8', newline='') as file:
+                    writer = csv.writer(file)
+                    writer.writerows(rows)
+                metrics.count_bytes(output_file)
         
         return len(data_by_year), len(invalid_rows)
     
+    def parse_row(self, row):
+        """(artist, album, song, adjusted datetime) for one export row, None if its timestamp is invalid"""
+        artist, album, song_name, timestamp = row
+        adjusted_dt = self._adjust_timestamp(timestamp)
+        if adjusted_dt is None:
+            return None
+        return artist, album, song_name, adjusted_dt
+    
     def _adjust_timestamp(self, timestamp):
         """adjust timestamp with timezone offset"""
         try:
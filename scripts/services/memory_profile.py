@@ -0,0 +1,96 @@
+import csv
+import os
+import sys
+import tracemalloc
+
+# builder state that lives for the whole replay, in attribution order
+BUILDER_STRUCTURES = [
+    "ranked_weeks", "all_songs_history", "original_song_names", "charted_cache",
+    "active_songs", "number_ones_ledger", "number_one_history"
+]
+MB = 1024 * 1024
+
+def deep_sizeof(obj, seen):
+    """bytes held by obj and everything it references that is not already in seen"""
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, type) or callable(obj):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+    return size
+
+class MemoryProfiler:
+    """tracemalloc snapshots of a chart builder every n weeks, written as a growth curve csv"""
+
+    def __init__(self, builder, every=52, output_file="memory_profile.csv", top_sites=10):
+        self.builder = builder
+        self.every = every
+        self.output_file = output_file
+        self.top_sites = top_sites
+        self.weeks = 0
+        self.rows = []
+        self.first_snapshot = None
+        self.last_snapshot = None
+
+    def start(self):
+        # one frame keeps tracing overhead low, allocation sites only need the line
+        tracemalloc.start(1)
+        self.first_snapshot = tracemalloc.take_snapshot()
+
+    def week_done(self, week_key):
+        """count a built week, snapshotting on every nth one"""
+        self.weeks += 1
+        if self.weeks % self.every == 0:
+            self.snapshot(week_key)
+
+    def snapshot(self, week_key):
+        current, peak = tracemalloc.get_traced_memory()
+        self.last_snapshot = tracemalloc.take_snapshot()
+
+        # objects shared between structures count towards the first one listed
+        seen = set()
+        row = {
+            "Week": week_key,
+            "Weeks": self.weeks,
+            "Traced MB": round(current / MB, 2),
+            "Peak MB": round(peak / MB, 2),
+        }
+        for name in BUILDER_STRUCTURES:
+            row[f"{name} MB"] = round(deep_sizeof(getattr(self.builder, name), seen) / MB, 2)
+        row["ranked_weeks entries"] = sum(len(ranked) for _, ranked in self.builder.ranked_weeks)
+        row["all_songs_history songs"] = len(self.builder.all_songs_history)
+
+        self.rows.append(row)
+        print(f"Memory at {week_key} ({self.weeks} weeks): {row['Traced MB']} MB traced, "
+              f"ranked_weeks {row['ranked_weeks MB']} MB, all_songs_history {row['all_songs_history MB']} MB")
+
+    def stop(self, week_key=None):
+        """final snapshot, write the growth curve and print the biggest growing allocation sites"""
+        if week_key is not None and (not self.rows or self.rows[-1]["Weeks"] != self.weeks):
+            self.snapshot(week_key)
+        tracemalloc.stop()
+
+        if not self.rows:
+            return
+
+        os.makedirs(os.path.dirname(self.output_file) or ".", exist_ok=True)
+        with open(self.output_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(self.rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(self.rows)
+        print(f"Memory growth curve saved to {self.output_file}")
+
+        print(f"Top {self.top_sites} allocation sites by growth:")
+        for stat in self.last_snapshot.compare_to(self.first_snapshot, "lineno")[:self.top_sites]:
+            print(f"  {stat.size_diff / MB:8.2f} MB  {stat.count_diff:+9d} blocks  {stat.traceback[0]}")
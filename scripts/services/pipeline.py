@@ -0,0 +1,215 @@
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+STATE_VERSION = 1
+
+class Stage:
+    """one pipeline step: a picklable function plus the files it reads and writes"""
+
+    def __init__(self, name, func, inputs=(), outputs=(), after=(), params=None):
+        self.name = name
+        self.func = func          # func(changed, **params), changed is None for a full rebuild
+        self.inputs = list(inputs)    # glob patterns
+        self.outputs = list(outputs)  # glob patterns that must each match something after a run
+        self.after = list(after)      # names of stages that have to finish first
+        self.params = params or {}
+
+    def input_files(self):
+        return sorted({path for pattern in self.inputs for path in glob.glob(pattern)})
+
+    def outputs_exist(self):
+        return all(glob.glob(pattern) for pattern in self.outputs)
+
+class FileFingerprints:
+    """content digests of files, re-hashed only when their size or mtime changes"""
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}  # {path: [size, mtime_ns, digest]}
+
+    @classmethod
+    def load(cls, cache_file):
+        """digests saved by save(), empty if the file is missing or unreadable"""
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, cache_file):
+        """write the digests of files that still exist"""
+        entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(tmp_file, cache_file)
+
+    def digest(self, path):
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        self.entries[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+class Pipeline:
+    """runs a dag of stages, skipping any whose inputs and params match its last successful run"""
+
+    def __init__(self, stages, state_file="pipeline_state.json", max_workers=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_file = state_file
+        self.max_workers = max_workers
+        self.fingerprints, self.stage_state = self._load_state()
+
+        for stage in stages:
+            missing = [name for name in stage.after if name not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} runs after unknown stage(s): {', '.join(missing)}")
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get("version") == STATE_VERSION:
+                return FileFingerprints(state["files"]), state["stages"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return FileFingerprints(), {}
+
+    def save_state(self):
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": STATE_VERSION,
+                "files": self.fingerprints.entries,
+                "stages": self.stage_state,
+            }, f)
+        os.replace(tmp_file, self.state_file)
+
+    def with_dependencies(self, targets):
+        """targets plus every stage they transitively run after"""
+        selected = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in selected:
+                selected.add(name)
+                pending.extend(self.stages[name].after)
+        return selected
+
+    def plan(self, stage, force=False):
+        """(input digests, changed inputs or None for a full rebuild, whether the stage is fresh)"""
+        inputs = {path: self.fingerprints.digest(path) for path in stage.input_files()}
+        previous = self.stage_state.get(stage.name)
+
+        # a stage with nothing to read has nothing to write either, e.g. a year without plays
+        outputs_missing = bool(inputs) and not stage.outputs_exist()
+        if force or previous is None or previous["params"] != _jsonable(stage.params) or outputs_missing:
+            return inputs, None, False
+
+        old_inputs = previous["inputs"]
+        changed = sorted(
+            path for path in set(inputs) | set(old_inputs)
+            if inputs.get(path) != old_inputs.get(path)
+        )
+        return inputs, changed, not changed
+
+    def run(self, targets=None, force=False, dry_run=False):
+        """run the selected stages in dependency order, independent ones in parallel, returns {stage: status}"""
+        selected = self.with_dependencies(targets) if targets else set(self.stages)
+        status = {}
+        running = {}
+        started = time.perf_counter()
+
+        pool = None if dry_run else ProcessPoolExecutor(max_workers=self.max_workers)
+        try:
+            while len(status) < len(selected):
+                progressed = False
+                for name in sorted(selected):
+                    if name in status or name in (running_name for running_name, _ in running.values()):
+                        continue
+                    stage = self.stages[name]
+                    upstream = [status.get(dep) for dep in stage.after if dep in selected]
+                    if any(s is None for s in upstream):
+                        continue
+                    progressed = True
+                    if any(s in ("failed", "blocked") for s in upstream):
+                        status[name] = "blocked"
+                        print(f"[{name}] blocked by a failed upstream stage")
+                        continue
+                    if dry_run and "would run" in upstream:
+                        status[name] = "would run"
+                        print(f"[{name}] would run if upstream changes its inputs")
+                        continue
+
+                    # upstream outputs only exist once those stages are done, so plan as late as possible
+                    inputs, changed, fresh = self.plan(stage, force)
+                    if fresh:
+                        status[name] = "fresh"
+                        print(f"[{name}] up to date")
+                        continue
+
+                    scope = "full rebuild" if changed is None else f"{len(changed)} changed input(s)"
+                    if dry_run:
+                        status[name] = "would run"
+                        print(f"[{name}] would run: {scope}")
+                        continue
+
+                    print(f"[{name}] running: {scope}")
+                    future = pool.submit(_run_stage, stage.func, changed, stage.params)
+                    running[future] = (name, inputs)
+
+                if not running:
+                    if not progressed:
+                        raise ValueError(f"Stages depend on each other in a cycle: {', '.join(sorted(selected - set(status)))}")
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, inputs = running.pop(future)
+                    try:
+                        seconds = future.result()
+                    except Exception as e:
+                        status[name] = "failed"
+                        print(f"[{name}] failed: {e!r}")
+                        continue
+
+                    status[name] = "ran"
+                    self.stage_state[name] = {
+                        "params": _jsonable(self.stages[name].params),
+                        "inputs": inputs,
+                        "seconds": round(seconds, 3),
+                    }
+                    # saved per stage so an interrupted run keeps what already finished
+                    self.save_state()
+                    print(f"[{name}] done in {seconds:.2f}s")
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        counts = {}
+        for s in status.values():
+            counts[s] = counts.get(s, 0) + 1
+        print(f"Pipeline finished in {time.perf_counter() - started:.2f}s: "
+              + ", ".join(f"{count} {s}" for s, count in sorted(counts.items())))
+        return status
+
+def _run_stage(func, changed, params):
+    started = time.perf_counter()
+    func(changed, **params)
+    return time.perf_counter() - started
+
+def _jsonable(params):
+    """params as they round-trip through the state file"""
+    return json.loads(json.dumps(params, sort_keys=True, default=str))
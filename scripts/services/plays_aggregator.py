@@ -4,12 +4,20 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 from models.song import Song
 from models.weekly_play import WeeklyPlay
+from services.instrumentation import get_metrics
 
 class PlaysAggregator:
     """aggregates last.fm plays into weekly song statistics"""
     
     def __init__(self):
         self.weekly_plays = defaultdict(dict)  # {week_start: {song.key: WeeklyPlay}}
+        self.reset_sequence()
+    
+    def reset_sequence(self):
+        """forget the previous play, so sales and airplay streaks start over from the next one"""
+        self.previous_song_key = None
+        self.previous_week = None
+        self.ongoing_streak = defaultdict(int)
     
     def process_years(self, years, data_folder='data/'):
         """process multiple years of play data"""
@@ -22,72 +30,89 @@ class PlaysAggregator:
         """process a single year's play data"""
         print(f"Processing {filepath}...")
         
-        with open(filepath, 'r', encoding='utf-8') as file:
+        metrics = get_metrics()
+        with metrics.stage("aggregate"), open(filepath, 'r', encoding='utf-8') as file:
             reader = csv.reader(file)
-            
-            previous_song_key = None
-            previous_week = None
-            ongoing_streak = defaultdict(int)
+            self.reset_sequence()
             
             for row in reader:
                 artist, album, song_name, timestamp = row
-                date = datetime.strptime(timestamp, "%d %b %Y %H:%M")
-                week_start = self._get_week_friday(date)
-                
-                # create or get song
-                song = Song(song_name, artist, album)
-                
-                # get or create weekly play entry
-                if song.key not in self.weekly_plays[week_start]:
-                    self.weekly_plays[week_start][song.key] = WeeklyPlay(song, week_start)
-                
-                weekly_play = self.weekly_plays[week_start][song.key]
-                
-                # track streams (every play counts)
-                weekly_play.streams += 1
-                
-                # track sales (unique song plays per week)
-                if previous_week != week_start or previous_song_key != song.key:
-                    weekly_play.sales += 1
-                    # reset streak for previous song
-                    if previous_song_key:
-                        ongoing_streak[previous_song_key] = 0
-                
-                # track airplay (consecutive play streak)
-                ongoing_streak[song.key] += 1
-                weekly_play.airplay = max(weekly_play.airplay, ongoing_streak[song.key])
-                
-                previous_song_key = song.key
-                previous_week = week_start
+                self.add_play(artist, album, song_name, datetime.strptime(timestamp, "%d %b %Y %H:%M"))
+            
+            metrics.count("rows", reader.line_num)
+    
+    def add_play(self, artist, album, song_name, date):
+        """count one scrobble, plays must arrive in listening order, returns its chart week"""
+        week_start = self._get_week_friday(date)
+        
+        # create or get song
+        song = Song(song_name, artist, album)
+        
+        # get or create weekly play entry
+        if song.key not in self.weekly_plays[week_start]:
+            self.weekly_plays[week_start][song.key] = WeeklyPlay(song, week_start)
+        
+        weekly_play = self.weekly_plays[week_start][song.key]
+        
+        # track streams (every play counts)
+        weekly_play.streams += 1
+        
+        # track sales (unique song plays per week)
+        if self.previous_week != week_start or self.previous_song_key != song.key:
+            weekly_play.sales += 1
+            # reset streak for previous song
+            if self.previous_song_key:
+                self.ongoing_streak[self.previous_song_key] = 0
+        
+        # track airplay (consecutive play streak)
+        self.ongoing_streak[song.key] += 1
+        weekly_play.airplay = max(weekly_play.airplay, self.ongoing_streak[song.key])
+        
+        self.previous_song_key = song.key
+        self.previous_week = week_start
+        return week_start
     
     def save_weekly_files(self, output_root='plays/'):
         """save aggregated weekly play data to csv files"""
+        metrics = get_metrics()
         for week_start, plays_dict in sorted(self.weekly_plays.items()):
-            year = week_start.year
-            file_date = week_start.strftime("%m-%d")
+            output_file = self.weekly_file_path(week_start, output_root)
             
-            output_dir = os.path.join(output_root, str(year))
-            os.makedirs(output_dir, exist_ok=True)
-            output_file = os.path.join(output_dir, f"{file_date}.csv")
-            
-            with open(output_file, 'w', encoding='utf-8', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Week", "Song Name", "Album Name", "Artist Name", 
-                               "Streams", "Sales", "Airplay"])
-                
-                for weekly_play in plays_dict.values():
-                    writer.writerow([
-                        weekly_play.week_key,
-                        weekly_play.song.name,
-                        weekly_play.song.album,
-                        weekly_play.song.artist,
-                        weekly_play.streams,
-                        weekly_play.sales,
-                        weekly_play.airplay
-                    ])
+            with metrics.stage("write_plays", week=week_start.strftime("%Y-%m-%d")):
+                self.save_weekly_file(plays_dict, output_file)
+                metrics.count("play_rows", len(plays_dict))
+                metrics.count_bytes(output_file)
         
         print(f"Weekly files saved to '{output_root}' folder.")
     
+    @staticmethod
+    def weekly_file_path(week_start, output_root='plays/'):
+        """plays/<year>/<mm-dd>.csv for a chart week, creating the year folder"""
+        output_dir = os.path.join(output_root, str(week_start.year))
+        os.makedirs(output_dir, exist_ok=True)
+        return os.path.join(output_dir, f"{week_start.strftime('%m-%d')}.csv")
+    
+    @staticmethod
+    def save_weekly_file(plays_dict, output_file):
+        """write one week of aggregated plays, replacing the file in one step"""
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["Week", "Song Name", "Album Name", "Artist Name", 
+                           "Streams", "Sales", "Airplay"])
+            
+            for weekly_play in plays_dict.values():
+                writer.writerow([
+                    weekly_play.week_key,
+                    weekly_play.song.name,
+                    weekly_play.song.album,
+                    weekly_play.song.artist,
+                    weekly_play.streams,
+                    weekly_play.sales,
+                    weekly_play.airplay
+                ])
+        os.replace(tmp_file, output_file)
+    
     @staticmethod
     def _get_week_friday(date):
         """calculate the friday 6am that starts this chart week"""
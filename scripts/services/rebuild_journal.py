@@ -0,0 +1,140 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+
+JOURNAL_VERSION = 1
+
+def file_digest(path):
+    """content digest of a file, None if it does not exist"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except FileNotFoundError:
+        return None
+
+class RebuildJournal:
+    """log of finished weeks plus periodic builder checkpoints, so an interrupted rebuild can resume"""
+
+    def __init__(self, journal_file, checkpoint_dir, params=None, checkpoint_every=26, checkpoints_kept=3):
+        self.journal_file = journal_file
+        self.checkpoint_dir = checkpoint_dir
+        self.params = params or {}  # settings every journaled week was built with
+        self.checkpoint_every = checkpoint_every
+        # each checkpoint holds the whole state so far, older ones only help when an early week changes
+        self.checkpoints_kept = checkpoints_kept
+        self.entries = []  # [(week key, plays digest, points digest)] in build order
+        self.handle = None
+
+    def load(self):
+        """entries of the last run, empty if it used other params, a torn last line is dropped"""
+        self.entries = []
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline())
+                if header != {"version": JOURNAL_VERSION, "params": self.params}:
+                    return self.entries
+                for line in f:
+                    if not line.endswith("\n"):
+                        break
+                    fields = line.rstrip("\n").split("\t")
+                    if len(fields) == 3:
+                        self.entries.append(tuple(fields))
+        except (OSError, ValueError):
+            pass
+        return self.entries
+
+    def first_dirty(self, weeks):
+        """index of the first of [(week key, plays digest, points digest or None)] that has to be rebuilt"""
+        for index, week in enumerate(weeks):
+            if index >= len(self.entries) or self.entries[index] != week:
+                return index
+        return len(weeks)
+
+    def checkpoints(self):
+        """{week key: checkpoint file} of the builder state saved after that week"""
+        return {
+            os.path.basename(path)[:-len(".pkl")]: path
+            for path in glob.glob(os.path.join(self.checkpoint_dir, "*.pkl"))
+        }
+
+    def load_checkpoint(self, path):
+        """(builder state, number of weeks it covers), None if unreadable or from other params"""
+        try:
+            with open(path, 'rb') as f:
+                version, params, weeks_done, state = pickle.load(f)
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError):
+            return None
+        if (version, params) != (JOURNAL_VERSION, self.params):
+            return None
+        return state, weeks_done
+
+    def resume(self, weeks):
+        """(builder state or None, index of the first week to build, index of the first week to write)
+
+        weeks before the dirty one are already on disk exactly as they would be rebuilt, so they are
+        replayed from the latest checkpoint without writing anything
+        """
+        dirty = self.first_dirty(weeks)
+        best = None
+        for week_key, path in sorted(self.checkpoints().items(), reverse=True):
+            loaded = self.load_checkpoint(path)
+            if loaded is not None and loaded[1] <= dirty and weeks[loaded[1] - 1][0] == week_key:
+                best = loaded
+                break
+        if best is None:
+            return None, 0, dirty
+        return best[0], best[1], dirty
+
+    def start(self, kept):
+        """rewrite the journal with the first kept entries and drop checkpoints past them"""
+        self.entries = self.entries[:kept]
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        for week_key, path in self.checkpoints().items():
+            if not any(entry[0] == week_key for entry in self.entries):
+                os.remove(path)
+
+        tmp_file = f"{self.journal_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"version": JOURNAL_VERSION, "params": self.params}) + "\n")
+            for entry in self.entries:
+                f.write("\t".join(entry) + "\n")
+        os.replace(tmp_file, self.journal_file)
+        self.handle = open(self.journal_file, 'a', encoding='utf-8')
+
+    def week_done(self, week_key, plays_digest, points_digest, builder):
+        """record a week whose output is fully written, checkpointing the builder every so often"""
+        self.handle.write(f"{week_key}\t{plays_digest}\t{points_digest}\n")
+        self.handle.flush()
+        os.fsync(self.handle.fileno())
+        self.entries.append((week_key, plays_digest, points_digest))
+
+        if len(self.entries) % self.checkpoint_every == 0:
+            self.checkpoint(week_key, builder)
+
+    def record(self, entries, builder):
+        """replace the journal with weeks another pass built and wrote, checkpointing a builder that is past the last"""
+        for path in self.checkpoints().values():
+            os.remove(path)
+        self.entries = list(entries)
+        self.start(len(self.entries))
+        self.close()
+        if self.entries and builder is not None:
+            self.checkpoint(self.entries[-1][0], builder)
+
+    def checkpoint(self, week_key, builder):
+        tmp_file = os.path.join(self.checkpoint_dir, f"{week_key}.pkl.tmp")
+        with open(tmp_file, 'wb') as f:
+            pickle.dump((JOURNAL_VERSION, self.params, len(self.entries), builder.get_state()),
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, os.path.join(self.checkpoint_dir, f"{week_key}.pkl"))
+
+        # week keys sort chronologically
+        for _, path in sorted(self.checkpoints().items())[:-self.checkpoints_kept]:
+            os.remove(path)
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
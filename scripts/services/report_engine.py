@@ -0,0 +1,106 @@
+import os
+
+from services.album_cover_service import AlbumCoverService
+from repositories.chart_repository import ChartRepository
+from services.instrumentation import get_metrics
+from services.pipeline import FileFingerprints
+
+FINGERPRINT_CACHE = "fingerprints.json"
+
+class ReportEngine:
+    """walks the weekly points history once and feeds each week to report accumulators"""
+
+    def __init__(self, points_root="points", years=None, cover_service=None, fingerprint_file=None):
+        self.points_root = points_root
+        # digests keyed by size and mtime, so a run only hashes the weeks that changed
+        self.fingerprint_file = fingerprint_file or os.path.join(points_root, FINGERPRINT_CACHE)
+        self.years = years
+        self.cover_service = cover_service
+        self.accumulators = []
+
+    def add(self, accumulator):
+        """register a report accumulator"""
+        self.accumulators.append(accumulator)
+        return accumulator
+
+    def iter_weeks(self):
+        """yield (year, week, filepath) for every weekly points file in order"""
+        for year in self._get_years():
+            year_dir = os.path.join(self.points_root, year)
+            for filename in sorted(os.listdir(year_dir)):
+                if filename.endswith(".csv"):
+                    yield year, filename.replace(".csv", ""), os.path.join(year_dir, filename)
+
+    def run(self):
+        """scan the history once, then let every accumulator write its report"""
+        metrics = get_metrics()
+        weeks = list(self.iter_weeks())
+
+        with metrics.stage("fingerprint"):
+            digests = FileFingerprints.load(self.fingerprint_file)
+            cached = dict(digests.entries)
+            fingerprints = [
+                (year, week, digests.digest(filepath))
+                for year, week, filepath in weeks
+            ]
+            hashed = sum(digests.entries[filepath] is not cached.get(filepath) for _, _, filepath in weeks)
+            metrics.count("weeks_hashed", hashed)
+            if hashed:
+                try:
+                    digests.save(self.fingerprint_file)
+                except OSError:
+                    pass  # best-effort like the sidecars, a read-only tree just re-hashes next time
+
+        self._run(fingerprints, [filepath for _, _, filepath in weeks], ChartRepository.load_weekly_rows)
+
+    def run_in_memory(self, weeks):
+        """run() over [(year, week, rows)] already in memory, weeks have no fingerprint so incremental reports need no state file"""
+        years = None if self.years is None else {str(year) for year in self.years}
+        weeks = [(year, week, rows) for year, week, rows in weeks if years is None or year in years]
+        self._run([(year, week, None) for year, week, _ in weeks], [rows for _, _, rows in weeks], lambda rows: rows)
+
+    def _run(self, fingerprints, sources, load_rows):
+        if self.cover_service is None:
+            self.cover_service = AlbumCoverService()
+
+        metrics = get_metrics()
+        for accumulator in self.accumulators:
+            accumulator.begin(fingerprints)
+
+        for (year, week, _), source in zip(fingerprints, sources):
+            interested = [acc for acc in self.accumulators if acc.wants_week(year, week)]
+            if not interested:
+                metrics.count("weeks_skipped")
+                continue
+
+            with metrics.stage("scan", week=f"{year}-{week}"):
+                rows = load_rows(source)
+                for accumulator in interested:
+                    accumulator.add_week(year, week, rows)
+                metrics.count("rows", len(rows))
+
+        with metrics.stage("covers"):
+            self.cover_service.prefetch(
+                key for accumulator in self.accumulators for key in accumulator.cover_keys()
+            )
+
+        for accumulator in self.accumulators:
+            with metrics.stage(f"finish:{type(accumulator).__name__}"):
+                accumulator.finish(self.cover_service)
+
+        self.cover_service.save_cache()
+
+    def _get_years(self):
+        """years to scan, either configured or every year folder under points_root"""
+        if not os.path.exists(self.points_root):
+            return []
+
+        if self.years is None:
+            candidates = os.listdir(self.points_root)
+        else:
+            candidates = [str(year) for year in self.years]
+
+        return sorted(
+            year for year in candidates
+            if os.path.isdir(os.path.join(self.points_root, year))
+        )
@@ -0,0 +1,75 @@
+import colorsys
+import os
+import sys
+import unittest
+from collections import Counter
+from io import BytesIO
+
+# run from scripts/: python -m unittest discover tests
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+import numpy as np
+from PIL import Image
+
+from services.album_cover import dominant_color_from_bytes, dominant_color_from_pixels
+
+def colorsys_dominant_color(pixels, brightness_min=100, brightness_max=175, saturation_threshold=0.15):
+    """the per-color loop get_dominant_color used before it was vectorized"""
+    best_color = None
+    best_score = -1
+    for color, count in Counter(map(tuple, pixels.tolist())).items():
+        r, g, b = color
+        h, l, s = colorsys.rgb_to_hls(r / 255.0, g / 255.0, b / 255.0)
+        brightness = l * 255
+        if not (brightness_min < brightness < brightness_max):
+            continue
+        if s < saturation_threshold:
+            continue
+        score = count * s * (brightness / 255)
+        if score > best_score:
+            best_score = score
+            best_color = color
+    return best_color if best_color else (255, 255, 255)
+
+def fixture_cover(seed=7, size=120):
+    """noise over dark and white bands, a jittered teal block and a smaller solid orange one"""
+    rng = np.random.RandomState(seed)
+    image = rng.randint(0, 256, (size, size, 3)).astype(np.uint8)
+    image[:20] = 12
+    image[-20:] = 250
+    image[30:90, 10:70] = np.clip(np.array([40, 150, 140]) + rng.randint(-2, 3, (60, 60, 3)), 0, 255)
+    image[40:60, 80:110] = (220, 120, 30)
+    return image
+
+class DominantColorTest(unittest.TestCase):
+    def test_fixed_cover_matches_colorsys_loop(self):
+        pixels = fixture_cover().reshape(-1, 3)
+        expected = colorsys_dominant_color(pixels)
+        self.assertEqual(dominant_color_from_pixels(pixels), expected)
+        self.assertEqual(dominant_color_from_pixels(pixels, quantize_bits=8), expected)
+
+    def test_exact_scoring_matches_colorsys_loop_on_noise(self):
+        for seed in range(5):
+            pixels = np.random.RandomState(seed).randint(0, 256, (64 * 64, 3)).astype(np.uint8)
+            self.assertEqual(dominant_color_from_pixels(pixels, quantize_bits=8), colorsys_dominant_color(pixels))
+
+    def test_default_is_close_to_colorsys_loop_on_noise(self):
+        for seed in range(5):
+            pixels = np.random.RandomState(seed).randint(0, 256, (64 * 64, 3)).astype(np.uint8)
+            color = dominant_color_from_pixels(pixels)
+            self.assertEqual(colorsys_dominant_color(pixels[np.all(pixels == color, axis=1)]), color)
+
+    def test_no_bright_hue_falls_back_to_white(self):
+        pixels = np.array([[10, 10, 10], [128, 128, 128], [250, 250, 250]] * 10, dtype=np.uint8)
+        self.assertEqual(dominant_color_from_pixels(pixels), (255, 255, 255))
+        self.assertEqual(dominant_color_from_pixels(pixels, quantize_bits=8), (255, 255, 255))
+
+    def test_encoded_cover(self):
+        buffer = BytesIO()
+        Image.fromarray(fixture_cover()).save(buffer, 'PNG')
+        self.assertEqual(dominant_color_from_bytes(buffer.getvalue()),
+                         colorsys_dominant_color(fixture_cover().reshape(-1, 3)))
+
+if __name__ == "__main__":
+    unittest.main()
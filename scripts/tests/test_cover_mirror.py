@@ -0,0 +1,183 @@
+import csv
+import glob
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from unittest import mock
+
+# run from scripts/: python -m unittest discover tests
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+from PIL import Image
+
+import export_json
+from services.album_cover_service import AlbumCoverService
+from services.cover_mirror import CoverMirror, write_atomic
+
+def fixture_image(color, size=(300, 300), image_format='PNG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, image_format)
+    return buffer.getvalue()
+
+class CoverServer:
+    """serves {path: bytes} on a local port, 404 for anything else"""
+
+    def __init__(self, files):
+        files = dict(files)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = files.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.server.server_port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+class CoverMirrorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.red = fixture_image('red')
+        self.blue = fixture_image('blue', image_format='JPEG')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def leftover_temp_files(self):
+        return glob.glob(os.path.join(self.root, "**", "*.tmp"), recursive=True)
+
+    def test_mirror_downloads_originals_and_thumbnails(self):
+        files = {"/covers/red.png": self.red, "/covers/blue.jpg": self.blue}
+        with CoverServer(files) as server:
+            mirror = CoverMirror(self.root, sizes=(64, 150), max_workers=1)
+            urls = [server.url(path) for path in files] + [server.url("/covers/missing.png")]
+            local_names = mirror.mirror(urls)
+
+        self.assertEqual(set(local_names), {server.url(path) for path in files})
+        for path, image_bytes in files.items():
+            local_name = local_names[server.url(path)]
+            self.assertEqual(local_name, CoverMirror.local_name(image_bytes, path))
+            self.assertEqual(mirror.read(local_name), image_bytes)
+            self.assertTrue(mirror.has(local_name))
+            with Image.open(mirror.thumbnail_path(local_name, 64)) as thumbnail:
+                self.assertEqual(thumbnail.size, (64, 64))
+        self.assertEqual(self.leftover_temp_files(), [])
+
+    def test_same_cover_from_many_urls_is_stored_once(self):
+        files = {f"/covers/{i}/red.png": self.red for i in range(16)}
+        with CoverServer(files) as server:
+            mirror = CoverMirror(self.root, sizes=(64,), download_workers=16, max_workers=1)
+            local_names = mirror.mirror(server.url(path) for path in files)
+
+        self.assertEqual(len(local_names), len(files))
+        self.assertEqual(len(set(local_names.values())), 1)
+        self.assertEqual(len(glob.glob(os.path.join(self.root, "original", "*", "*"))), 1)
+        self.assertEqual(self.leftover_temp_files(), [])
+
+    def test_concurrent_atomic_writes_to_one_path(self):
+        path = os.path.join(self.root, "original", "ab", "cover.png")
+        payloads = [self.red, self.blue] * 16
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(lambda data: write_atomic(path, data), payloads))
+
+        with open(path, 'rb') as f:
+            self.assertIn(f.read(), (self.red, self.blue))
+        self.assertEqual(self.leftover_temp_files(), [])
+
+class StubCoverClient:
+    """last.fm stand-in answering from {(album, artist): cover url}"""
+
+    def __init__(self, urls):
+        self.urls = urls
+
+    def get_album_cover(self, album_name, artist_name):
+        return self.urls.get((album_name, artist_name), "")
+
+class MirroredCoverServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.public_dir = os.path.join(self.tmp.name, "public")
+        self.covers_dir = os.path.join(self.public_dir, "covers")
+        self.cache_file = os.path.join(self.tmp.name, "album_covers.csv")
+        self.files = {"/covers/red.png": fixture_image('red'), "/covers/blue.jpg": fixture_image('blue', image_format='JPEG')}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_prefetch_mirrors_and_persists_local_paths(self):
+        with CoverServer(self.files) as server:
+            urls = {("Red", "A"): server.url("/covers/red.png"), ("Blue", "B"): server.url("/covers/blue.jpg")}
+            service = AlbumCoverService(self.cache_file, client=StubCoverClient(urls),
+                                        mirror=CoverMirror(self.covers_dir, sizes=(150,), max_workers=1))
+            service.prefetch(list(urls) + [("None", "C")])
+            service.save_cache()
+
+        for (album, artist), url in urls.items():
+            local_name = service.local_paths[(album, artist)]
+            self.assertEqual(local_name, CoverMirror.local_name(self.files[url[url.index("/covers"):]], url))
+            self.assertTrue(os.path.exists(service.get_local_path(album, artist)))
+            self.assertTrue(os.path.exists(service.get_thumbnail_path(album, artist, 150)))
+        self.assertIsNone(service.get_thumbnail_path("None", "C", 150))
+
+        # a fresh service reads the local paths back without fetching or downloading anything
+        reloaded = AlbumCoverService(self.cache_file, client=StubCoverClient({}),
+                                     mirror=CoverMirror(self.covers_dir, sizes=(150,)))
+        self.assertEqual(reloaded.local_paths, service.local_paths)
+        self.assertEqual(reloaded.get_thumbnail_path("Red", "A", 150), service.get_thumbnail_path("Red", "A", 150))
+
+    def test_export_json_serves_mirrored_thumbnails(self):
+        chart_file = os.path.join(self.tmp.name, "chart.csv")
+        output_file = os.path.join(self.public_dir, "data", "latest_chart.json")
+        with CoverServer(self.files) as server:
+            with open(self.cache_file, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Album', 'Artist', 'Cover URL', 'Fetched At', 'Local Path'])
+                writer.writerow(["Red", "A", server.url("/covers/red.png"), 1, ""])
+                writer.writerow(["Blue", "B", server.url("/covers/blue.jpg"), 1, ""])
+            with open(chart_file, 'w', encoding='utf-8', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(["Position", "Song", "Artist", "Album", "Album Cover"])
+                writer.writerow([1, "Song R", "A", "Red", server.url("/covers/red.png")])
+                writer.writerow([2, "Song B", "B", "Blue", server.url("/covers/blue.jpg")])
+
+            with mock.patch.multiple(export_json, CSV_PATH=chart_file, OUTPUT_PATH=output_file,
+                                     PUBLIC_DIR=self.public_dir, COVERS_DIR=self.covers_dir,
+                                     COVER_CACHE=self.cache_file):
+                export_json.convert_csv_to_json()
+
+        with open(output_file, encoding='utf-8') as f:
+            songs = json.load(f)["songs"]
+        for song in songs:
+            self.assertRegex(song["coverThumb"], r"^/covers/150/[0-9a-f]{2}/[0-9a-f]{64}\.webp$")
+            self.assertTrue(os.path.exists(os.path.join(self.public_dir, song["coverThumb"].lstrip("/"))))
+
+if __name__ == "__main__":
+    unittest.main()
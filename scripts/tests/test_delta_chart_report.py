@@ -0,0 +1,100 @@
+import contextlib
+import gzip
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# run from scripts/: python -m unittest discover tests
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(TESTS_DIR))
+
+from reports.delta_chart_report import DeltaChartReport, decode_weeks, load_bundle, verify_delta_export
+from repositories.chart_repository import ChartRepository
+from services.album_cover_service import AlbumCoverService
+from services.chart_builder import ChartBuilder
+from services.plays_aggregator import PlaysAggregator
+from services.points_calculator import PointsCalculator
+from services.report_engine import ReportEngine
+
+CHART_LIMIT = 10
+
+class OfflineCoverClient:
+    def get_album_cover(self, album_name, artist_name):
+        return ""
+
+def fixture_history(points_root, seed=23, songs=30, start=datetime(2023, 10, 2), days=150):
+    """points files of a random listening history that crosses a year boundary, returns the week keys"""
+    rng = random.Random(seed)
+    catalog = [(f"Artist {i % 7}", f"Album {i % 11}", f"Song {i}") for i in range(songs)]
+    aggregator = PlaysAggregator()
+    for day in range(days):
+        # a few songs in rotation each day, so entries debut, climb, exit and re-enter
+        rotation = rng.sample(catalog, 6)
+        moment = start + timedelta(days=day, hours=9)
+        for _ in range(rng.randint(10, 40)):
+            artist, album, song = rng.choice(rotation)
+            aggregator.add_play(artist, album, song, moment)
+            moment += timedelta(minutes=3)
+
+    builder = ChartBuilder(PointsCalculator(), CHART_LIMIT)
+    week_keys = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for week_start, plays in sorted(aggregator.weekly_plays.items()):
+            year, week = str(week_start.year), week_start.strftime("%m-%d")
+            chart_entries = builder.build_weekly_chart(plays, f"{year}-{week}")
+            ChartRepository.save_weekly_chart(chart_entries, os.path.join(points_root, year, f"{week}.csv"))
+            week_keys.append(f"{year}-{week}")
+    return week_keys
+
+class DeltaRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.points_root = os.path.join(self.tmp.name, "points")
+        self.output_dir = os.path.join(self.tmp.name, "delta")
+        self.week_keys = fixture_history(self.points_root)
+
+        self.engine = ReportEngine(
+            points_root=self.points_root,
+            cover_service=AlbumCoverService(os.path.join(self.tmp.name, "covers.csv"), client=OfflineCoverClient())
+        )
+        self.engine.add(DeltaChartReport(output_dir=self.output_dir, chart_limit=CHART_LIMIT))
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.engine.run()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def verify(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return verify_delta_export(self.engine, self.output_dir, CHART_LIMIT)
+
+    def test_fixture_spans_years_and_churns(self):
+        self.assertEqual(sorted({week_key[:4] for week_key in self.week_keys}), ["2023", "2024"])
+        bundle = load_bundle(os.path.join(self.output_dir, "2024.json"))
+        self.assertTrue(any(week["exits"] for week in bundle["weeks"]))
+
+    def test_every_week_decodes_to_its_points_file(self):
+        decoded = []
+        for year in ("2023", "2024"):
+            bundle = load_bundle(os.path.join(self.output_dir, f"{year}.json"))
+            decoded.extend(week_id for week_id, _ in decode_weeks(bundle))
+        self.assertEqual(decoded, self.week_keys)
+        self.assertEqual(self.verify(), [])
+
+    def test_tampered_bundle_is_reported(self):
+        path = os.path.join(self.output_dir, "2024.json")
+        bundle = load_bundle(path)
+        week = next(week for week in bundle["weeks"][1:] if week["changed"])
+        week["changed"][0][3] += 1  # points
+        with open(f"{path}.gz", 'wb') as f:
+            f.write(gzip.compress(json.dumps(bundle).encode("utf-8")))
+
+        self.assertEqual(self.verify(), [week["week"]])
+
+if __name__ == "__main__":
+    unittest.main()
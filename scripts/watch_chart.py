@@ -0,0 +1,224 @@
+import argparse
+import contextlib
+import csv
+import io
+import os
+import pickle
+import time
+from datetime import datetime, timezone
+
+import config
+from process_points import CHECKPOINT_EVERY, CHECKPOINTS_KEPT
+from reports.json_api_report import chart_entry, write_json
+from repositories.chart_repository import ChartRepository
+from services.album_cover_service import AlbumCoverService
+from services.fast_chart_builder import FastChartBuilder
+from services.lastfm_parser import LastFmParser
+from services.plays_aggregator import PlaysAggregator
+from services.points_calculator import PointsCalculator
+
+# run from scripts/: python watch_chart.py [--drop-dir DIR]
+# the export is tailed for appended lines, files dropped into the drop dir are read once each,
+# write them elsewhere and move them in so they are never seen half-written
+WATCH_FILE = config.EXPORT_FILE
+DROP_DIR = None
+POLL_INTERVAL = 0.25  # seconds
+LIVE_CHART_FILE = os.path.join(config.SCRIPT_DIR, '..', 'public', 'data', 'live_chart.json')
+COVER_CACHE_FILE = os.path.join(config.SCRIPT_DIR, 'album_covers.csv')
+
+class ChartWatcher:
+    """keeps every closed week built and re-scores only the open one as scrobbles arrive"""
+
+    def __init__(self, watch_file=WATCH_FILE, drop_dir=DROP_DIR, live_file=LIVE_CHART_FILE,
+                 chart_limit=config.CHART_LIMIT, time_offset_hours=config.TIME_OFFSET_HOURS):
+        self.watch_file = watch_file
+        self.drop_dir = drop_dir
+        self.live_file = live_file
+        self.chart_limit = chart_limit
+        self.parser = LastFmParser(time_offset_hours)
+        # covers already in the cache only, the live chart never waits on the network
+        self.covers = AlbumCoverService(COVER_CACHE_FILE).cache
+        self.reset()
+
+    def reset(self):
+        """forget everything read so far, the next poll replays the sources from the start"""
+        self.aggregator = PlaysAggregator()
+        self.plays = []  # every parsed scrobble in listening order, replayed when late ones arrive
+        self.builder = FastChartBuilder(PointsCalculator(), self.chart_limit)
+        self.builder.load_charted_cache(config.CHARTED_CACHE_FILE)
+        self.offset = 0
+        self.dropped = set()
+        self.year = None
+        self.open_week = None  # newest week with plays, every earlier one is built on self.builder
+        self.built = []  # week starts built on self.builder, in order
+        # [(weeks built, pickled builder state)] every CHECKPOINT_EVERY weeks like process_points,
+        # late scrobbles rebuild from the latest one before their week
+        self.snapshots = []
+
+    def read_new_rows(self):
+        """complete rows appended to the watched file and rows of newly dropped files"""
+        rows = []
+        if os.path.exists(self.watch_file):
+            size = os.path.getsize(self.watch_file)
+            if size < self.offset:
+                raise ValueError(f"{self.watch_file} shrank from {self.offset} to {size} bytes")
+            if size > self.offset:
+                with open(self.watch_file, 'rb') as f:
+                    f.seek(self.offset)
+                    data = f.read(size - self.offset)
+                # a line still being written is picked up by the next poll
+                end = data.rfind(b'\n') + 1
+                self.offset += end
+                rows.extend(csv.reader(io.StringIO(data[:end].decode('utf-8'))))
+
+        if self.drop_dir and os.path.isdir(self.drop_dir):
+            for filename in sorted(os.listdir(self.drop_dir)):
+                if filename.endswith(".csv") and filename not in self.dropped:
+                    with open(os.path.join(self.drop_dir, filename), 'r', encoding='utf-8') as f:
+                        rows.extend(csv.reader(f))
+                    self.dropped.add(filename)
+        return rows
+
+    def add_rows(self, rows):
+        """aggregate scrobbles in listening order, returns the earliest week they touched"""
+        plays = [self.parser.parse_row(row) for row in rows if len(row) == 4]
+        # dropped files arrive in filename order, the sort is stable so equal times keep file order
+        plays = sorted((play for play in plays if play is not None), key=lambda play: play[3])
+        if not plays:
+            return None
+
+        if self.plays and plays[0][3] < self.plays[-1][3]:
+            # streaks run across the late plays, so everything is replayed in listening order
+            self.plays = sorted(self.plays + plays, key=lambda play: play[3])
+            self.aggregator = PlaysAggregator()
+            self.year = None
+            self._aggregate(self.plays)
+            return self.aggregator._get_week_friday(plays[0][3])
+        self.plays.extend(plays)
+        return self._aggregate(plays)
+
+    def _aggregate(self, plays):
+        earliest = None
+        for parsed in plays:
+            date = parsed[3]
+            # process_plays reads one file per configured year, streaks restart with each
+            if str(date.year) not in config.YEARS:
+                continue
+            if date.year != self.year:
+                self.aggregator.reset_sequence()
+                self.year = date.year
+
+            week_start = self.aggregator.add_play(*parsed)
+            if earliest is None or week_start < earliest:
+                earliest = week_start
+        return earliest
+
+    def close_weeks(self):
+        """build every week before the newest one for good, returns how many were built"""
+        newest = max(self.aggregator.weekly_plays, default=None)
+        closing = [
+            week_start for week_start in sorted(self.aggregator.weekly_plays)
+            if (self.open_week is None or week_start >= self.open_week) and week_start < newest
+        ]
+        self._build_closed(closing)
+        self.open_week = newest
+        return len(closing)
+
+    def _build_closed(self, week_starts):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for week_start in week_starts:
+                self.builder.build_weekly_chart(self.aggregator.weekly_plays[week_start],
+                                                week_start.strftime("%Y-%m-%d"))
+                self.built.append(week_start)
+                if len(self.built) % CHECKPOINT_EVERY == 0:
+                    self.snapshots.append((len(self.built), pickle.dumps(self.builder.get_state(), pickle.HIGHEST_PROTOCOL)))
+                    del self.snapshots[:-CHECKPOINTS_KEPT]
+
+    def rebuild_from(self, week_start):
+        """rebuild every closed week from week_start on, after late scrobbles changed it, returns how many"""
+        kept = sum(built < week_start for built in self.built)
+        while self.snapshots and self.snapshots[-1][0] > kept:
+            self.snapshots.pop()
+
+        self.builder = FastChartBuilder(PointsCalculator(), self.chart_limit)
+        if self.snapshots:
+            kept, state = self.snapshots[-1]
+            self.builder.set_state(pickle.loads(state))
+        else:
+            kept = 0
+            self.builder.load_charted_cache(config.CHARTED_CACHE_FILE)
+
+        rebuilding = sorted(
+            week for week in self.aggregator.weekly_plays
+            if week < self.open_week and (kept == 0 or week > self.built[kept - 1])
+        )
+        del self.built[kept:]
+        self._build_closed(rebuilding)
+        return len(rebuilding)
+
+    def live_chart(self):
+        """the open week scored on a provisional view of the closed weeks' state"""
+        week_key = self.open_week.strftime("%Y-%m-%d")
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            chart_entries = self.builder.provisional().build_weekly_chart(self.aggregator.weekly_plays[self.open_week], week_key)
+
+        entries = []
+        for row in ChartRepository.rows_from_columns(*ChartRepository.columns_from_entries(chart_entries)):
+            entry = chart_entry(row)
+            entry["coverUrl"] = self.covers.get((row["Album"], row["Artist"]), "")
+            entries.append(entry)
+        return {
+            "week": week_key,
+            "updatedAt": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "entries": entries,
+        }
+
+    def poll(self):
+        """read whatever arrived and republish the open week, returns whether anything was new"""
+        started = time.perf_counter()
+        try:
+            rows = self.read_new_rows()
+        except ValueError as e:
+            print(f"{e}, reloading everything")
+            self.reset()
+            rows = self.read_new_rows()
+
+        earliest = self.add_rows(rows)
+        if earliest is None:
+            return False
+
+        if self.open_week is not None and earliest < self.open_week:
+            rebuilt = self.rebuild_from(earliest)
+            print(f"Late scrobbles for the closed week of {earliest:%Y-%m-%d}, rebuilt {rebuilt} week(s)")
+        closed = self.close_weeks()
+        if closed:
+            print(f"Closed {closed} week(s), the open week is now {self.open_week:%Y-%m-%d}")
+
+        live = self.live_chart()
+        write_json(self.live_file, live)
+        print(f"Published {live['week']} with {len(rows)} new row(s) in "
+              f"{(time.perf_counter() - started) * 1000:.0f}ms")
+        return True
+
+    def watch(self, poll_interval=POLL_INTERVAL):
+        while True:
+            self.poll()
+            time.sleep(poll_interval)
+
+def main():
+    parser = argparse.ArgumentParser(description="republish the open week's chart whenever new scrobbles arrive")
+    parser.add_argument("--file", default=WATCH_FILE, help="growing last.fm export to tail")
+    parser.add_argument("--drop-dir", default=DROP_DIR, help="folder of export files to read as they appear")
+    parser.add_argument("--output", default=LIVE_CHART_FILE)
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL)
+    args = parser.parse_args()
+
+    os.chdir(config.SCRIPT_DIR)
+    watcher = ChartWatcher(args.file, args.drop_dir, args.output)
+    try:
+        watcher.watch(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()